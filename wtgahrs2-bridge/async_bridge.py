@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+asyncio runtime for the WTGAHRS2 bridge
+Serial input, frame processing and statistics all run on one event loop
+thread instead of the threaded runtime's reader and stats threads, so
+bridge state is only ever touched from that thread.  Output sinks keep
+their own worker threads.
+"""
+
+import asyncio
+import logging
+import signal
+import serial
+from wtgahrs2_bridge import STATS_INTERVAL, WTGAHRS2Bridge
+
+
+class AsyncWTGAHRS2Bridge(WTGAHRS2Bridge):
+    """WTGAHRS2Bridge driven by an asyncio event loop"""
+    
+    def __init__(self, config_file: str = "config.ini"):
+        super().__init__(config_file)
+        self.loop = None
+        self._stopped = None
+        self.serial_fd = None
+        self._reconnect = None
+    
+    def _on_serial_readable(self):
+        """Reader callback: parse what arrived and send the NMEA output"""
+        try:
+            # The port is non-blocking here, so this never waits
+            data = self.serial_port.read(self.serial_port.in_waiting or 1)
+        except (serial.SerialException, OSError) as e:
+            logging.error(f"Serial port error: {e}")
+            self.loop.remove_reader(self.serial_fd)
+            self._reconnect = asyncio.ensure_future(self._reconnect_serial())
+            return
+        except Exception as e:
+            logging.error(f"Error reading serial data: {e}")
+            self.stop()
+            return
+        
+        try:
+            for frame in self.parser.feed_frames(data):
+                self.process_sensor_data(frame)
+        except Exception as e:
+            logging.error(f"Error processing serial data: {e}")
+    
+    async def _reconnect_serial(self):
+        """Wait for the device off the loop thread, then resume reading it"""
+        # The executor thread outlives cancellation, so only resume reading
+        # while the bridge is still running
+        if await self.loop.run_in_executor(None, self.reconnect_serial) and self.running:
+            self._watch_serial()
+    
+    def _watch_serial(self):
+        """Read the (re)opened port from the event loop"""
+        self.serial_port.timeout = 0
+        self.serial_fd = self.serial_port.fileno()
+        self.loop.add_reader(self.serial_fd, self._on_serial_readable)
+    
+    async def _statistics(self):
+        """Log statistics every STATS_INTERVAL seconds"""
+        while True:
+            await asyncio.sleep(STATS_INTERVAL)
+            self.log_statistics()
+    
+    def stop(self):
+        """Ask run_async() to return; safe to call from any thread"""
+        if self.loop is not None and self._stopped is not None:
+            self.loop.call_soon_threadsafe(self._stopped.set)
+    
+    async def run_async(self) -> int:
+        """Run the bridge until stop() is called"""
+        self.loop = asyncio.get_running_loop()
+        self._stopped = asyncio.Event()
+        
+        if not self.connect_serial():
+            logging.error("Failed to connect to serial port")
+            return 1
+        if not self.start_sinks():
+            logging.error("Failed to start output sinks")
+            self.serial_port.close()
+            return 1
+        
+        self.running = True
+        self._watch_serial()
+        stats = asyncio.ensure_future(self._statistics())
+        logging.info("Bridge running (asyncio). Press Ctrl+C to stop.")
+        
+        try:
+            await self._stopped.wait()
+        finally:
+            self.loop.remove_reader(self.serial_fd)
+            stats.cancel()
+            if self._reconnect is not None:
+                self._reconnect.cancel()
+            self.shutdown()
+        return 0
+    
+    def run(self):
+        """Main run loop"""
+        self.setup_logging()
+        logging.info("Starting WTGAHRS2 to OpenCPN Bridge")
+        return asyncio.run(self._run_until_signal())
+    
+    async def _run_until_signal(self) -> int:
+        """run_async() with SIGINT/SIGTERM mapped to stop()"""
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, self.stop)
+        return await self.run_async()
@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+"""
+Throughput benchmarks for the WTGAHRS2 bridge hot paths
+Uses synthetic WitMotion data, no device required
+"""
+
+import math
+import struct
+import time
+from wtgahrs2_parser import WTGAHRS2Parser, WitMotionPacketType, build_packet
+
+
+def synthetic_cycle(i: int) -> bytes:
+    """Build one device output cycle (0x50 time, then 0x51-0x5A)"""
+    angle = int(8000 * math.sin(i / 50.0))
+    return b"".join((
+        build_packet(WitMotionPacketType.TIME, struct.pack('<6BH', 25, 7, 21, 12, (i // 600) % 60, (i // 10) % 60, (i % 10) * 100)),
+        build_packet(WitMotionPacketType.ACCELERATION, struct.pack('<3hH', angle // 8, -angle // 8, 2048, 2512)),
+        build_packet(WitMotionPacketType.ANGULAR_VELOCITY, struct.pack('<3hH', angle // 40, 0, 164, 0)),
+        build_packet(WitMotionPacketType.ANGLE, struct.pack('<3hH', angle // 20, -angle // 30, angle, 0)),
+        build_packet(WitMotionPacketType.MAGNETIC, struct.pack('<3hH', 120, -340, 560, 0)),
+        build_packet(WitMotionPacketType.PRESSURE, struct.pack('<l2H', 101325 + i % 7, 1400, 0)),
+        build_packet(WitMotionPacketType.LONGITUDE_LATITUDE, struct.pack('<2l', -755935000 - i, 364849000 + i)),
+        build_packet(WitMotionPacketType.ALTITUDE_VELOCITY, struct.pack('<2hH2x', 140, 25, 2700)),
+        build_packet(WitMotionPacketType.QUATERNION, struct.pack('<4h', 32000, 100, -200, angle)),
+        build_packet(WitMotionPacketType.GPS_ACCURACY, struct.pack('<4H', 9, 180, 95, 150)),
+    ))
+
+
+def synthetic_capture(cycles: int) -> bytes:
+    """Build a capture of the given number of output cycles"""
+    return b"".join(synthetic_cycle(i) for i in range(cycles))
+
+
+def report(name: str, count: int, unit: str, elapsed: float):
+    """Print a single benchmark result"""
+    print(f"{name:<32} {count / elapsed:>12,.0f} {unit}/s  ({count} in {elapsed:.3f}s)")
+
+
+def bench_parser(cycles: int = 20000, chunk_size: int = 256):
+    """Packets per second through WTGAHRS2Parser.feed"""
+    capture = synthetic_capture(cycles)
+    chunks = [capture[i:i + chunk_size] for i in range(0, len(capture), chunk_size)]
+
+    parser = WTGAHRS2Parser()
+    start = time.perf_counter()
+    for chunk in chunks:
+        for _ in parser.feed(chunk):
+            pass
+    report("parser.feed", parser.stats.packets, "packets", time.perf_counter() - start)
+
+
+def bench_batch(cycles: int = 100000):
+    """Packets per second through the NumPy batch decoder"""
+    from wtgahrs2_batch import decode_buffer
+
+    capture = synthetic_capture(cycles)
+    start = time.perf_counter()
+    decoded = decode_buffer(capture)
+    count = sum(len(records) for records in decoded.values())
+    report(f"batch decode ({len(capture) >> 20} MiB)", count, "packets", time.perf_counter() - start)
+
+
+def bench_snapshot(count: int = 200000):
+    """Immutable WitMotionData snapshots per second"""
+    parser = WTGAHRS2Parser()
+    list(parser.feed(synthetic_capture(1)))
+    data = parser.get_data()
+
+    start = time.perf_counter()
+    history = [data.snapshot() for _ in range(count)]
+    report("WitMotionData.snapshot", len(history), "snapshots", time.perf_counter() - start)
+
+
+class ReferenceStrConverter:
+    """The str NMEA path before bytes encoding, kept as a benchmark baseline
+
+    Per-character ord() checksum, f-string sentences, and + CRLF and
+    encode() per sentence when sending.  Output matches NMEAConverter.
+    """
+
+    def __init__(self, magnetic_declination: float = 0.0):
+        self.magnetic_declination = magnetic_declination
+
+    def format_nmea(self, sentence: str) -> str:
+        """$sentence*hh with a per-character checksum"""
+        checksum = 0
+        for char in sentence:
+            checksum ^= ord(char)
+        return f"${sentence}*{checksum:02X}"
+
+    def degrees_to_nmea(self, degrees: float, is_latitude: bool) -> tuple:
+        """Decimal degrees as ('ddmm.mmmm', hemisphere)"""
+        abs_degrees = abs(degrees)
+        deg = int(abs_degrees)
+        minutes = (abs_degrees - deg) * 60.0
+        if is_latitude:
+            return f"{deg:02d}{minutes:07.4f}", 'N' if degrees >= 0 else 'S'
+        return f"{deg:03d}{minutes:07.4f}", 'E' if degrees >= 0 else 'W'
+
+    def generate_all_sentences(self, data) -> list:
+        """Every sentence of the full-telemetry profile as strings"""
+        from datetime import datetime, timezone
+
+        sentences = []
+        if not (data.latitude == 0.0 and data.longitude == 0.0):
+            dt = datetime.fromtimestamp(data.timestamp, tz=timezone.utc)
+            time_str = dt.strftime("%H%M%S.%f")[:-4]
+            date_str = dt.strftime("%d%m%y")
+            lat_str, lat_dir = self.degrees_to_nmea(data.latitude, True)
+            lon_str, lon_dir = self.degrees_to_nmea(data.longitude, False)
+            quality = "1" if data.satellites > 0 else "0"
+            sentences.append(self.format_nmea(
+                f"GPGGA,{time_str},{lat_str},{lat_dir},{lon_str},{lon_dir},"
+                f"{quality},{data.satellites:02d},{data.hdop:.1f},"
+                f"{data.gps_altitude:.1f},M,0.0,M,,"))
+            status = "A" if data.satellites > 0 else "V"
+            sentences.append(self.format_nmea(
+                f"GPRMC,{time_str},{status},{lat_str},{lat_dir},"
+                f"{lon_str},{lon_dir},{data.gps_velocity * 1.94384:.1f},{data.gps_heading:.1f},"
+                f"{date_str},{self.magnetic_declination:.1f},E"))
+        if data.gps_velocity != 0.0:
+            sentences.append(self.format_nmea(
+                f"GPVTG,{data.gps_heading:.1f},T,{data.gps_heading:.1f},M,"
+                f"{data.gps_velocity * 1.94384:.1f},N,{data.gps_velocity * 3.6:.1f},K"))
+        if data.satellites != 0:
+            mode2 = "3" if data.satellites >= 4 else "2"
+            sat_ids = ",".join([f"{i:02d}" for i in range(1, min(data.satellites + 1, 13))])
+            sat_ids += "," * (12 - min(data.satellites, 12))
+            sentences.append(self.format_nmea(
+                f"GPGSA,A,{mode2},{sat_ids},{data.pdop:.1f},{data.hdop:.1f},{data.vdop:.1f}"))
+        heading = data.yaw + 360 if data.yaw < 0 else data.yaw
+        sentences.append(self.format_nmea(f"HCHDM,{heading:.1f},M"))
+        true_heading = (heading + self.magnetic_declination) % 360
+        sentences.append(self.format_nmea(f"HCHDT,{true_heading:.1f},T"))
+        sentences.append(self.format_nmea(f"TIROT,{data.gyro_z * 60.0:.1f},A"))
+        sentences.append(self.format_nmea(f"IIXDR,A,{data.pitch:.1f},D,PTCH"))
+        sentences.append(self.format_nmea(f"IIXDR,A,{data.roll:.1f},D,ROLL"))
+        sentences.append(self.format_nmea(f"IIXDR,P,{data.pressure:.1f},B,BARO"))
+        sentences.append(self.format_nmea(f"IIXDR,C,{data.temperature:.1f},C,TEMP"))
+        sentences.append(self.format_nmea(f"IIXDR,A,{data.acc_x:.2f},M,ACCX"))
+        sentences.append(self.format_nmea(f"IIXDR,A,{data.acc_y:.2f},M,ACCY"))
+        sentences.append(self.format_nmea(f"IIXDR,A,{data.acc_z:.2f},M,ACCZ"))
+        return sentences
+
+
+def bench_nmea(count: int = 20000):
+    """Sentences per second, str generate path vs bytes encode path"""
+    from nmea_converter import NMEAConverter
+
+    parser = WTGAHRS2Parser()
+    frames = list(parser.feed_frames(synthetic_capture(101)))
+    converter = NMEAConverter()
+    reference = ReferenceStrConverter()
+    assert reference.generate_all_sentences(frames[0]) == converter.generate_all_sentences(frames[0])
+
+    # Previous send path: str sentence, then + CRLF and encode per sentence
+    sentences = 0
+    start = time.perf_counter()
+    for i in range(count):
+        for sentence in reference.generate_all_sentences(frames[i % len(frames)]):
+            (sentence + "\r\n").encode('utf-8')
+            sentences += 1
+    report("NMEA str + encode", sentences, "sentences", time.perf_counter() - start)
+
+    sentences = 0
+    start = time.perf_counter()
+    for i in range(count):
+        for buffer in converter.encode_profile(frames[i % len(frames)]):
+            sentences += buffer.count(b"\n")
+    report("NMEA bytes encode", sentences, "sentences", time.perf_counter() - start)
+
+
+def bench_udp(count: int = 20000):
+    """Per-sentence datagrams vs coalesced datagrams over loopback UDP"""
+    import socket
+    from nmea_converter import NMEAConverter
+    from output_sinks import UDPNMEAServer
+
+    parser = WTGAHRS2Parser()
+    frames = list(parser.feed_frames(synthetic_capture(101)))
+    converter = NMEAConverter()
+    encoded = [converter.encode_profile(frame) for frame in frames]
+    sentences = sum(buffer.count(b"\n") for buffer in encoded[0])
+
+    receiver = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    receiver.bind(('127.0.0.1', 0))
+    try:
+        for max_datagram in (0, 1400):
+            server = UDPNMEAServer(*receiver.getsockname(), max_datagram=max_datagram)
+            server.start()
+            start = time.perf_counter()
+            cpu = time.process_time()
+            for i in range(count):
+                server.send_batch(encoded[i % len(encoded)])
+            cpu = time.process_time() - cpu
+            report(f"UDP max_datagram={max_datagram}", count * sentences, "sentences",
+                   time.perf_counter() - start)
+            print(f"{'':<32} {server.datagrams_sent / count:>12.1f} sends/frame, "
+                  f"{cpu * 1e6 / count:.1f} us CPU/frame")
+            server.stop()
+    finally:
+        receiver.close()
+
+
+def bench_unix(count: int = 20000):
+    """Delivered frames per second to a draining same-host receiver: UDP loopback vs Unix datagrams"""
+    import os
+    import socket
+    import threading
+    from nmea_converter import NMEAConverter
+    from output_sinks import UDPNMEAServer
+    from unix_sink import UnixDatagramSink, socket_address
+
+    parser = WTGAHRS2Parser()
+    frames = list(parser.feed_frames(synthetic_capture(101)))
+    converter = NMEAConverter()
+    encoded = [converter.encode_profile(frame) for frame in frames]
+
+    def drain(sock, received):
+        """Count bytes until the sender goes quiet"""
+        sock.settimeout(0.2)
+        try:
+            while True:
+                received[0] += len(sock.recv(65536))
+        except socket.timeout:
+            pass
+
+    name = f"@wtgahrs2-bench-{os.getpid()}"
+    cases = (
+        ("UDP loopback max_datagram=1400", socket.AF_INET, ('127.0.0.1', 0),
+         lambda address: UDPNMEAServer(*address, max_datagram=1400)),
+        ("UDP loopback one datagram/frame", socket.AF_INET, ('127.0.0.1', 0),
+         lambda address: UDPNMEAServer(*address, max_datagram=65000)),
+        ("Unix datagram one/frame", socket.AF_UNIX, socket_address(name),
+         lambda address: UnixDatagramSink(name)),
+    )
+    for label, family, bind, make_sink in cases:
+        receiver = socket.socket(family, socket.SOCK_DGRAM)
+        # Room for bursts; Unix datagrams are still capped by max_dgram_qlen
+        receiver.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4 << 20)
+        receiver.bind(bind)
+        received = [0]
+        thread = threading.Thread(target=drain, args=(receiver, received))
+        thread.start()
+        sink = make_sink(receiver.getsockname())
+        sink.open()
+        sent = 0
+        start = time.perf_counter()
+        cpu = time.process_time()
+        for i in range(count):
+            batch = encoded[i % len(encoded)]
+            sink.send_batch(batch)
+            sent += sum(len(buffer) for buffer in batch)
+        elapsed = time.perf_counter() - start
+        cpu = time.process_time() - cpu
+        sink.close()
+        thread.join()
+        receiver.close()
+        # Sends that overflow the receiver fail fast, so compare the cases
+        # by frames actually delivered rather than frames offered
+        delivered = count * received[0] / sent
+        report(label, int(delivered), "delivered frames", elapsed)
+        # CPU covers the sender and the receiving thread
+        print(f"{'':<32} {cpu * 1e6 / max(delivered, 1):>12.1f} us CPU/delivered frame, "
+              f"{received[0] / sent:.1%} of bytes delivered")
+
+
+def bench_shm(count: int = 200000):
+    """Shared-memory state publishes and consistent reads per second"""
+    import os
+    from shm_state import ShmStatePublisher, ShmStateReader
+
+    parser = WTGAHRS2Parser()
+    frames = list(parser.feed_frames(synthetic_capture(101)))
+    publisher = ShmStatePublisher(f"wtgahrs2-bench-{os.getpid()}")
+    reader = ShmStateReader(publisher.name)
+    try:
+        start = time.perf_counter()
+        for i in range(count):
+            publisher.publish(frames[i % len(frames)])
+        report("shm state publish", count, "frames", time.perf_counter() - start)
+
+        start = time.perf_counter()
+        for _ in range(count):
+            reader.read()
+        report("shm state read", count, "reads", time.perf_counter() - start)
+    finally:
+        reader.close()
+        publisher.close()
+
+
+def bench_ring(cycles: int = 20000, chunk_size: int = 64):
+    """Serial-sized chunks per second through the shared-memory ring"""
+    from shm_ring import SharedRing
+
+    capture = synthetic_capture(cycles)
+    chunks = [capture[i:i + chunk_size] for i in range(0, len(capture), chunk_size)]
+    ring = SharedRing(create=True)
+    consumer = SharedRing(ring.name)
+    try:
+        start = time.perf_counter()
+        for i, chunk in enumerate(chunks):
+            ring.write(chunk)
+            if i % 8 == 7:
+                consumer.read()
+        consumer.read()
+        report(f"ring write+read ({chunk_size} B chunks)", len(chunks), "chunks",
+               time.perf_counter() - start)
+    finally:
+        consumer.close()
+        ring.close()
+
+
+BENCHMARKS = {
+    'parser': bench_parser,
+    'batch': bench_batch,
+    'snapshot': bench_snapshot,
+    'nmea': bench_nmea,
+    'udp': bench_udp,
+    'unix': bench_unix,
+    'shm': bench_shm,
+    'ring': bench_ring,
+}
+
+
+def main():
+    """Run the selected benchmarks"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark WTGAHRS2 bridge hot paths")
+    parser.add_argument('--bench', choices=sorted(BENCHMARKS) + ['all'], default='all',
+                        help='Benchmark to run')
+    args = parser.parse_args()
+
+    for name, bench in BENCHMARKS.items():
+        if args.bench in (name, 'all'):
+            bench()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Bounded, thread-safe queues with overflow policies
+Used between the pipeline stages and in front of every output sink.
+"""
+
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Optional, Tuple
+
+
+# Overflow policies of a full BoundedQueue
+BLOCK = 'block'                    # producer waits for space
+DROP_OLDEST = 'drop-oldest'        # oldest queued item is discarded
+COALESCE_LATEST = 'coalesce-latest'  # whole queue collapses into the new item
+OVERFLOW_POLICIES = (BLOCK, DROP_OLDEST, COALESCE_LATEST)
+
+def parse_queue_spec(value: str) -> Tuple[int, str]:
+    """Parse '64:drop-oldest' into (size, policy)"""
+    size, _, policy = value.partition(':')
+    size = int(size)
+    policy = policy.strip() or BLOCK
+    if size < 1 or policy not in OVERFLOW_POLICIES:
+        raise ValueError(f"Invalid queue spec: {value}")
+    return size, policy
+
+
+@dataclass
+class QueueStats:
+    """Counters of one BoundedQueue"""
+    puts: int = 0
+    gets: int = 0
+    dropped: int = 0
+    coalesced: int = 0
+    blocked: int = 0
+    high_water: int = 0
+
+
+class BoundedQueue:
+    """Thread-safe bounded FIFO with a configurable overflow policy"""
+    
+    def __init__(self, maxsize: int, policy: str = BLOCK,
+                 merge: Optional[Callable[[Any, Any], Any]] = None, name: str = ''):
+        if policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {policy}")
+        self.maxsize = maxsize
+        self.policy = policy
+        # coalesce-latest: merge(older, newer) -> item to queue instead,
+        # folded over every queued item and the new one
+        self.merge = merge
+        self.name = name
+        self.closed = False
+        self.stats = QueueStats()
+        self._items = deque()
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+        self._not_full = threading.Condition(self._lock)
+    
+    def __len__(self) -> int:
+        return len(self._items)
+    
+    def put(self, item) -> bool:
+        """Queue item, applying the overflow policy; False once closed"""
+        with self._lock:
+            if self.closed:
+                return False
+            items = self._items
+            if len(items) >= self.maxsize:
+                if self.policy == DROP_OLDEST:
+                    items.popleft()
+                    self.stats.dropped += 1
+                elif self.policy == COALESCE_LATEST:
+                    # A consumer that fell this far behind only needs the
+                    # latest item (with what it missed merged in)
+                    self.stats.coalesced += len(items)
+                    if self.merge:
+                        merged = items.popleft()
+                        while items:
+                            merged = self.merge(merged, items.popleft())
+                        item = self.merge(merged, item)
+                    items.clear()
+                else:
+                    self.stats.blocked += 1
+                    while len(items) >= self.maxsize and not self.closed:
+                        self._not_full.wait()
+                    if self.closed:
+                        return False
+            items.append(item)
+            self.stats.puts += 1
+            if len(items) > self.stats.high_water:
+                self.stats.high_water = len(items)
+            self._not_empty.notify()
+            return True
+    
+    def get(self):
+        """Next item, waiting for one; None once closed and drained"""
+        with self._lock:
+            while not self._items:
+                if self.closed:
+                    return None
+                self._not_empty.wait()
+            item = self._items.popleft()
+            self.stats.gets += 1
+            self._not_full.notify()
+            return item
+    
+    def close(self):
+        """Stop accepting items and wake all waiting threads"""
+        with self._lock:
+            self.closed = True
+            self._not_empty.notify_all()
+            self._not_full.notify_all()
+    
+    def describe(self) -> str:
+        """One-line depth and overflow summary for the statistics log"""
+        stats = self.stats
+        return (f"{self.name} {len(self)}/{self.maxsize} (max {stats.high_water}, "
+                f"dropped {stats.dropped}, coalesced {stats.coalesced}, blocked {stats.blocked})")
@@ -25,45 +25,44 @@ def capture_gps_movement():
         if ser.in_waiting > 0:
             data = ser.read(ser.in_waiting)
             
-            for byte in data:
-                if parser.process_byte(byte):
-                    current_data = parser.get_data()
+            for _ in parser.feed(data):
+                current_data = parser.get_data()
+                
+                # Only log if we have GPS data and it's different from last reading
+                if (current_data.latitude != 0.0 or current_data.longitude != 0.0):
+                    current_coords = (current_data.latitude, current_data.longitude)
                     
-                    # Only log if we have GPS data and it's different from last reading
-                    if (current_data.latitude != 0.0 or current_data.longitude != 0.0):
-                        current_coords = (current_data.latitude, current_data.longitude)
+                    if last_coords is None or current_coords != last_coords:
+                        timestamp = datetime.now().strftime("%H:%M:%S.%f")[:-3]
+                        
+                        # Calculate distance from previous reading if available
+                        distance_m = 0.0
+                        if last_coords is not None:
+                            lat_diff = current_data.latitude - last_coords[0]
+                            lon_diff = current_data.longitude - last_coords[1]
+                            # Rough distance calculation (not accounting for earth curvature)
+                            distance_m = ((lat_diff * 111320) ** 2 + (lon_diff * 111320 * 0.755) ** 2) ** 0.5
+                        
+                        reading = {
+                            'timestamp': timestamp,
+                            'latitude': current_data.latitude,
+                            'longitude': current_data.longitude,
+                            'altitude': current_data.gps_altitude,
+                            'velocity': current_data.gps_velocity,
+                            'satellites': current_data.satellites,
+                            'distance_from_last': distance_m
+                        }
+                        
+                        readings.append(reading)
+                        
+                        print(f"{timestamp}\t{current_data.latitude:.6f}\t{current_data.longitude:.6f}\t"
+                              f"{current_data.gps_altitude:.1f}m\t{current_data.gps_velocity:.1f}m/s\t{current_data.satellites}")
+                        
+                        if distance_m > 0:
+                            print(f"  -> Distance from last: {distance_m:.1f}m")
+                        
+                        last_coords = current_coords
                         
-                        if last_coords is None or current_coords != last_coords:
-                            timestamp = datetime.now().strftime("%H:%M:%S.%f")[:-3]
-                            
-                            # Calculate distance from previous reading if available
-                            distance_m = 0.0
-                            if last_coords is not None:
-                                lat_diff = current_data.latitude - last_coords[0]
-                                lon_diff = current_data.longitude - last_coords[1]
-                                # Rough distance calculation (not accounting for earth curvature)
-                                distance_m = ((lat_diff * 111320) ** 2 + (lon_diff * 111320 * 0.755) ** 2) ** 0.5
-                            
-                            reading = {
-                                'timestamp': timestamp,
-                                'latitude': current_data.latitude,
-                                'longitude': current_data.longitude,
-                                'altitude': current_data.gps_altitude,
-                                'velocity': current_data.gps_velocity,
-                                'satellites': current_data.satellites,
-                                'distance_from_last': distance_m
-                            }
-                            
-                            readings.append(reading)
-                            
-                            print(f"{timestamp}\t{current_data.latitude:.6f}\t{current_data.longitude:.6f}\t"
-                                  f"{current_data.gps_altitude:.1f}m\t{current_data.gps_velocity:.1f}m/s\t{current_data.satellites}")
-                            
-                            if distance_m > 0:
-                                print(f"  -> Distance from last: {distance_m:.1f}m")
-                            
-                            last_coords = current_coords
-                            
     ser.close()
     
     print("\n" + "=" * 80)
@@ -32,79 +32,71 @@ def debug_raw_data(port='/dev/ttyUSB0', duration=30):
             if ser.in_waiting > 0:
                 data = ser.read(ser.in_waiting)
                 
-                for byte in data:
-                    if parser.process_byte(byte):
-                        packet_count += 1
-                        current_time = time.time()
+                # Consume every packet of the chunk: the parser only keeps
+                # the rest of the chunk and its tail if feed() is exhausted
+                packets = 0
+                for _ in parser.feed(data):
+                    packets += 1
+                packet_count += packets
+                current_time = time.time()
+                
+                # Show GPS data every few seconds, at most once per chunk
+                if packets and current_time - last_debug_time > 3.0:
+                    gps_data = parser.get_data()
+                    
+                    if gps_data.latitude != 0.0 or gps_data.longitude != 0.0:
+                        print(f"\nPacket #{packet_count} at {time.strftime('%H:%M:%S')}:")
+                        print(f"Raw GPS Data:")
+                        print(f"  Latitude: {gps_data.latitude:.8f}°")
+                        print(f"  Longitude: {gps_data.longitude:.8f}°")
+                        print(f"  Satellites: {gps_data.satellites}")
+                        
+                        # Show what this looks like in different formats
+                        print(f"\nDecimal degrees: {gps_data.latitude:.6f}, {gps_data.longitude:.6f}")
+                        
+                        # Show raw values as they would come from device
+                        raw_lat = int(gps_data.latitude * 10000000)
+                        raw_lon = int(gps_data.longitude * 10000000)
+                        print(f"Raw values (×10M): {raw_lon}, {raw_lat}")
+                        
+                        # Show as hex
+                        lat_hex = struct.pack('<l', raw_lat).hex()
+                        lon_hex = struct.pack('<l', raw_lon).hex()
+                        print(f"Hex values: lon={lon_hex}, lat={lat_hex}")
+                        
+                        # Generate NMEA
+                        gga = converter.generate_gga(gps_data)
+                        if gga:
+                            print(f"\nNMEA GGA: {gga}")
                         
-                        # Check if we just processed a GPS coordinate packet
-                        if hasattr(parser, 'buffer') and len(parser.buffer) >= 11:
-                            # Get the last processed packet from buffer
-                            last_packet = bytes(parser.buffer[-11:]) if len(parser.buffer) >= 11 else None
-                        else:
-                            last_packet = None
+                        # Analyze the coordinates
+                        print(f"\nCoordinate Analysis:")
+                        print(f"  Current position: {gps_data.latitude:.4f}°N, {abs(gps_data.longitude):.4f}°W")
                         
-                        # Show GPS data every few seconds
-                        if current_time - last_debug_time > 3.0:
-                            gps_data = parser.get_data()
+                        # Check if this makes sense for Virginia Beach
+                        vb_lat, vb_lon = 36.85, -75.98
+                        lat_diff = abs(gps_data.latitude - vb_lat)
+                        lon_diff = abs(gps_data.longitude - vb_lon)
+                        
+                        print(f"  Virginia Beach: {vb_lat}°N, {abs(vb_lon)}°W")
+                        print(f"  Difference: {lat_diff:.4f}° lat, {lon_diff:.4f}° lon")
+                        
+                        if lat_diff > 5.0 or lon_diff > 5.0:
+                            print(f"  ⚠️  Position seems wrong!")
+                            
+                            # Check if coordinates are swapped
+                            if abs(gps_data.latitude - vb_lon) < 1.0 and abs(gps_data.longitude - vb_lat) < 1.0:
+                                print(f"  💡 Coordinates appear to be swapped!")
                             
-                            if gps_data.latitude != 0.0 or gps_data.longitude != 0.0:
-                                print(f"\nPacket #{packet_count} at {time.strftime('%H:%M:%S')}:")
-                                print(f"Raw GPS Data:")
-                                print(f"  Latitude: {gps_data.latitude:.8f}°")
-                                print(f"  Longitude: {gps_data.longitude:.8f}°")
-                                print(f"  Satellites: {gps_data.satellites}")
-                                
-                                # Show what this looks like in different formats
-                                print(f"\nDecimal degrees: {gps_data.latitude:.6f}, {gps_data.longitude:.6f}")
-                                
-                                # Show raw values as they would come from device
-                                raw_lat = int(gps_data.latitude * 10000000)
-                                raw_lon = int(gps_data.longitude * 10000000)
-                                print(f"Raw values (×10M): {raw_lon}, {raw_lat}")
-                                
-                                # Show as hex
-                                lat_hex = struct.pack('<l', raw_lat).hex()
-                                lon_hex = struct.pack('<l', raw_lon).hex()
-                                print(f"Hex values: lon={lon_hex}, lat={lat_hex}")
-                                
-                                # Generate NMEA
-                                gga = converter.generate_gga(gps_data)
-                                if gga:
-                                    print(f"\nNMEA GGA: {gga}")
-                                
-                                # Analyze the coordinates
-                                print(f"\nCoordinate Analysis:")
-                                print(f"  Current position: {gps_data.latitude:.4f}°N, {abs(gps_data.longitude):.4f}°W")
-                                
-                                # Check if this makes sense for Virginia Beach
-                                vb_lat, vb_lon = 36.85, -75.98
-                                lat_diff = abs(gps_data.latitude - vb_lat)
-                                lon_diff = abs(gps_data.longitude - vb_lon)
-                                
-                                print(f"  Virginia Beach: {vb_lat}°N, {abs(vb_lon)}°W")
-                                print(f"  Difference: {lat_diff:.4f}° lat, {lon_diff:.4f}° lon")
-                                
-                                if lat_diff > 5.0 or lon_diff > 5.0:
-                                    print(f"  ⚠️  Position seems wrong!")
-                                    
-                                    # Check if coordinates are swapped
-                                    if abs(gps_data.latitude - vb_lon) < 1.0 and abs(gps_data.longitude - vb_lat) < 1.0:
-                                        print(f"  💡 Coordinates appear to be swapped!")
-                                    
-                                    # Check if sign is wrong
-                                    if abs(gps_data.latitude - vb_lat) < 1.0 and abs(gps_data.longitude - (-vb_lon)) < 1.0:
-                                        print(f"  💡 Longitude sign appears wrong!")
-                                    
-                                    if abs(gps_data.latitude - (-vb_lat)) < 1.0 and abs(gps_data.longitude - vb_lon) < 1.0:
-                                        print(f"  💡 Latitude sign appears wrong!")
-                                
-                                print("=" * 80)
-                                last_debug_time = current_time
-                                
-                                # Only show first few packets
-                                if packet_count > 5:
-                                    break
+                            # Check if sign is wrong
+                            if abs(gps_data.latitude - vb_lat) < 1.0 and abs(gps_data.longitude - (-vb_lon)) < 1.0:
+                                print(f"  💡 Longitude sign appears wrong!")
+                            
+                            if abs(gps_data.latitude - (-vb_lat)) < 1.0 and abs(gps_data.longitude - vb_lon) < 1.0:
+                                print(f"  💡 Latitude sign appears wrong!")
+                        
+                        print("=" * 80)
+                        last_debug_time = current_time
             
             time.sleep(0.01)
         
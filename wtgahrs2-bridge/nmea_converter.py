@@ -7,22 +7,242 @@ Converts WitMotion sensor data to NMEA 0183 sentences for OpenCPN
 import math
 import time
 from datetime import datetime, timezone
-from typing import List, Optional
-from wtgahrs2_parser import WitMotionData
+from typing import Iterable, List, Optional, Tuple
+from wtgahrs2_parser import WitMotionData, fields_mask
+
+
+# Sentence keys in output order; XDR sentences are keyed by transducer name
+SENTENCE_TYPES = ('GGA', 'RMC', 'VTG', 'GSA', 'HDM', 'HDT', 'ROT',
+                  'PTCH', 'ROLL', 'BARO', 'TEMP', 'ACC')
+
+# Named output profiles (output_profile in config.ini)
+OUTPUT_PROFILES = {
+    # Position, heading and rate of turn only
+    'nav-minimal': ('RMC', 'HDT', 'ROT'),
+    # Everything OpenCPN uses for navigation, no transducer XDRs
+    'navigation': ('GGA', 'RMC', 'VTG', 'GSA', 'HDM', 'HDT', 'ROT'),
+    'full-telemetry': SENTENCE_TYPES,
+}
+
+# WitMotionData fields each sentence is rendered from
+SENTENCE_FIELDS = {
+    'GGA': ('timestamp', 'device_time', 'latitude', 'longitude', 'satellites', 'hdop', 'gps_altitude'),
+    'RMC': ('timestamp', 'device_time', 'latitude', 'longitude', 'satellites', 'gps_velocity', 'gps_heading'),
+    'VTG': ('gps_velocity', 'gps_heading'),
+    'GSA': ('satellites', 'pdop', 'hdop', 'vdop'),
+    'HDM': ('yaw',),
+    'HDT': ('yaw',),
+    'ROT': ('gyro_z',),
+    'PTCH': ('pitch',),
+    'ROLL': ('roll',),
+    'BARO': ('pressure',),
+    'TEMP': ('temperature',),
+    'ACC': ('acc_x', 'acc_y', 'acc_z'),
+}
+
+
+# Knots per metre per second
+KNOTS_PER_MS = 1.94384
+
+# Two-digit uppercase hex for every checksum value
+_HEX = tuple(b"%02X" % value for value in range(256))
+
+# Below this length a per-byte XOR loop beats the integer fold
+_FOLD_MIN_LENGTH = 24
+
+
+def nmea_checksum(body: bytes) -> int:
+    """XOR of all bytes in body (the part between '$' and '*')"""
+    if not _FOLD_MIN_LENGTH <= len(body) <= 128:
+        checksum = 0
+        for byte in body:
+            checksum ^= byte
+        return checksum
+    # Fold the body as one integer: each shift XORs the upper half onto
+    # the lower one until a single byte is left
+    value = int.from_bytes(body, 'little')
+    value ^= value >> 512
+    value ^= value >> 256
+    value ^= value >> 128
+    value ^= value >> 64
+    value ^= value >> 32
+    value ^= value >> 16
+    value ^= value >> 8
+    return value & 0xFF
+
+
+def parse_output_profile(value: str) -> Tuple[str, ...]:
+    """Resolve a profile name or a 'RMC, HDT, ROT' list to sentence keys"""
+    value = value.strip()
+    if value in OUTPUT_PROFILES:
+        return OUTPUT_PROFILES[value]
+    names = tuple(name.strip().upper() for name in value.split(',') if name.strip())
+    unknown = [name for name in names if name not in SENTENCE_TYPES]
+    if unknown or not names:
+        raise ValueError(f"Unknown output profile or sentence types: {value}")
+    return names
+
+
+def _sentence_head(address: str) -> tuple:
+    """Pre-encode '$<address>,' together with its checksum contribution"""
+    head = address.encode('ascii') + b","
+    return b"$" + head, nmea_checksum(head)
+
+
+_GGA = _sentence_head('GPGGA')
+_RMC = _sentence_head('GPRMC')
+_VTG = _sentence_head('GPVTG')
+_GSA = _sentence_head('GPGSA')
+_HDM = _sentence_head('HCHDM')
+_HDT = _sentence_head('HCHDT')
+_ROT = _sentence_head('TIROT')
+_XDR = _sentence_head('IIXDR')
+
+# GSA satellite ID slots for 0-12 satellites in view
+_GSA_SATELLITES = tuple(
+    b",".join([b"%02d" % i for i in range(1, count + 1)] + [b""] * (12 - count))
+    for count in range(13))
+
+
+# NMEA 0183 limit including '$' and CRLF, and the XDR payload that fits
+MAX_SENTENCE_LENGTH = 82
+_MAX_XDR_PAYLOAD = MAX_SENTENCE_LENGTH - len(_XDR[0]) - len(b"*hh\r\n")
+
+# Sentence keys that are XDR transducers
+XDR_TYPES = ('PTCH', 'ROLL', 'BARO', 'TEMP', 'ACC')
+
+
+def pack_xdr(quadruplets: Iterable[bytes]) -> bytes:
+    """Pack XDR transducer quadruplets into as few sentences as fit"""
+    sentences = []
+    payload = b""
+    for quadruplet in quadruplets:
+        if not payload:
+            payload = quadruplet
+        elif len(payload) + 1 + len(quadruplet) <= _MAX_XDR_PAYLOAD:
+            payload += b"," + quadruplet
+        else:
+            sentences.append(_finish(_XDR, payload))
+            payload = quadruplet
+    if payload:
+        sentences.append(_finish(_XDR, payload))
+    return b"".join(sentences)
+
+
+def _finish(head: tuple, payload: bytes) -> bytes:
+    """Complete sentence from a pre-encoded head and its payload fields"""
+    prefix, checksum = head
+    return prefix + payload + b"*" + _HEX[checksum ^ nmea_checksum(payload)] + b"\r\n"
+
+
+def _coordinate(degrees: float, is_latitude: bool) -> bytes:
+    """Encode decimal degrees as NMEA 'ddmm.mmmm,N' or 'dddmm.mmmm,E'"""
+    abs_degrees = abs(degrees)
+    deg = int(abs_degrees)
+    minutes = (abs_degrees - deg) * 60.0
+    if is_latitude:
+        return b"%02d%07.4f,%c" % (deg, minutes, 78 if degrees >= 0 else 83)
+    return b"%03d%07.4f,%c" % (deg, minutes, 69 if degrees >= 0 else 87)
+
+
+def _sentence_str(sentence: Optional[bytes]) -> Optional[str]:
+    """Single encoded sentence as a string without CRLF"""
+    if sentence is None:
+        return None
+    return sentence[:-2].decode('ascii')
+
+
+def _sentence_strs(sentences: bytes) -> List[str]:
+    """Buffer of CRLF-terminated sentences as a list of strings"""
+    return sentences.decode('ascii').split("\r\n")[:-1]
+
+
+class _Emitter:
+    """One compiled output sentence and its change-tracking state"""
+
+    __slots__ = ('name', 'encode', 'dependencies', 'aggregated',
+                 'pending', 'last_output', 'last_sent')
+
+    def __init__(self, name: str, encode, aggregated: bool):
+        self.name = name
+        # Bound encoder, or the transducer when XDRs are aggregated
+        self.encode = encode
+        self.aggregated = aggregated
+        # Fields the sentence depends on, fields changed since it was last
+        # rendered, its last output and when that was last returned
+        self.dependencies = fields_mask(*SENTENCE_FIELDS[name])
+        self.pending = 0
+        self.last_output = None
+        self.last_sent = -math.inf
 
 
 class NMEAConverter:
     """Converts WTGAHRS2 data to NMEA sentences"""
     
-    def __init__(self, magnetic_declination: float = 0.0):
+    def __init__(self, magnetic_declination: float = 0.0, time_source: str = 'host',
+                 resend_interval: float = 1.0, profile: str = 'full-telemetry',
+                 xdr_mode: str = 'single'):
         self.magnetic_declination = magnetic_declination
+        # Clock for GGA/RMC time fields: 'host' receive time or 'device'
+        # time from the TIME packet (falls back to host until it is valid)
+        if time_source not in ('host', 'device'):
+            raise ValueError(f"Unknown time source: {time_source}")
+        self.time_source = time_source
+        # Sentence key -> bytes encoder, see encode_sentences().  Each
+        # returns complete CRLF-terminated sentences ready to send
+        self.encoders = {
+            'GGA': self.encode_gga,
+            'RMC': self.encode_rmc,
+            'VTG': self.encode_vtg,
+            'GSA': self.encode_gsa,
+            'HDM': self.encode_hdm,
+            'HDT': self.encode_hdt,
+            'ROT': self.encode_rot,
+            'PTCH': self.encode_xdr_pitch,
+            'ROLL': self.encode_xdr_roll,
+            'BARO': self.encode_xdr_pressure,
+            'TEMP': self.encode_xdr_temperature,
+            'ACC': self.encode_xdr_acceleration,
+        }
+        # XDR transducer key -> quadruplets ("A,1.5,D,PTCH")
+        self.transducers = {
+            'PTCH': self.xdr_pitch,
+            'ROLL': self.xdr_roll,
+            'BARO': self.xdr_pressure,
+            'TEMP': self.xdr_temperature,
+            'ACC': self.xdr_acceleration,
+        }
+        # XDR output: 'single' sentence per transducer, or 'aggregate'
+        # transducers into as few sentences as fit, after the others
+        if xdr_mode not in ('single', 'aggregate'):
+            raise ValueError(f"Unknown XDR mode: {xdr_mode}")
+        self.xdr_mode = xdr_mode
+        self._aggregated = frozenset(XDR_TYPES if xdr_mode == 'aggregate' else ())
+        # Every sentence compiled once into an emitter with its encoder,
+        # dependency mask and change state bound, so encode_profile() and
+        # encode_changed() do no per-sentence lookups
+        self._emitters = {
+            name: _Emitter(name, self.transducers[name], True) if name in self._aggregated
+            else _Emitter(name, encode, False)
+            for name, encode in self.encoders.items()
+        }
+        self.profile = parse_output_profile(profile)
+        self.emitters = tuple(self._emitters[name] for name in self.profile)
+        # (name, emitter) pairs walked by encode_changed()
+        self._profile_emitters = tuple((emitter.name, emitter) for emitter in self.emitters)
+        # Unchanged sentences are suppressed but repeated at least this
+        # often (seconds); 0 repeats them every time they are due
+        self.resend_interval = resend_interval
+        # Formatted UTC time and date of the last sentence timestamp, see
+        # utc_time_fields(); keyed by centisecond and by day
+        self._time_key = None
+        self._time_field = b""
+        self._day_key = None
+        self._date_field = b""
         
     def calculate_checksum(self, sentence: str) -> str:
         """Calculate NMEA checksum"""
-        checksum = 0
-        for char in sentence:
-            checksum ^= ord(char)
-        return f"{checksum:02X}"
+        return f"{nmea_checksum(sentence.encode('ascii')):02X}"
     
     def format_nmea(self, sentence: str) -> str:
         """Format NMEA sentence with checksum"""
@@ -56,187 +276,298 @@ class NMEAConverter:
         dt = datetime.fromtimestamp(timestamp, tz=timezone.utc)
         return dt.strftime("%d%m%y")
     
-    def generate_gga(self, data: WitMotionData) -> str:
-        """Generate GGA sentence (GPS fix data)"""
+    def utc_time_fields(self, timestamp: float) -> tuple:
+        """Cached (HHMMSS.SS, DDMMYY) bytes for timestamp
+
+        The time is only reformatted when the centisecond changes and the
+        date only when the day changes, so every sentence of a frame (and
+        frames within the same centisecond) share one formatting pass.
+        """
+        seconds = math.floor(timestamp)
+        # Same microsecond rounding as datetime.fromtimestamp(), so the
+        # key changes exactly when format_time() output would
+        key = seconds * 100 + round((timestamp - seconds) * 1e6) // 10000
+        if key != self._time_key:
+            self._time_key = key
+            self._time_field = self.format_time(timestamp).encode('ascii')
+            day = key // 8640000
+            if day != self._day_key:
+                self._day_key = day
+                self._date_field = self.format_date(timestamp).encode('ascii')
+        return self._time_field, self._date_field
+    
+    def sentence_time(self, data: WitMotionData) -> float:
+        """Timestamp used for GGA/RMC time and date fields"""
+        if self.time_source == 'device' and data.device_time:
+            return data.device_time
+        return data.timestamp
+    
+    def encode_gga(self, data: WitMotionData) -> Optional[bytes]:
+        """Encode GGA sentence (GPS fix data)"""
         if data.latitude == 0.0 and data.longitude == 0.0:
             return None
-            
-        time_str = self.format_time(data.timestamp)
-        lat_str, lat_dir = self.degrees_to_nmea(data.latitude, True)
-        lon_str, lon_dir = self.degrees_to_nmea(data.longitude, False)
         
+        time_str = self.utc_time_fields(self.sentence_time(data))[0]
+        satellites = data.satellites
         # Quality indicator: 1 = GPS fix, 2 = DGPS fix
-        quality = "1" if data.satellites > 0 else "0"
-        
-        sentence = (f"GPGGA,{time_str},{lat_str},{lat_dir},{lon_str},{lon_dir},"
-                   f"{quality},{data.satellites:02d},{data.hdop:.1f},"
-                   f"{data.gps_altitude:.1f},M,0.0,M,,")
+        quality = 1 if satellites > 0 else 0
         
-        return self.format_nmea(sentence)
+        payload = b"%s,%s,%s,%d,%02d,%.1f,%.1f,M,0.0,M,," % (
+            time_str, _coordinate(data.latitude, True), _coordinate(data.longitude, False),
+            quality, satellites, data.hdop, data.gps_altitude)
+        return _finish(_GGA, payload)
     
-    def generate_rmc(self, data: WitMotionData) -> str:
-        """Generate RMC sentence (Recommended minimum)"""
+    def encode_rmc(self, data: WitMotionData) -> Optional[bytes]:
+        """Encode RMC sentence (Recommended minimum)"""
         if data.latitude == 0.0 and data.longitude == 0.0:
             return None
-            
-        time_str = self.format_time(data.timestamp)
-        date_str = self.format_date(data.timestamp)
-        lat_str, lat_dir = self.degrees_to_nmea(data.latitude, True)
-        lon_str, lon_dir = self.degrees_to_nmea(data.longitude, False)
         
+        time_str, date_str = self.utc_time_fields(self.sentence_time(data))
         # Status: A = valid, V = invalid
-        status = "A" if data.satellites > 0 else "V"
-        
-        # Speed in knots (convert from m/s)
-        speed_knots = data.gps_velocity * 1.94384
+        status = b"A" if data.satellites > 0 else b"V"
         
-        sentence = (f"GPRMC,{time_str},{status},{lat_str},{lat_dir},"
-                   f"{lon_str},{lon_dir},{speed_knots:.1f},{data.gps_heading:.1f},"
-                   f"{date_str},{self.magnetic_declination:.1f},E")
-        
-        return self.format_nmea(sentence)
+        payload = b"%s,%s,%s,%s,%.1f,%.1f,%s,%.1f,E" % (
+            time_str, status,
+            _coordinate(data.latitude, True), _coordinate(data.longitude, False),
+            data.gps_velocity * KNOTS_PER_MS, data.gps_heading,
+            date_str, self.magnetic_declination)
+        return _finish(_RMC, payload)
     
-    def generate_vtg(self, data: WitMotionData) -> str:
-        """Generate VTG sentence (Track made good and ground speed)"""
-        if data.gps_velocity == 0.0:
+    def encode_vtg(self, data: WitMotionData) -> Optional[bytes]:
+        """Encode VTG sentence (Track made good and ground speed)"""
+        velocity = data.gps_velocity
+        if velocity == 0.0:
             return None
-            
-        speed_knots = data.gps_velocity * 1.94384
-        speed_kmh = data.gps_velocity * 3.6
-        
-        sentence = (f"GPVTG,{data.gps_heading:.1f},T,{data.gps_heading:.1f},M,"
-                   f"{speed_knots:.1f},N,{speed_kmh:.1f},K")
         
-        return self.format_nmea(sentence)
+        heading = data.gps_heading
+        payload = b"%.1f,T,%.1f,M,%.1f,N,%.1f,K" % (
+            heading, heading, velocity * KNOTS_PER_MS, velocity * 3.6)
+        return _finish(_VTG, payload)
     
-    def generate_hdm(self, data: WitMotionData) -> str:
-        """Generate HDM sentence (Heading - Magnetic)"""
+    def encode_hdm(self, data: WitMotionData) -> bytes:
+        """Encode HDM sentence (Heading - Magnetic)"""
         # Use yaw angle as magnetic heading
         heading = data.yaw
         if heading < 0:
             heading += 360
-            
-        sentence = f"HCHDM,{heading:.1f},M"
-        return self.format_nmea(sentence)
+        
+        return _finish(_HDM, b"%.1f,M" % heading)
     
-    def generate_hdt(self, data: WitMotionData) -> str:
-        """Generate HDT sentence (Heading - True)"""
+    def encode_hdt(self, data: WitMotionData) -> bytes:
+        """Encode HDT sentence (Heading - True)"""
         # Convert magnetic heading to true heading
         magnetic_heading = data.yaw
         if magnetic_heading < 0:
             magnetic_heading += 360
-            
+        
         true_heading = magnetic_heading + self.magnetic_declination
         if true_heading >= 360:
             true_heading -= 360
         elif true_heading < 0:
             true_heading += 360
-            
-        sentence = f"HCHDT,{true_heading:.1f},T"
-        return self.format_nmea(sentence)
+        
+        return _finish(_HDT, b"%.1f,T" % true_heading)
+    
+    def encode_rot(self, data: WitMotionData) -> bytes:
+        """Encode ROT sentence (Rate of Turn)"""
+        # Rate of turn in degrees per minute, status A = valid
+        return _finish(_ROT, b"%.1f,A" % (data.gyro_z * 60.0))
+    
+    def xdr_pitch(self, data: WitMotionData) -> tuple:
+        """XDR transducer quadruplet for pitch"""
+        return (b"A,%.1f,D,PTCH" % data.pitch,)
+    
+    def xdr_roll(self, data: WitMotionData) -> tuple:
+        """XDR transducer quadruplet for roll"""
+        return (b"A,%.1f,D,ROLL" % data.roll,)
+    
+    def xdr_pressure(self, data: WitMotionData) -> tuple:
+        """XDR transducer quadruplet for barometric pressure"""
+        return (b"P,%.1f,B,BARO" % data.pressure,)
+    
+    def xdr_temperature(self, data: WitMotionData) -> tuple:
+        """XDR transducer quadruplet for temperature"""
+        return (b"C,%.1f,C,TEMP" % data.temperature,)
+    
+    def xdr_acceleration(self, data: WitMotionData) -> tuple:
+        """XDR transducer quadruplets for acceleration"""
+        return (b"A,%.2f,M,ACCX" % data.acc_x,
+                b"A,%.2f,M,ACCY" % data.acc_y,
+                b"A,%.2f,M,ACCZ" % data.acc_z)
+    
+    def encode_xdr_pitch(self, data: WitMotionData) -> bytes:
+        """Encode XDR sentence for pitch"""
+        return _finish(_XDR, self.xdr_pitch(data)[0])
+    
+    def encode_xdr_roll(self, data: WitMotionData) -> bytes:
+        """Encode XDR sentence for roll"""
+        return _finish(_XDR, self.xdr_roll(data)[0])
+    
+    def encode_xdr_pressure(self, data: WitMotionData) -> bytes:
+        """Encode XDR sentence for barometric pressure"""
+        return _finish(_XDR, self.xdr_pressure(data)[0])
+    
+    def encode_xdr_temperature(self, data: WitMotionData) -> bytes:
+        """Encode XDR sentence for temperature"""
+        return _finish(_XDR, self.xdr_temperature(data)[0])
+    
+    def encode_xdr_acceleration(self, data: WitMotionData) -> bytes:
+        """Encode XDR sentences for acceleration (three sentences in one buffer)"""
+        return b"".join([_finish(_XDR, quadruplet) for quadruplet in self.xdr_acceleration(data)])
+    
+    def encode_gsa(self, data: WitMotionData) -> Optional[bytes]:
+        """Encode GSA sentence (GPS DOP and active satellites)"""
+        satellites = data.satellites
+        if satellites == 0:
+            return None
+        
+        # Mode A = automatic; fix type: 1 = no fix, 2 = 2D, 3 = 3D.
+        # Satellite IDs fill the first of 12 slots
+        payload = b"A,%c,%s,%.1f,%.1f,%.1f" % (
+            51 if satellites >= 4 else 50, _GSA_SATELLITES[min(satellites, 12)],
+            data.pdop, data.hdop, data.vdop)
+        return _finish(_GSA, payload)
+    
+    def generate_gga(self, data: WitMotionData) -> str:
+        """Generate GGA sentence (GPS fix data)"""
+        return _sentence_str(self.encode_gga(data))
+    
+    def generate_rmc(self, data: WitMotionData) -> str:
+        """Generate RMC sentence (Recommended minimum)"""
+        return _sentence_str(self.encode_rmc(data))
+    
+    def generate_vtg(self, data: WitMotionData) -> str:
+        """Generate VTG sentence (Track made good and ground speed)"""
+        return _sentence_str(self.encode_vtg(data))
+    
+    def generate_hdm(self, data: WitMotionData) -> str:
+        """Generate HDM sentence (Heading - Magnetic)"""
+        return _sentence_str(self.encode_hdm(data))
+    
+    def generate_hdt(self, data: WitMotionData) -> str:
+        """Generate HDT sentence (Heading - True)"""
+        return _sentence_str(self.encode_hdt(data))
     
     def generate_rot(self, data: WitMotionData) -> str:
         """Generate ROT sentence (Rate of Turn)"""
-        # Rate of turn in degrees per minute
-        rot_dpm = data.gyro_z * 60.0
-        
-        # Status: A = valid, V = invalid
-        status = "A"
-        
-        sentence = f"TIROT,{rot_dpm:.1f},{status}"
-        return self.format_nmea(sentence)
+        return _sentence_str(self.encode_rot(data))
     
     def generate_xdr_pitch(self, data: WitMotionData) -> str:
         """Generate XDR sentence for pitch"""
-        sentence = f"IIXDR,A,{data.pitch:.1f},D,PTCH"
-        return self.format_nmea(sentence)
+        return _sentence_str(self.encode_xdr_pitch(data))
     
     def generate_xdr_roll(self, data: WitMotionData) -> str:
         """Generate XDR sentence for roll"""
-        sentence = f"IIXDR,A,{data.roll:.1f},D,ROLL"
-        return self.format_nmea(sentence)
+        return _sentence_str(self.encode_xdr_roll(data))
     
     def generate_xdr_pressure(self, data: WitMotionData) -> str:
         """Generate XDR sentence for barometric pressure"""
-        sentence = f"IIXDR,P,{data.pressure:.1f},B,BARO"
-        return self.format_nmea(sentence)
+        return _sentence_str(self.encode_xdr_pressure(data))
     
     def generate_xdr_temperature(self, data: WitMotionData) -> str:
         """Generate XDR sentence for temperature"""
-        sentence = f"IIXDR,C,{data.temperature:.1f},C,TEMP"
-        return self.format_nmea(sentence)
+        return _sentence_str(self.encode_xdr_temperature(data))
     
-    def generate_xdr_acceleration(self, data: WitMotionData) -> str:
+    def generate_xdr_acceleration(self, data: WitMotionData) -> List[str]:
         """Generate XDR sentences for acceleration"""
-        sentences = []
-        sentences.append(self.format_nmea(f"IIXDR,A,{data.acc_x:.2f},M,ACCX"))
-        sentences.append(self.format_nmea(f"IIXDR,A,{data.acc_y:.2f},M,ACCY"))
-        sentences.append(self.format_nmea(f"IIXDR,A,{data.acc_z:.2f},M,ACCZ"))
-        return sentences
+        return _sentence_strs(self.encode_xdr_acceleration(data))
     
     def generate_gsa(self, data: WitMotionData) -> str:
         """Generate GSA sentence (GPS DOP and active satellites)"""
-        if data.satellites == 0:
-            return None
-            
-        # Mode: M = manual, A = automatic
-        mode1 = "A"
-        # Fix type: 1 = no fix, 2 = 2D, 3 = 3D
-        mode2 = "3" if data.satellites >= 4 else "2"
-        
-        # Satellite IDs (up to 12)
-        sat_ids = ",".join([f"{i:02d}" for i in range(1, min(data.satellites + 1, 13))])
-        remaining_slots = 12 - min(data.satellites, 12)
-        if remaining_slots > 0:
-            sat_ids += "," * remaining_slots
-            
-        sentence = (f"GPGSA,{mode1},{mode2},{sat_ids},"
-                   f"{data.pdop:.1f},{data.hdop:.1f},{data.vdop:.1f}")
-        
-        return self.format_nmea(sentence)
+        return _sentence_str(self.encode_gsa(data))
     
-    def generate_all_sentences(self, data: WitMotionData) -> List[str]:
-        """Generate all NMEA sentences from WTGAHRS2 data"""
+    def encode_sentences(self, data: WitMotionData, names: Iterable[str]) -> List[bytes]:
+        """Encode the named NMEA sentences (keys of SENTENCE_TYPES)
+
+        Each item is a ready-to-send buffer of one or more CRLF-terminated
+        sentences.  In aggregate XDR mode the transducers come last, packed
+        into one buffer.
+        """
         sentences = []
+        quadruplets = []
+        for name in names:
+            if name in self._aggregated:
+                quadruplets.extend(self.transducers[name](data))
+                continue
+            output = self.encoders[name](data)
+            if output is not None:
+                sentences.append(output)
+        if quadruplets:
+            sentences.append(pack_xdr(quadruplets))
+        return sentences
+    
+    def encode_profile(self, data: WitMotionData) -> List[bytes]:
+        """Encode every sentence of the output profile"""
+        sentences = []
+        append = sentences.append
+        quadruplets = []
+        for emitter in self.emitters:
+            output = emitter.encode(data)
+            if emitter.aggregated:
+                quadruplets.extend(output)
+            # Position sentences are skipped without a fix
+            elif output is not None:
+                append(output)
+        if quadruplets:
+            append(pack_xdr(quadruplets))
+        return sentences
+    
+    def encode_changed(self, data: WitMotionData, names: Iterable[str],
+                       now: Optional[float] = None) -> List[bytes]:
+        """Encode the named sentences, re-rendering only changed ones
+
+        Call once per frame, even when no sentence is due, so that field
+        changes accumulate for sentences that are sent less often.  A
+        sentence is only re-rendered if one of its input fields changed;
+        if its text is the same as last time it is suppressed until
+        resend_interval has passed.  In aggregate XDR mode the transducers
+        that pass these checks are packed together after the others.
+        Sentences come out in profile order; names outside the output
+        profile are ignored.
+        """
+        if now is None:
+            now = time.monotonic()
+        due = names if isinstance(names, (set, frozenset)) else set(names)
+        changed = data.changed
         
-        # GPS sentences
-        gga = self.generate_gga(data)
-        if gga:
-            sentences.append(gga)
-            
-        rmc = self.generate_rmc(data)
-        if rmc:
-            sentences.append(rmc)
-            
-        vtg = self.generate_vtg(data)
-        if vtg:
-            sentences.append(vtg)
-            
-        gsa = self.generate_gsa(data)
-        if gsa:
-            sentences.append(gsa)
-        
-        # Heading sentences
-        sentences.append(self.generate_hdm(data))
-        sentences.append(self.generate_hdt(data))
-        
-        # Rate of turn
-        sentences.append(self.generate_rot(data))
-        
-        # Attitude sentences
-        sentences.append(self.generate_xdr_pitch(data))
-        sentences.append(self.generate_xdr_roll(data))
-        
-        # Environmental sentences
-        sentences.append(self.generate_xdr_pressure(data))
-        sentences.append(self.generate_xdr_temperature(data))
-        
-        # Acceleration sentences
-        acc_sentences = self.generate_xdr_acceleration(data)
-        if isinstance(acc_sentences, list):
-            sentences.extend(acc_sentences)
-        else:
-            sentences.append(acc_sentences)
-        
-        # Filter out None values
-        return [s for s in sentences if s is not None]
\ No newline at end of file
+        resend_interval = self.resend_interval
+        sentences = []
+        quadruplets = []
+        for name, emitter in self._profile_emitters:
+            if changed:
+                emitter.pending |= changed
+            if name not in due:
+                continue
+            previous = emitter.last_output
+            if emitter.pending & emitter.dependencies:
+                emitter.pending = 0
+                output = emitter.last_output = emitter.encode(data)
+                fresh = output != previous
+            else:
+                output = previous
+                fresh = False
+            if output is None:
+                continue
+            if not fresh and now - emitter.last_sent < resend_interval:
+                continue
+            emitter.last_sent = now
+            if emitter.aggregated:
+                quadruplets.extend(output)
+            else:
+                sentences.append(output)
+        if quadruplets:
+            sentences.append(pack_xdr(quadruplets))
+        return sentences
+    
+    def generate_sentences(self, data: WitMotionData, names: Iterable[str]) -> List[str]:
+        """Generate the named NMEA sentences as strings without CRLF"""
+        return _sentence_strs(b"".join(self.encode_sentences(data, names)))
+    
+    def generate_changed(self, data: WitMotionData, names: Iterable[str],
+                         now: Optional[float] = None) -> List[str]:
+        """String form of encode_changed()"""
+        return _sentence_strs(b"".join(self.encode_changed(data, names, now)))
+    
+    def generate_all_sentences(self, data: WitMotionData) -> List[str]:
+        """Generate all NMEA sentences of the output profile"""
+        return _sentence_strs(b"".join(self.encode_profile(data)))
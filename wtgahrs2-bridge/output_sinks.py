@@ -0,0 +1,438 @@
+#!/usr/bin/env python3
+"""
+Output sinks for the WTGAHRS2 bridge
+Every sink receives batches of encoded, CRLF-terminated NMEA sentences.
+Each one runs behind its own SinkWorker thread and bounded queue, so a slow
+file or network sink never stalls the serial reader or the other sinks.
+"""
+
+import ipaddress
+import logging
+import socket
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+from bounded_queue import BoundedQueue, DROP_OLDEST, parse_queue_spec
+
+
+# Default queue in front of each sink ("size:policy")
+DEFAULT_SINK_QUEUE = '64:drop-oldest'
+
+# Seconds between attempts to open UDP targets that failed (DNS, no route)
+TARGET_RETRY_INTERVAL = 30.0
+
+
+class OutputSink:
+    """Destination for batches of encoded NMEA sentences"""
+    
+    name = 'sink'
+    
+    def open(self) -> bool:
+        """Prepare the sink; False if it cannot be used"""
+        return True
+    
+    def send_batch(self, sentences: List[bytes]):
+        """Write one frame's sentence buffers"""
+        raise NotImplementedError
+    
+    def close(self):
+        """Release the sink"""
+    
+    def describe(self) -> str:
+        """Sink-specific detail for the statistics log"""
+        return ''
+
+
+class UDPNMEAServer(OutputSink):
+    """UDP server for streaming NMEA data to OpenCPN"""
+    
+    name = 'udp'
+    
+    def __init__(self, host: str = "127.0.0.1", port: int = 10110, max_datagram: int = 0,
+                 targets: Optional[List[Tuple[str, int]]] = None, multicast_ttl: int = 1,
+                 interface: str = '', broadcast: bool = False):
+        self.host = host
+        self.port = port
+        # Further (host, port) destinations; each gets the same datagrams.
+        # Multicast groups are recognised by address.
+        self.targets = [(host, port)] + list(targets or [])
+        # Coalesce sentences into datagrams of up to this many bytes
+        # (0 sends one datagram per sentence)
+        self.max_datagram = max_datagram
+        # Multicast hop limit and outgoing interface (local IPv4 address)
+        self.multicast_ttl = multicast_ttl
+        self.interface = interface
+        # Allow broadcast destinations (e.g. 192.168.1.255)
+        self.broadcast = broadcast
+        self.sockets = []
+        self.addresses = []
+        self.socket = None
+        self.running = False
+        # Targets that could not be opened, retried every TARGET_RETRY_INTERVAL
+        self.unavailable: List[Tuple[str, int]] = []
+        self.retry_at = 0.0
+        # Counters (datagrams are counted once per destination)
+        self.datagrams_sent = 0
+        self.bytes_sent = 0
+        
+    def _open_socket(self, host: str, port: int) -> Tuple[socket.socket, tuple]:
+        """UDP socket and resolved address for one destination"""
+        # Resolved once here, not per send
+        address = socket.getaddrinfo(host, port, socket.AF_INET, socket.SOCK_DGRAM)[0][4]
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            if self.broadcast:
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+            if _is_multicast(host):
+                sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, self.multicast_ttl)
+                if self.interface:
+                    sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_IF,
+                                    socket.inet_aton(self.interface))
+        except OSError:
+            sock.close()
+            raise
+        # Not connected: a connected socket keeps the source address it
+        # picked at connect time, which goes stale after a DHCP renew.
+        # sendto() lets routing choose it for every datagram.
+        return sock, address
+    
+    def _open_targets(self, targets: List[Tuple[str, int]]) -> List[Tuple[str, int]]:
+        """Open a socket for each target on its own; returns those that failed"""
+        failed = []
+        for host, port in targets:
+            try:
+                sock, address = self._open_socket(host, port)
+                self.sockets.append(sock)
+                self.addresses.append(address)
+            except OSError as e:
+                failed.append((host, port))
+                if host not in (target[0] for target in self.unavailable):
+                    logging.warning(f"UDP target {host}:{port} unavailable, will retry: {e}")
+        self.retry_at = time.monotonic() + TARGET_RETRY_INTERVAL
+        return failed
+    
+    def start(self):
+        """Start the UDP server
+        
+        A target that cannot be opened (unresolvable name, no route) is
+        skipped and retried later; only failing every target fails.
+        """
+        self.unavailable = self._open_targets(self.targets)
+        if not self.sockets:
+            logging.error("Failed to start UDP server: no target could be opened")
+            self.stop()
+            return False
+        self.socket = self.sockets[0]
+        self.running = True
+        destinations = ", ".join(f"{host}:{port}" for host, port in self.targets
+                                 if (host, port) not in self.unavailable)
+        logging.info(f"UDP NMEA server ready to send to {destinations}")
+        return True
+    
+    def _retry_targets(self):
+        """Try the unavailable targets again"""
+        retried = self.unavailable
+        self.unavailable = self._open_targets(retried)
+        for host, port in retried:
+            if (host, port) not in self.unavailable:
+                logging.info(f"UDP target {host}:{port} is now available")
+    
+    def _send(self, payload: bytes):
+        """Send one datagram to every destination"""
+        if self.unavailable and time.monotonic() >= self.retry_at:
+            self._retry_targets()
+        for sock, address in zip(self.sockets, self.addresses):
+            try:
+                self.bytes_sent += sock.sendto(payload, address)
+                self.datagrams_sent += 1
+            except Exception as e:
+                logging.error(f"Failed to send NMEA: {e}")
+    
+    def send_nmea(self, sentence: str):
+        """Send NMEA sentence via UDP"""
+        if not self.running or not self.sockets:
+            return
+            
+        self._send((sentence + "\r\n").encode('utf-8'))
+        logging.debug(f"Sent: {sentence}")
+    
+    def send_bytes(self, payload: bytes):
+        """Send pre-encoded, CRLF-terminated NMEA sentences via UDP"""
+        if not self.running or not self.sockets:
+            return
+            
+        self._send(payload)
+    
+    def send_batch(self, sentences: List[bytes]):
+        """Send encoded sentences, coalesced into as few datagrams as fit
+
+        Sentence buffers are never split; one larger than max_datagram
+        goes out on its own.
+        """
+        if not self.running or not self.sockets:
+            return
+            
+        limit = self.max_datagram
+        if limit <= 0:
+            for sentence in sentences:
+                self._send(sentence)
+            return
+        
+        parts = []
+        size = 0
+        for sentence in sentences:
+            if size and size + len(sentence) > limit:
+                self._send(b"".join(parts))
+                parts = []
+                size = 0
+            parts.append(sentence)
+            size += len(sentence)
+        if parts:
+            self._send(b"".join(parts))
+    
+    def stop(self):
+        """Stop the UDP server"""
+        self.running = False
+        for sock in self.sockets:
+            sock.close()
+        self.sockets = []
+        self.addresses = []
+        self.socket = None
+    
+    def describe(self) -> str:
+        """Targets that could not be opened"""
+        unavailable = self.unavailable
+        if not unavailable:
+            return ''
+        return "unavailable: " + ", ".join(f"{host}:{port}" for host, port in unavailable)
+    
+    open = start
+    close = stop
+
+
+class FileSink(OutputSink):
+    """Append NMEA sentences to a log file"""
+    
+    name = 'file'
+    
+    def __init__(self, path: str):
+        self.path = path
+        self.file = None
+    
+    def open(self) -> bool:
+        """Open the file for appending"""
+        try:
+            self.file = open(self.path, 'ab')
+        except OSError as e:
+            logging.error(f"Failed to open NMEA log {self.path}: {e}")
+            return False
+        logging.info(f"Writing NMEA to {self.path}")
+        return True
+    
+    def send_batch(self, sentences: List[bytes]):
+        """Append and flush one batch"""
+        self.file.write(b"".join(sentences))
+        self.file.flush()
+    
+    def close(self):
+        """Close the file"""
+        if self.file:
+            self.file.close()
+            self.file = None
+
+
+class StdoutSink(OutputSink):
+    """Write NMEA sentences to standard output"""
+    
+    name = 'stdout'
+    
+    def send_batch(self, sentences: List[bytes]):
+        """Write and flush one batch"""
+        sys.stdout.buffer.write(b"".join(sentences))
+        sys.stdout.buffer.flush()
+
+
+@dataclass
+class SinkStats:
+    """Counters of one SinkWorker"""
+    batches: int = 0
+    bytes: int = 0
+    errors: int = 0
+    # Seconds from submit() until send_batch() returned
+    latency_total: float = 0.0
+    latency_max: float = 0.0
+    
+    @property
+    def latency_mean(self) -> float:
+        """Mean submit-to-sent latency in seconds"""
+        return self.latency_total / self.batches if self.batches else 0.0
+
+
+class SinkWorker:
+    """Feeds one sink from its own thread and bounded queue"""
+    
+    def __init__(self, sink: OutputSink, maxsize: int = 64, policy: str = DROP_OLDEST):
+        self.sink = sink
+        self.queue = BoundedQueue(maxsize, policy, name=sink.name)
+        self.stats = SinkStats()
+        self.thread = None
+    
+    def start(self) -> bool:
+        """Open the sink and start the worker thread"""
+        if not self.sink.open():
+            return False
+        self.thread = threading.Thread(target=self._run, name=f"sink-{self.sink.name}", daemon=True)
+        self.thread.start()
+        return True
+    
+    def submit(self, sentences: List[bytes]) -> bool:
+        """Queue a batch; never blocks unless the queue policy is block"""
+        return self.queue.put((time.monotonic(), sentences))
+    
+    def _run(self):
+        """Worker loop: send queued batches until the queue is closed"""
+        stats = self.stats
+        while True:
+            item = self.queue.get()
+            if item is None:
+                break
+            queued, sentences = item
+            try:
+                self.sink.send_batch(sentences)
+            except Exception as e:
+                stats.errors += 1
+                logging.error(f"Sink {self.sink.name} failed: {e}")
+                continue
+            latency = time.monotonic() - queued
+            stats.batches += 1
+            stats.bytes += sum(len(sentence) for sentence in sentences)
+            stats.latency_total += latency
+            if latency > stats.latency_max:
+                stats.latency_max = latency
+    
+    def stop(self, timeout: float = 2.0):
+        """Drain the queue (up to timeout), then close the sink"""
+        self.queue.close()
+        if self.thread:
+            self.thread.join(timeout)
+        self.sink.close()
+    
+    def describe(self) -> str:
+        """One-line throughput, drop and latency summary for the statistics log"""
+        stats = self.stats
+        summary = (f"{self.sink.name}: {stats.batches} batches, {stats.bytes} bytes, "
+                   f"{self.queue.stats.dropped} dropped, {stats.errors} errors, "
+                   f"latency {stats.latency_mean * 1000:.2f} ms mean / {stats.latency_max * 1000:.2f} ms max")
+        detail = self.sink.describe()
+        return f"{summary}; {detail}" if detail else summary
+
+
+def _is_multicast(host: str) -> bool:
+    """True for an IPv4 multicast group address"""
+    try:
+        return ipaddress.ip_address(host).is_multicast
+    except ValueError:
+        return False
+
+
+def parse_endpoints(value: str) -> List[Tuple[str, int]]:
+    """Parse 'host:port, host:port' (e.g. UDP targets) into (host, port) pairs"""
+    targets = []
+    for item in value.split(','):
+        item = item.strip()
+        if item:
+            host, _, port = item.rpartition(':')
+            if not host:
+                raise ValueError(f"Endpoint needs host:port: {item}")
+            targets.append((host, int(port)))
+    return targets
+
+
+def _udp_sink(argument: str, config: dict) -> OutputSink:
+    """udp (udp_host/udp_port plus udp_targets) or udp:host:port"""
+    host, port = config.get('udp_host', '127.0.0.1'), config.get('udp_port', 10110)
+    targets = parse_endpoints(config.get('udp_targets', ''))
+    if argument:
+        (host, port), targets = parse_endpoints(argument)[0], []
+    return UDPNMEAServer(host=host, port=int(port), targets=targets,
+                         max_datagram=config.get('udp_max_datagram', 0),
+                         multicast_ttl=config.get('udp_multicast_ttl', 1),
+                         interface=config.get('udp_interface', ''),
+                         broadcast=config.get('udp_broadcast', False))
+
+
+def _file_sink(argument: str, config: dict) -> OutputSink:
+    """file:/path/to/nmea.log"""
+    if not argument:
+        raise ValueError("file sink needs a path (file:/path/to/nmea.log)")
+    return FileSink(argument)
+
+
+def _tcp_sink(argument: str, config: dict) -> OutputSink:
+    """tcp (tcp_host/tcp_port) or tcp:host:port"""
+    from tcp_sink import TCPNMEAServer
+    
+    host, port = config.get('tcp_host', '0.0.0.0'), config.get('tcp_port', 10110)
+    if argument:
+        host, port = parse_endpoints(argument)[0]
+    size, policy = parse_queue_spec(config.get('tcp_client_queue', '32:drop-oldest'))
+    return TCPNMEAServer(host=host, port=int(port), client_queue=size, policy=policy)
+
+
+def _unix_sink(argument: str, config: dict) -> OutputSink:
+    """unix:/path/to/socket or unix:@abstract-name (stream server)"""
+    from unix_sink import UnixNMEAServer
+    
+    if not argument:
+        raise ValueError("unix sink needs a socket path (unix:/run/wtgahrs2/nmea.sock)")
+    size, policy = parse_queue_spec(config.get('unix_client_queue', '32:drop-oldest'))
+    return UnixNMEAServer(argument, mode=int(str(config.get('unix_mode', '660')), 8),
+                          client_queue=size, policy=policy)
+
+
+def _unix_dgram_sink(argument: str, config: dict) -> OutputSink:
+    """unix-dgram:/path/to/socket or unix-dgram:@abstract-name"""
+    from unix_sink import UnixDatagramSink
+    
+    if not argument:
+        raise ValueError("unix-dgram sink needs the receiver's socket path")
+    return UnixDatagramSink(argument)
+
+
+# Sink type -> factory(argument after the first ':', bridge config)
+SINK_TYPES: Dict[str, Callable[[str, dict], OutputSink]] = {
+    'udp': _udp_sink,
+    'file': _file_sink,
+    'stdout': lambda argument, config: StdoutSink(),
+    'tcp': _tcp_sink,
+    'unix': _unix_sink,
+    'unix-dgram': _unix_dgram_sink,
+}
+
+
+def register_sink_type(name: str, factory: Callable[[str, dict], OutputSink]):
+    """Make a sink type available to the sinks config key"""
+    SINK_TYPES[name] = factory
+
+
+def create_sinks(config: dict) -> List[OutputSink]:
+    """Build the sinks listed in config['sinks'] (e.g. 'udp, file:nmea.log')"""
+    sinks = []
+    for spec in config.get('sinks', 'udp').split(','):
+        spec = spec.strip()
+        if not spec:
+            continue
+        kind, _, argument = spec.partition(':')
+        if kind not in SINK_TYPES:
+            raise ValueError(f"Unknown sink type: {kind}")
+        sinks.append(SINK_TYPES[kind](argument, config))
+    return sinks
+
+
+def create_workers(sinks: List[OutputSink], queue_spec: Optional[str] = None) -> List[SinkWorker]:
+    """One SinkWorker per sink, each with a queue of queue_spec"""
+    size, policy = parse_queue_spec(queue_spec or DEFAULT_SINK_QUEUE)
+    return [SinkWorker(sink, size, policy) for sink in sinks]
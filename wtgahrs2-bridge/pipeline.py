@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Staged runtime for the WTGAHRS2 bridge
+Reading, parsing and NMEA conversion run in their own threads, connected
+by bounded queues and feeding the per-sink output workers, so a slow stage
+(a stalled sink, a blocking log handler) cannot stop the serial port from
+being drained.
+"""
+
+import logging
+import threading
+import time
+from typing import List
+import serial
+from bounded_queue import BoundedQueue, parse_queue_spec
+from wtgahrs2_bridge import WTGAHRS2Bridge
+from wtgahrs2_parser import WitMotionData
+
+
+# Default queue specs ("size:policy") between the pipeline stages
+DEFAULT_QUEUES = {
+    # Serial chunks: parsing is the cheapest stage, never lose bytes
+    'chunk_queue': '256:block',
+    # Frames: only the latest attitude matters, changes are merged
+    'frame_queue': '4:coalesce-latest',
+}
+
+
+def merge_frames(previous: WitMotionData, latest: WitMotionData) -> WitMotionData:
+    """Coalesce two frames, keeping the changes of both"""
+    latest.changed |= previous.changed
+    return latest
+
+
+class PipelineWTGAHRS2Bridge(WTGAHRS2Bridge):
+    """WTGAHRS2Bridge with reader, framer and converter stages"""
+    
+    def __init__(self, config_file: str = "config.ini"):
+        super().__init__(config_file)
+        self.chunks = self._queue('chunk_queue')
+        self.frames = self._queue('frame_queue', merge=merge_frames)
+        self.queues = (self.chunks, self.frames)
+        self.threads: List[threading.Thread] = []
+    
+    def _queue(self, key: str, merge=None) -> BoundedQueue:
+        """Queue configured by config key (e.g. chunk_queue = 256:block)"""
+        size, policy = parse_queue_spec(self.config.get(key, DEFAULT_QUEUES[key]))
+        return BoundedQueue(size, policy, merge=merge, name=key[:-len('_queue')])
+    
+    def read_stage(self):
+        """Serial port -> chunks"""
+        while self.running:
+            try:
+                data = self.read_serial()
+            except (serial.SerialException, OSError) as e:
+                if not self.running:
+                    break
+                logging.error(f"Serial port error: {e}")
+                self.reconnect_serial()
+                continue
+            except Exception as e:
+                logging.error(f"Error reading serial data: {e}")
+                if not self.running:
+                    break
+                time.sleep(1.0)
+                continue
+            if data:
+                self.chunks.put(data)
+        self.chunks.close()
+    
+    def frame_stage(self):
+        """Chunks -> parser -> frames"""
+        while True:
+            data = self.chunks.get()
+            if data is None:
+                break
+            try:
+                for frame in self.parser.feed_frames(data):
+                    # Shared state sees every frame, before coalescing
+                    self.publish_frame(frame)
+                    self.frames.put(frame)
+            except Exception as e:
+                logging.error(f"Error parsing serial data: {e}")
+        self.frames.close()
+    
+    def convert_stage(self):
+        """Frames -> scheduled NMEA sentence batches -> sink workers"""
+        while True:
+            frame = self.frames.get()
+            if frame is None:
+                break
+            try:
+                sentences = self.convert_frame(frame)
+                if sentences:
+                    self.send_sentences(sentences)
+            except Exception as e:
+                logging.error(f"Error processing sensor data: {e}")
+    
+    def create_threads(self) -> List[threading.Thread]:
+        """One thread per stage plus statistics"""
+        self.threads = [
+            threading.Thread(target=stage, name=stage.__name__, daemon=True)
+            for stage in (self.read_stage, self.frame_stage, self.convert_stage)
+        ]
+        return self.threads + [threading.Thread(target=self.print_statistics, daemon=True)]
+    
+    def log_statistics(self):
+        """Log runtime statistics including queue depths"""
+        super().log_statistics()
+        logging.info("Queues: " + "; ".join(queue.describe() for queue in self.queues))
+    
+    def shutdown(self):
+        """Stop the reader, drain the stages in order, then close devices"""
+        self.running = False
+        # The reader notices within read_timeout; closing the chunk queue
+        # too releases it if it is blocked on a full queue
+        self.chunks.close()
+        for thread in self.threads:
+            thread.join(timeout=2.0)
+        super().shutdown()
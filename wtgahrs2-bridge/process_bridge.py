@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Two-process runtime for the WTGAHRS2 bridge
+A minimal reader process drains the serial port into a shared-memory ring
+(shm_ring.SharedRing); this process parses, converts and feeds the sinks.
+The reader shares no GIL with parsing, statistics or logging, so their
+work can never delay draining the port.
+"""
+
+import logging
+import multiprocessing
+import threading
+from typing import List
+from wtgahrs2_bridge import WTGAHRS2Bridge
+from shm_ring import DEFAULT_RING_SIZE, SharedRing, reader_main
+
+
+# Seconds to wait for the reader process to open the port
+READER_START_TIMEOUT = 10.0
+
+
+class ProcessWTGAHRS2Bridge(WTGAHRS2Bridge):
+    """WTGAHRS2Bridge reading the serial port in a separate process"""
+
+    def __init__(self, config_file: str = "config.ini"):
+        super().__init__(config_file)
+        # Spawned, not forked: the reader starts clean, without the
+        # bridge's threads, sinks or imported modules
+        self.context = multiprocessing.get_context('spawn')
+        self.ring = None
+        self.reader = None
+        self.stop_reader = None
+        self.threads: List[threading.Thread] = []
+
+    def open_serial(self):
+        """Start the reader process and wait until it has opened the port"""
+        wakeup = self.context.Semaphore(0)
+        self.stop_reader = self.context.Event()
+        self.ring = SharedRing(capacity=self.config.get('ring_size', DEFAULT_RING_SIZE),
+                               create=True, wakeup=wakeup)
+        status, child_status = self.context.Pipe(duplex=False)
+        self.reader = self.context.Process(
+            target=reader_main, name='wtgahrs2-reader', daemon=True,
+            args=(self.ring.name, self.config['serial_port'], self.config['baud_rate'],
+                  self.config.get('read_timeout', 1.0), wakeup, self.stop_reader, child_status))
+        self.reader.start()
+        child_status.close()
+        error = "reader process did not start"
+        try:
+            if status.poll(READER_START_TIMEOUT):
+                error = status.recv()
+        except EOFError:
+            error = "reader process exited"
+        status.close()
+        if error is not None:
+            self.stop_reader_process()
+            raise OSError(error)
+        logging.info(f"Reader process {self.reader.pid} connected to {self.config['serial_port']} "
+                     f"at {self.config['baud_rate']} baud, ring of {self.ring.capacity} bytes")
+
+    def read_serial(self) -> bytes:
+        """Wait for the reader process and take everything in the ring
+
+        Returns b"" after read_timeout without data.
+        """
+        if not self.ring.wait(self.config.get('read_timeout', 1.0)):
+            if self.running and not self.reader.is_alive():
+                raise OSError(f"Serial reader process exited with code {self.reader.exitcode}")
+        return self.ring.read()
+
+    def reconnect_serial(self) -> bool:
+        """Restart a reader process that died
+
+        Unplugged devices are reopened by the reader process itself; this
+        only runs if the process exited.
+        """
+        self.stop_reader_process()
+        return super().reconnect_serial()
+
+    def create_threads(self) -> List[threading.Thread]:
+        """Worker threads, kept so shutdown() can wait for them"""
+        self.threads = super().create_threads()
+        return self.threads
+
+    def log_statistics(self):
+        """Log runtime statistics including the ring counters"""
+        super().log_statistics()
+        if self.ring is not None:
+            logging.info(f"Ring: {self.ring.describe()}")
+
+    def stop_reader_process(self):
+        """Stop the reader process and remove the ring"""
+        if self.reader is not None:
+            self.stop_reader.set()
+            # The reader notices within read_timeout
+            self.reader.join(self.config.get('read_timeout', 1.0) + 1.0)
+            if self.reader.is_alive():
+                self.reader.terminate()
+                self.reader.join()
+            self.reader = None
+        if self.ring is not None:
+            self.ring.close()
+            self.ring = None
+
+    def shutdown(self):
+        """Stop the reader process, then the rest of the bridge"""
+        self.running = False
+        if self.stop_reader is not None:
+            self.stop_reader.set()
+        # Threads leave read_serial() within read_timeout; the ring must
+        # stay mapped until they have
+        for thread in self.threads:
+            thread.join(self.config.get('read_timeout', 1.0) + 1.0)
+        self.stop_reader_process()
+        super().shutdown()
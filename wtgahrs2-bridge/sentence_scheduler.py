@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Per-sentence output rate limiting for the WTGAHRS2 bridge
+Each NMEA sentence type gets its own target rate so OpenCPN receives a
+steady, predictable stream instead of every sentence on every frame.
+"""
+
+import time
+from typing import Dict, Iterable, List, Optional
+
+
+# Default target rates (Hz); None means the configured update_rate
+DEFAULT_SENTENCE_RATES: Dict[str, Optional[float]] = {
+    # Heading, rate of turn and attitude track the update rate
+    'HDM': None,
+    'HDT': None,
+    'ROT': None,
+    'PTCH': None,
+    'ROLL': None,
+    # Position and velocity at the GPS fix rate
+    'GGA': 1.0,
+    'RMC': 1.0,
+    'VTG': 1.0,
+    # Slow-changing data
+    'GSA': 1.0,
+    'ACC': 1.0,
+    'BARO': 0.2,
+    'TEMP': 0.2,
+}
+
+# A sentence is sent when a frame arrives slightly before its due time
+# (this fraction of the interval, at most MAX_DUE_TOLERANCE seconds) so
+# frame jitter does not halve the rate
+DUE_TOLERANCE = 0.1
+MAX_DUE_TOLERANCE = 0.02
+
+
+def parse_sentence_rates(value: str) -> Dict[str, float]:
+    """Parse 'HDT:10, GGA:1, ACC:0' into a rate mapping"""
+    rates = {}
+    for item in value.split(','):
+        item = item.strip()
+        if not item:
+            continue
+        name, _, rate = item.partition(':')
+        name = name.strip().upper()
+        if name not in DEFAULT_SENTENCE_RATES:
+            raise ValueError(f"Unknown sentence type in sentence_rates: {item}")
+        try:
+            rates[name] = float(rate)
+        except ValueError:
+            raise ValueError(f"Expected NAME:RATE in sentence_rates, got: {item}") from None
+    return rates
+
+
+class SentenceScheduler:
+    """Decides which sentence types are due on a monotonic clock"""
+
+    def __init__(self, names: Iterable[str], default_rate: float = 10.0,
+                 rates: Optional[Dict[str, float]] = None):
+        self.intervals: Dict[str, float] = {}
+        self.tolerances: Dict[str, float] = {}
+        rates = rates or {}
+        for name in names:
+            rate = rates.get(name, DEFAULT_SENTENCE_RATES.get(name))
+            if rate is None:
+                rate = default_rate
+            # A rate of zero (or less) disables the sentence
+            if rate > 0:
+                self.intervals[name] = 1.0 / rate
+                self.tolerances[name] = min(DUE_TOLERANCE / rate, MAX_DUE_TOLERANCE)
+        self.next_due = {name: 0.0 for name in self.intervals}
+
+    def due(self, now: Optional[float] = None) -> List[str]:
+        """Return the sentence types due now and schedule their next slot"""
+        if now is None:
+            now = time.monotonic()
+        due = []
+        next_due = self.next_due
+        tolerances = self.tolerances
+        for name, interval in self.intervals.items():
+            slot = next_due[name]
+            if now >= slot - tolerances[name]:
+                due.append(name)
+                slot += interval
+                # Fell behind (or first run): restart the grid from now
+                if slot <= now:
+                    slot = now + interval
+                next_due[name] = slot
+        return due
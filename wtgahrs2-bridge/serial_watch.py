@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Serial device hotplug watching for the WTGAHRS2 bridge
+Waits for a device node (e.g. /dev/ttyUSB0 or a /dev/serial/by-id link)
+to appear, woken by inotify on its directory rather than a polling loop.
+Falls back to polling where inotify is not available.
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import time
+from typing import Optional
+
+
+# inotify(7) event masks
+IN_ATTRIB = 0x00000004
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+_WATCH_MASK = IN_ATTRIB | IN_MOVED_TO | IN_CREATE | IN_DELETE_SELF | IN_MOVE_SELF
+
+# Seconds between checks without inotify
+POLL_INTERVAL = 0.2
+
+# Retry delays (seconds) while a returned device node cannot be opened yet
+# (udev may still be applying permissions).  Capped well under a second so
+# a device that becomes usable is reopened within one
+RECONNECT_RETRY = 0.05
+MAX_RECONNECT_RETRY = 0.25
+
+
+def _load_inotify():
+    """libc with inotify, or None"""
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        libc.inotify_init1.argtypes = [ctypes.c_int]
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        libc.inotify_rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+        return libc
+    except (OSError, AttributeError, TypeError):
+        return None
+
+
+_libc = _load_inotify()
+
+
+def _existing_directory(path: str) -> str:
+    """Nearest existing directory above path
+
+    /dev/serial/by-id only exists while a USB serial device is plugged in.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    while not os.path.isdir(directory):
+        directory = os.path.dirname(directory)
+    return directory
+
+
+class DeviceWatcher:
+    """Waits for a device path to exist"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.fd: Optional[int] = None
+        self.directory = None
+        self.wd = -1
+        if _libc is not None:
+            fd = _libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+            if fd >= 0:
+                self.fd = fd
+
+    @property
+    def uses_inotify(self) -> bool:
+        """False when falling back to polling"""
+        return self.fd is not None
+
+    def _watch(self):
+        """Watch the nearest existing directory of the path"""
+        directory = _existing_directory(self.path)
+        if directory == self.directory:
+            return
+        if self.wd >= 0:
+            _libc.inotify_rm_watch(self.fd, self.wd)
+        self.wd = _libc.inotify_add_watch(self.fd, os.fsencode(directory), _WATCH_MASK)
+        self.directory = directory if self.wd >= 0 else None
+
+    def wait(self, timeout: float) -> bool:
+        """True as soon as the path exists, False after timeout"""
+        deadline = time.monotonic() + timeout
+        while True:
+            if self.fd is not None:
+                # Armed before checking, so a node created in between is not missed
+                self._watch()
+            if os.path.exists(self.path):
+                return True
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            if self.fd is not None and self.wd >= 0:
+                if select.select([self.fd], [], [], remaining)[0]:
+                    try:
+                        while os.read(self.fd, 4096):
+                            pass
+                    except BlockingIOError:
+                        pass
+            else:
+                time.sleep(min(POLL_INTERVAL, remaining))
+
+    def close(self):
+        """Release the inotify descriptor"""
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+Shared-memory single-producer/single-consumer byte ring for the WTGAHRS2 bridge
+A minimal reader process drains the serial port into the ring; the bridge
+process parses, converts and sends.  Neither side ever takes a lock: the
+producer only advances `head`, the consumer only advances `tail`.  When
+the consumer falls behind and the ring is full, the producer drops the
+incoming chunk (and counts it) instead of waiting, so the serial port is
+always drained.
+
+Block layout (native byte order), producer and consumer fields on their
+own cache lines:
+
+    offset  field
+    0       magic b'WTGR', layout version, capacity
+    64      head (bytes ever written), overflow bytes, overflow chunks,
+            chunks written, high water (most bytes buffered at once)
+    128     tail (bytes ever read), max lag (most bytes read at once),
+            torn chunks
+    192     data, capacity bytes
+
+Each chunk is stored as a record: its length and a CRC-32 seeded with
+the record's position, then the bytes.  Python cannot issue memory
+barriers; on weakly ordered CPUs (ARM) a consumer could see `head`
+before the bytes behind it, and bytes left from the previous lap are
+valid WitMotion packets that the parser would happily accept again.
+The consumer therefore checks every record and re-reads it until it
+matches; one that never does is counted as torn and skipped.
+"""
+
+import gc
+import logging
+import signal
+import struct
+import time
+import zlib
+from multiprocessing import shared_memory
+from typing import Optional
+from shm_state import _attach, _created
+
+
+MAGIC = b'WTGR'
+LAYOUT_VERSION = 2
+# Default ring capacity: over 60 seconds of data at 9600 baud
+DEFAULT_RING_SIZE = 65536
+
+_HEADER = struct.Struct('=4sHxxQ')
+_PRODUCER = struct.Struct('=5Q')
+_CONSUMER = struct.Struct('=3Q')
+# Chunk record header: payload length, CRC-32 seeded with the position
+_RECORD = struct.Struct('=II')
+_PRODUCER_OFFSET = 64
+_CONSUMER_OFFSET = 128
+DATA_OFFSET = 192
+
+# Re-reads of a record that does not match yet before it counts as torn
+_RECORD_RETRIES = 100
+
+
+class SharedRing:
+    """SPSC byte ring in a multiprocessing.shared_memory block
+
+    Create it in one process (create=True, name chosen by the OS unless
+    given) and attach in the other by name; a multiprocessing child of the
+    creator passes shared_tracker (see shm_state._attach).  `wakeup` is an
+    optional multiprocessing semaphore released after each write, so the
+    consumer can sleep in wait() instead of polling.
+    """
+
+    def __init__(self, name: Optional[str] = None, capacity: int = DEFAULT_RING_SIZE,
+                 create: bool = False, wakeup=None, shared_tracker: bool = False):
+        self.wakeup = wakeup
+        self.owner = create
+        if create:
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=DATA_OFFSET + capacity)
+            _created.add(self.shm.name)
+            _HEADER.pack_into(self.shm.buf, 0, MAGIC, LAYOUT_VERSION, capacity)
+        else:
+            self.shm = _attach(name, shared_tracker)
+        self.buf = self.shm.buf
+        magic, version, self.capacity = _HEADER.unpack_from(self.buf, 0)
+        if magic != MAGIC or version != LAYOUT_VERSION:
+            self.close()
+            raise ValueError(f"Shared memory block {name} is not a ring buffer")
+        self.name = self.shm.name
+        # Each side keeps its own position locally and only publishes it
+        (self.head, self.overflow_bytes, self.overflow_chunks,
+         self.chunks, self.high_water) = _PRODUCER.unpack_from(self.buf, _PRODUCER_OFFSET)
+        self.tail, self.max_lag, self.torn = _CONSUMER.unpack_from(self.buf, _CONSUMER_OFFSET)
+
+    def _put(self, position: int, data: bytes):
+        """Copy data into the ring at an absolute position, wrapping"""
+        offset = position % self.capacity
+        first = min(len(data), self.capacity - offset)
+        self.buf[DATA_OFFSET + offset:DATA_OFFSET + offset + first] = data[:first]
+        if first < len(data):
+            self.buf[DATA_OFFSET:DATA_OFFSET + len(data) - first] = data[first:]
+
+    def _get(self, position: int, size: int) -> bytes:
+        """Copy size bytes out of the ring from an absolute position, wrapping"""
+        offset = position % self.capacity
+        first = min(size, self.capacity - offset)
+        data = bytes(self.buf[DATA_OFFSET + offset:DATA_OFFSET + offset + first])
+        if first < size:
+            data += bytes(self.buf[DATA_OFFSET:DATA_OFFSET + size - first])
+        return data
+
+    # Producer side
+
+    def write(self, data: bytes) -> bool:
+        """Append a chunk; False (and counted as overflow) if it does not fit"""
+        size = _RECORD.size + len(data)
+        head = self.head
+        used = head - _CONSUMER.unpack_from(self.buf, _CONSUMER_OFFSET)[0]
+        if size > self.capacity - used:
+            self.overflow_bytes += len(data)
+            self.overflow_chunks += 1
+            _PRODUCER.pack_into(self.buf, _PRODUCER_OFFSET, head, self.overflow_bytes,
+                                self.overflow_chunks, self.chunks, self.high_water)
+            return False
+        self._put(head, _RECORD.pack(len(data), zlib.crc32(data, head & 0xFFFFFFFF)) + data)
+        self.head = head + size
+        self.chunks += 1
+        if used + size > self.high_water:
+            self.high_water = used + size
+        # Publishing head last makes the bytes visible to the consumer
+        _PRODUCER.pack_into(self.buf, _PRODUCER_OFFSET, self.head, self.overflow_bytes,
+                            self.overflow_chunks, self.chunks, self.high_water)
+        if self.wakeup is not None:
+            self.wakeup.release()
+        return True
+
+    # Consumer side
+
+    @staticmethod
+    def _check(records: bytes, offset: int, position: int) -> Optional[bytes]:
+        """Payload of the record at offset in records (ring position), if intact"""
+        length, crc = _RECORD.unpack_from(records, offset)
+        start = offset + _RECORD.size
+        if length > len(records) - start:
+            return None
+        data = records[start:start + length]
+        if zlib.crc32(data, position & 0xFFFFFFFF) != crc:
+            return None
+        return data
+
+    def read(self) -> bytes:
+        """Take everything buffered (b"" if empty)"""
+        tail = self.tail
+        head = _PRODUCER.unpack_from(self.buf, _PRODUCER_OFFSET)[0]
+        size = head - tail
+        if not size:
+            return b""
+        if size > self.max_lag:
+            self.max_lag = size
+        records = self._get(tail, size)
+        chunks = []
+        offset = 0
+        while offset < size:
+            data = self._check(records, offset, tail + offset)
+            retries = _RECORD_RETRIES
+            while data is None and retries:
+                # Not visible yet on this CPU; give the producer's stores time
+                time.sleep(0)
+                records = self._get(tail, size)
+                data = self._check(records, offset, tail + offset)
+                retries -= 1
+            if data is None:
+                # Skip to head; the parser resyncs on the next packet
+                self.torn += 1
+                break
+            chunks.append(data)
+            offset += _RECORD.size + len(data)
+        self.tail = head
+        _CONSUMER.pack_into(self.buf, _CONSUMER_OFFSET, self.tail, self.max_lag, self.torn)
+        return b"".join(chunks)
+
+    def wait(self, timeout: float) -> bool:
+        """Sleep until the producer writes (True) or timeout passes (False)
+
+        The producer releases once per chunk; the permits of every chunk
+        written so far are drained here, before the read that takes them,
+        so the next wait() sleeps instead of waking to an empty ring.
+        """
+        if not self.wakeup.acquire(timeout=timeout):
+            return False
+        while self.wakeup.acquire(False):
+            pass
+        return True
+
+    def stats(self) -> dict:
+        """Producer and consumer counters as last published"""
+        head, overflow_bytes, overflow_chunks, chunks, high_water = \
+            _PRODUCER.unpack_from(self.buf, _PRODUCER_OFFSET)
+        tail, max_lag, torn = _CONSUMER.unpack_from(self.buf, _CONSUMER_OFFSET)
+        return {'written': head, 'read': tail, 'buffered': head - tail, 'chunks': chunks,
+                'overflow_bytes': overflow_bytes, 'overflow_chunks': overflow_chunks,
+                'high_water': high_water, 'max_lag': max_lag, 'torn': torn}
+
+    def describe(self) -> str:
+        """One-line summary for the statistics log"""
+        stats = self.stats()
+        return (f"{stats['written']} bytes in {stats['chunks']} chunks, "
+                f"{stats['buffered']}/{self.capacity} buffered (high water {stats['high_water']}, "
+                f"max lag {stats['max_lag']}), overflow {stats['overflow_bytes']} bytes "
+                f"in {stats['overflow_chunks']} chunks, {stats['torn']} torn")
+
+    def close(self):
+        """Detach; the creating side also removes the block"""
+        if self.shm is not None:
+            self.buf = None
+            self.shm.close()
+            if self.owner:
+                self.shm.unlink()
+                _created.discard(self.name)
+            self.shm = None
+
+
+def _reopen(port: str, baud_rate: int, timeout: float, stop):
+    """Wait for a lost device to return and open it; None once stop is set"""
+    import serial
+    from serial_watch import MAX_RECONNECT_RETRY, RECONNECT_RETRY, DeviceWatcher
+
+    logging.warning(f"Serial port {port} lost, waiting for the device to return")
+    lost = time.monotonic()
+    retry = RECONNECT_RETRY
+    watcher = DeviceWatcher(port)
+    try:
+        while not stop.is_set():
+            if not watcher.wait(timeout):
+                retry = RECONNECT_RETRY
+                continue
+            try:
+                serial_port = serial.Serial(port=port, baudrate=baud_rate, timeout=timeout)
+            except (serial.SerialException, OSError):
+                # Node is back but not usable yet (udev permissions)
+                time.sleep(retry)
+                retry = min(retry * 2, MAX_RECONNECT_RETRY)
+                continue
+            logging.warning(f"Serial port {port} reconnected after {time.monotonic() - lost:.2f} s")
+            return serial_port
+    finally:
+        watcher.close()
+    return None
+
+
+def reader_main(ring_name: str, port: str, baud_rate: int, timeout: float,
+                wakeup, stop, status):
+    """Reader process: drain the serial port into the ring until stop is set
+
+    Reports None (port open) or the error message through the status pipe.
+    Reopens the port by itself if the device is unplugged and returns.
+    """
+    import serial
+
+    # Ctrl+C goes to the bridge, which sets stop
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    # Chunks are freed by reference counting; no collector pauses
+    gc.disable()
+    try:
+        serial_port = serial.Serial(port=port, baudrate=baud_rate, timeout=timeout)
+    except Exception as e:
+        status.send(str(e))
+        return
+    ring = SharedRing(ring_name, wakeup=wakeup, shared_tracker=True)
+    status.send(None)
+    status.close()
+    try:
+        while not stop.is_set():
+            try:
+                data = serial_port.read(1)
+                if data:
+                    waiting = serial_port.in_waiting
+                    if waiting:
+                        data += serial_port.read(waiting)
+                    ring.write(data)
+            except (serial.SerialException, OSError) as e:
+                logging.warning(f"Serial port error: {e}")
+                serial_port.close()
+                serial_port = _reopen(port, baud_rate, timeout, stop)
+                if serial_port is None:
+                    break
+    finally:
+        if serial_port is not None:
+            serial_port.close()
+        ring.close()
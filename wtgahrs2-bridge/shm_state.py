@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Shared-memory latest-state publication for the WTGAHRS2 bridge
+The bridge writes every frame into a small multiprocessing.shared_memory
+block; any number of local processes (dashboards, loggers, autopilot
+scripts) read the current WitMotionData in microseconds, without sockets
+or NMEA parsing.
+
+Block layout (native byte order, 8-byte aligned):
+
+    offset  size  field
+    0       4     magic b'WTG1'
+    4       2     layout version (1)
+    6       2     number of fields (len(WITMOTION_FIELDS))
+    8       8     sequence: odd while the writer is updating the block
+    16      8     changed-field bitmask of the frame
+    24      8     host time the frame was published (time.time())
+    32      4     CRC-32 of the field values
+    36      4     padding
+    40      8*n   field values as doubles, in WITMOTION_FIELDS order
+
+Readers use the sequence as a seqlock: a copy taken while the sequence was
+even and unchanged, whose CRC matches, is a complete frame.  The CRC also
+catches torn copies on weakly ordered CPUs (ARM), where Python has no
+memory barriers to order the writer's stores.
+"""
+
+import struct
+import sys
+import time
+import zlib
+from multiprocessing import resource_tracker, shared_memory
+from typing import Optional
+from wtgahrs2_parser import WITMOTION_FIELDS, WitMotionData
+
+
+MAGIC = b'WTG1'
+LAYOUT_VERSION = 1
+DEFAULT_NAME = 'wtgahrs2'
+
+_HEADER = struct.Struct('=4sHHQQdI4x')
+_SEQUENCE = struct.Struct('=Q')
+_FRAME_INFO = struct.Struct('=QdI')
+_SEQUENCE_OFFSET = 8
+_FRAME_INFO_OFFSET = 16
+VALUES_OFFSET = _HEADER.size
+BLOCK_SIZE = VALUES_OFFSET + 8 * len(WITMOTION_FIELDS)
+
+# Blocks created by this process (their tracker registration is kept)
+_created = set()
+
+
+def _attach(name: str, shared_tracker: bool = False) -> shared_memory.SharedMemory:
+    """Attach to an existing block without taking ownership of it
+
+    Before Python 3.13 every attaching process registers the block with
+    its resource tracker, which unlinks it when that process exits and
+    pulls it from under the bridge; the registration is undone here.
+    shared_tracker is for multiprocessing children of the creator: they
+    use its tracker, so the registration is the creator's and is kept.
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        shm = shared_memory.SharedMemory(name=name)
+        if name not in _created and not shared_tracker:
+            resource_tracker.unregister(shm._name, 'shared_memory')
+        return shm
+
+
+class ShmStatePublisher:
+    """Writes the latest frame into a named shared memory block"""
+
+    def __init__(self, name: str = DEFAULT_NAME):
+        self.name = name
+        try:
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=BLOCK_SIZE)
+        except FileExistsError:
+            # Left behind by a bridge that did not shut down cleanly
+            stale = shared_memory.SharedMemory(name=name)
+            stale.unlink()
+            stale.close()
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=BLOCK_SIZE)
+        _created.add(name)
+        self.buf = self.shm.buf
+        self.sequence = 0
+        _HEADER.pack_into(self.buf, 0, MAGIC, LAYOUT_VERSION, len(WITMOTION_FIELDS), 0, 0, 0.0, 0)
+        self.frames_published = 0
+
+    def publish(self, data: WitMotionData):
+        """Replace the published frame"""
+        buf = self.buf
+        raw = data.to_bytes()
+        sequence = self.sequence + 1
+        _SEQUENCE.pack_into(buf, _SEQUENCE_OFFSET, sequence)
+        buf[VALUES_OFFSET:BLOCK_SIZE] = raw
+        _FRAME_INFO.pack_into(buf, _FRAME_INFO_OFFSET, data.changed, time.time(), zlib.crc32(raw))
+        self.sequence = sequence + 1
+        _SEQUENCE.pack_into(buf, _SEQUENCE_OFFSET, self.sequence)
+        self.frames_published += 1
+
+    def close(self):
+        """Release and remove the block"""
+        if self.shm is not None:
+            self.buf = None
+            self.shm.close()
+            self.shm.unlink()
+            self.shm = None
+            _created.discard(self.name)
+
+
+class ShmStateReader:
+    """Reads the latest frame published by a running bridge"""
+
+    def __init__(self, name: str = DEFAULT_NAME):
+        self.shm = _attach(name)
+        self.buf = self.shm.buf
+        magic, version, fields = _HEADER.unpack_from(self.buf, 0)[:3]
+        if magic != MAGIC or version != LAYOUT_VERSION or fields != len(WITMOTION_FIELDS):
+            self.close()
+            raise ValueError(f"Shared memory block {name} has an unknown layout")
+        # Frame info of the last successful read()
+        self.published = 0.0
+        self.torn_reads = 0
+
+    @property
+    def generation(self) -> int:
+        """Number of frames published so far; cheap change detection"""
+        return _SEQUENCE.unpack_from(self.buf, _SEQUENCE_OFFSET)[0] // 2
+
+    def read(self, retries: int = 1000) -> Optional[WitMotionData]:
+        """Consistent copy of the latest frame, or None before the first one
+
+        Raises TimeoutError if every attempt overlapped an update.
+        """
+        buf = self.buf
+        for _ in range(retries):
+            before = _SEQUENCE.unpack_from(buf, _SEQUENCE_OFFSET)[0]
+            if before == 0:
+                return None
+            if not before & 1:
+                raw = bytes(buf[VALUES_OFFSET:BLOCK_SIZE])
+                changed, published, crc = _FRAME_INFO.unpack_from(buf, _FRAME_INFO_OFFSET)
+                if _SEQUENCE.unpack_from(buf, _SEQUENCE_OFFSET)[0] == before and zlib.crc32(raw) == crc:
+                    data = WitMotionData.from_bytes(raw)
+                    data.changed = changed
+                    self.published = published
+                    return data
+            self.torn_reads += 1
+            # Let a writer that was interrupted mid-update finish
+            time.sleep(0)
+        raise TimeoutError("Shared memory state kept changing during read")
+
+    def close(self):
+        """Detach from the block (it stays for other readers)"""
+        if self.shm is not None:
+            self.buf = None
+            self.shm.close()
+            self.shm = None
+
+
+def main():
+    """Print the current state published by a running bridge"""
+    name = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_NAME
+    reader = ShmStateReader(name)
+    try:
+        data = reader.read()
+        if data is None:
+            print("No frame published yet")
+            return
+        print(f"Frame {reader.generation}, {time.time() - reader.published:.3f}s old")
+        for field, value in data.as_dict().items():
+            print(f"{field:<14} {value}")
+    finally:
+        reader.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+TCP NMEA server sink for the WTGAHRS2 bridge
+Serves the NMEA stream to any number of TCP clients (OpenCPN, chartplotter
+apps) from one asyncio event loop.  Each frame is joined once and the same
+bytes object is queued to every client; a client that falls behind only
+loses its own frames.
+
+The server runs its own event loop thread, also under the asyncio runtime.
+Sinks are opened and closed synchronously (OutputSink.open()/close(), which
+the asyncio runtime calls from its loop thread) and fed from their sink
+worker thread, so waiting on the bridge's loop would deadlock; and client
+writes stay off the loop that reads the serial port.
+"""
+
+import asyncio
+import logging
+import socket
+import threading
+from collections import deque
+from typing import List
+from bounded_queue import COALESCE_LATEST, DROP_OLDEST
+from output_sinks import OutputSink
+
+
+class _TCPClient:
+    """One connected client and its bounded frame queue"""
+    
+    def __init__(self, writer: asyncio.StreamWriter, maxsize: int, policy: str):
+        self.writer = writer
+        self.peer = writer.get_extra_info('peername')
+        self.maxsize = maxsize
+        self.policy = policy
+        self.pending = deque()
+        self.ready = asyncio.Event()
+        self.dropped = 0
+    
+    def push(self, payload: bytes) -> int:
+        """Queue a frame, dropping or coalescing if the client is behind
+
+        Returns the number of frames dropped to make room.
+        """
+        pending = self.pending
+        dropped = 0
+        if len(pending) >= self.maxsize:
+            if self.policy == COALESCE_LATEST:
+                # Only the newest frame is worth sending to a late client
+                dropped = len(pending)
+                pending.clear()
+            else:
+                pending.popleft()
+                dropped = 1
+            self.dropped += dropped
+        pending.append(payload)
+        self.ready.set()
+        return dropped
+    
+    async def run(self):
+        """Write queued frames until the connection fails"""
+        pending = self.pending
+        while True:
+            await self.ready.wait()
+            self.ready.clear()
+            frames = list(pending)
+            pending.clear()
+            self.writer.writelines(frames)
+            # Waits while the transport buffer is above its limit; frames
+            # arriving meanwhile pile up in pending and hit the policy
+            await self.writer.drain()
+
+
+async def _wait_eof(reader: asyncio.StreamReader):
+    """Discard client input until it hangs up"""
+    while await reader.read(1024):
+        pass
+
+
+class TCPNMEAServer(OutputSink):
+    """TCP server sink streaming NMEA sentences to many clients"""
+    
+    name = 'tcp'
+    
+    def __init__(self, host: str = '0.0.0.0', port: int = 10110, client_queue: int = 32,
+                 policy: str = DROP_OLDEST, write_buffer: int = 16384, send_buffer: int = 65536):
+        if policy not in (DROP_OLDEST, COALESCE_LATEST):
+            raise ValueError(f"Unsupported TCP client queue policy: {policy}")
+        self.host = host
+        self.port = port
+        # Frames queued per client, and what to do when that is exceeded
+        self.client_queue = client_queue
+        self.policy = policy
+        # Backlog allowed per client before it counts as behind: asyncio
+        # transport buffer, and kernel socket send buffer (SO_SNDBUF),
+        # which also bounds how stale a slow client's stream can get
+        self.write_buffer = write_buffer
+        self.send_buffer = send_buffer
+        self.loop = None
+        self.server = None
+        self.thread = None
+        self.clients = set()
+        self._handlers = set()
+        # Counters
+        self.clients_accepted = 0
+        self.frames_sent = 0
+        self.frames_dropped = 0
+    
+    def open(self) -> bool:
+        """Start listening on the server's own event loop thread"""
+        self.loop = asyncio.new_event_loop()
+        started = threading.Event()
+        self.thread = threading.Thread(target=self._run_loop, args=(started,),
+                                       name='sink-tcp', daemon=True)
+        self.thread.start()
+        started.wait()
+        if self.server is None:
+            self.thread.join()
+            return False
+        logging.info(f"{self.name.upper()} NMEA server listening on {self.address}")
+        return True
+    
+    @property
+    def address(self) -> str:
+        """Listening address for log messages"""
+        return f"{self.host}:{self.port}"
+    
+    async def _listen(self) -> asyncio.AbstractServer:
+        """Create the listening server (event loop thread)"""
+        server = await asyncio.start_server(self._handle_client, self.host, self.port,
+                                            reuse_address=True)
+        # Port 0 picks a free port; report the real one
+        self.port = server.sockets[0].getsockname()[1]
+        return server
+    
+    def _run_loop(self, started: threading.Event):
+        """Event loop thread"""
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.server = self.loop.run_until_complete(self._listen())
+        except OSError as e:
+            logging.error(f"Failed to start {self.name.upper()} server on {self.address}: {e}")
+        started.set()
+        if self.server is not None:
+            self.loop.run_forever()
+        self.loop.close()
+    
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Serve one client until it disconnects"""
+        writer.transport.set_write_buffer_limits(high=self.write_buffer)
+        if self.send_buffer:
+            writer.get_extra_info('socket').setsockopt(
+                socket.SOL_SOCKET, socket.SO_SNDBUF, self.send_buffer)
+        client = _TCPClient(writer, self.client_queue, self.policy)
+        self.clients.add(client)
+        self._handlers.add(asyncio.current_task())
+        self.clients_accepted += 1
+        logging.info(f"{self.name.upper()} client connected: {client.peer or self.address}")
+        tasks = (asyncio.ensure_future(client.run()), asyncio.ensure_future(_wait_eof(reader)))
+        try:
+            # Ends on hang-up (EOF) or when a write fails
+            await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            self.clients.discard(client)
+            self._handlers.discard(asyncio.current_task())
+            writer.close()
+            logging.info(f"{self.name.upper()} client disconnected: {client.peer or self.address}")
+    
+    def _broadcast(self, payload: bytes):
+        """Queue one frame to every client (event loop thread)"""
+        dropped = 0
+        for client in self.clients:
+            dropped += client.push(payload)
+        # A running total, so describe() never has to walk the clients
+        self.frames_dropped += dropped
+        self.frames_sent += 1
+    
+    def send_batch(self, sentences: List[bytes]):
+        """Hand one frame to the event loop; never waits for clients"""
+        if self.server is not None:
+            self.loop.call_soon_threadsafe(self._broadcast, b"".join(sentences))
+    
+    def describe(self) -> str:
+        """Client count and frames dropped for slow clients
+        
+        Runs on the statistics thread: it only reads counters the event
+        loop keeps, never the client set the loop is changing.
+        """
+        return f"{len(self.clients)} clients, {self.frames_dropped} frames dropped for slow clients"
+    
+    async def _stop(self):
+        """Stop accepting and disconnect every client"""
+        self.server.close()
+        handlers = list(self._handlers)
+        # Dropping the connections ends each handler on its own
+        for client in list(self.clients):
+            client.writer.transport.abort()
+        await asyncio.gather(*handlers, return_exceptions=True)
+        await self.server.wait_closed()
+    
+    def close(self, timeout: float = 2.0):
+        """Shut the server and its event loop down"""
+        if self.server is None:
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self._stop(), self.loop).result(timeout)
+        except Exception as e:
+            logging.warning(f"TCP server did not stop cleanly: {e}")
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(timeout)
+        self.server = None
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Tests for the asyncio bridge runtime using a pseudo-terminal as the device
+"""
+
+import asyncio
+import os
+import pty
+import socket
+import tty
+from async_bridge import AsyncWTGAHRS2Bridge
+from benchmark import synthetic_capture
+
+
+async def run_bridge():
+    """Feed a pty through the asyncio bridge and collect the UDP output"""
+    master, slave = pty.openpty()
+    tty.setraw(slave)
+    receiver = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    receiver.bind(('127.0.0.1', 0))
+    receiver.setblocking(False)
+
+    bridge = AsyncWTGAHRS2Bridge('/nonexistent.ini')
+    host, port = receiver.getsockname()
+    bridge.config.update({'serial_port': os.ttyname(slave), 'udp_host': host, 'udp_port': port})
+    loop = asyncio.get_running_loop()
+    task = asyncio.ensure_future(bridge.run_async())
+    try:
+        await asyncio.sleep(0.05)
+        os.write(master, synthetic_capture(3))
+        datagram = await asyncio.wait_for(loop.sock_recv(receiver, 4096), 2.0)
+        bridge.stop()
+        result = await asyncio.wait_for(task, 2.0)
+    finally:
+        os.close(master)
+        os.close(slave)
+        receiver.close()
+    return bridge, datagram, result
+
+
+def test_async_bridge_end_to_end():
+    """Serial bytes become NMEA datagrams, and stop() shuts the loop down"""
+    bridge, datagram, result = asyncio.run(run_bridge())
+
+    assert result == 0
+    assert not bridge.running and not bridge.serial_port.is_open
+    assert datagram.startswith(b"$") and datagram.endswith(b"\r\n")
+    assert bridge.parser.stats.frames >= 1
+    assert bridge.nmea_sentences_sent > 0
+
+
+if __name__ == "__main__":
+    test_async_bridge_end_to_end()
+    print("All asyncio bridge tests passed")
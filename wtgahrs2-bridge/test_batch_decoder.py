@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Check the NumPy batch decoder against the streaming parser
+"""
+
+import random
+import tracemalloc
+import pytest
+from benchmark import synthetic_capture
+
+# NumPy is optional (requirements-batch.txt)
+pytest.importorskip("numpy")
+from wtgahrs2_batch import PACKET_DTYPES, decode_buffer
+from wtgahrs2_parser import WTGAHRS2Parser, WitMotionPacketType
+
+
+def corrupted_capture(cycles=300, seed=1):
+    """Synthetic capture with dropped, inserted and flipped bytes"""
+    rng = random.Random(seed)
+    data = bytearray(synthetic_capture(cycles))
+    for _ in range(cycles // 3):
+        i = rng.randrange(len(data))
+        action = rng.randrange(3)
+        if action == 0:
+            del data[i]
+        elif action == 1:
+            data.insert(i, rng.choice((0x55, rng.randrange(256))))
+        else:
+            data[i] ^= 1 << rng.randrange(8)
+    return bytes(data)
+
+
+def test_batch_matches_streaming_parser():
+    """Every field decoded in batch equals the streaming parser's value"""
+    capture = corrupted_capture()
+    decoded = decode_buffer(capture)
+
+    parser = WTGAHRS2Parser(resync=True)
+    seen = {packet_type: [] for packet_type in PACKET_DTYPES}
+    for packet_type in parser.feed(capture):
+        data = parser.get_data()
+        names = [n for n in PACKET_DTYPES[packet_type].names if n != 'offset']
+        if packet_type != WitMotionPacketType.TIME:
+            seen[packet_type].append(tuple(getattr(data, n) for n in names))
+        else:
+            seen[packet_type].append(())
+
+    for packet_type, records in decoded.items():
+        assert len(records) == len(seen[packet_type]), f"0x{packet_type:02X}"
+        if packet_type == WitMotionPacketType.TIME:
+            continue
+        names = [n for n in records.dtype.names if n != 'offset']
+        for record, expected in zip(records, seen[packet_type]):
+            for name, value in zip(names, expected):
+                assert abs(record[name] - value) < 1e-9, (name, record[name], value)
+
+
+def test_batch_time_fields():
+    """Time packets decode into calendar fields"""
+    decoded = decode_buffer(synthetic_capture(12))
+    times = decoded[WitMotionPacketType.TIME]
+
+    assert len(times) == 12
+    assert times['year'][0] == 2025 and times['month'][0] == 7 and times['day'][0] == 21
+    assert list(times['millisecond'][:3]) == [0, 100, 200]
+
+
+def test_batch_memory_is_bounded():
+    """Decoding needs little beyond its input and output arrays"""
+    capture = synthetic_capture(10000)
+    tracemalloc.start()
+    try:
+        decoded = decode_buffer(capture)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    output = sum(records.nbytes for records in decoded.values())
+    # No eight-byte prefix sum or int64 gather index per input byte
+    assert peak < output + 4 * len(capture), (peak, output, len(capture))
+
+
+if __name__ == "__main__":
+    test_batch_matches_streaming_parser()
+    test_batch_time_fields()
+    test_batch_memory_is_bounded()
+    print("All batch decoder tests passed")
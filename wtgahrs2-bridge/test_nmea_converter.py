@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Offline tests for NMEA sentence generation
+"""
+
+from nmea_converter import (
+    MAX_SENTENCE_LENGTH, NMEAConverter, SENTENCE_TYPES, XDR_TYPES, nmea_checksum, parse_output_profile,
+)
+from wtgahrs2_parser import WitMotionData, fields_mask
+
+
+def sample_data():
+    """A fixed frame with a GPS fix"""
+    return WitMotionData(timestamp=1753101015.25, device_time=1753101000.5,
+                         latitude=36.48499270, longitude=-75.59348950,
+                         satellites=8, hdop=1.5, pdop=2.0, vdop=1.2, gps_altitude=14.0,
+                         gps_velocity=2.5, gps_heading=270.0, yaw=-45.0, pitch=1.5, roll=-2.25,
+                         gyro_z=0.5, pressure=1013.2, temperature=21.5,
+                         acc_x=0.1, acc_y=-0.2, acc_z=9.8)
+
+
+def test_time_source():
+    """GGA/RMC time comes from the configured clock"""
+    data = sample_data()
+    host = NMEAConverter(time_source='host')
+    device = NMEAConverter(time_source='device')
+
+    assert host.generate_gga(data).startswith("$GPGGA,123015.25,")
+    assert device.generate_gga(data).startswith("$GPGGA,123000.50,")
+    assert ",210725," in device.generate_rmc(data)
+
+    # Until a valid TIME packet arrives the host clock is used
+    data.device_time = 0.0
+    assert device.generate_gga(data).startswith("$GPGGA,123015.25,")
+
+
+def test_checksum():
+    """Folded checksum matches a plain XOR at every length"""
+    body = bytes(range(32, 127)) * 2
+    for length in range(len(body) + 1):
+        expected = 0
+        for byte in body[:length]:
+            expected ^= byte
+        assert nmea_checksum(body[:length]) == expected
+    assert NMEAConverter().format_nmea("HCHDT,315.0,T") == "$HCHDT,315.0,T*2E"
+
+
+def test_bytes_encoding_matches_strings():
+    """Encoded buffers are the string sentences plus CRLF"""
+    converter = NMEAConverter(magnetic_declination=-10.5)
+    data = sample_data()
+    encoded = converter.encode_sentences(data, SENTENCE_TYPES)
+
+    assert all(isinstance(buffer, bytes) and buffer.endswith(b"\r\n") for buffer in encoded)
+    assert b"".join(encoded).decode('ascii') == "".join(
+        sentence + "\r\n" for sentence in converter.generate_all_sentences(data))
+    assert converter.encode_gga(data) == (converter.generate_gga(data) + "\r\n").encode('ascii')
+    assert converter.generate_xdr_acceleration(data) == [
+        "$IIXDR,A,0.10,M,ACCX*44", "$IIXDR,A,-0.20,M,ACCY*6B", "$IIXDR,A,9.80,M,ACCZ*46"]
+
+    data.latitude = data.longitude = 0.0
+    assert converter.encode_gga(data) is None and converter.generate_gga(data) is None
+
+
+def test_time_fields_cache():
+    """Cached time/date fields match an uncached datetime formatting"""
+    converter = NMEAConverter()
+    stamps = [1753142399.99, 1753142399.994999, 1753142399.9999996, 1753142400.0,
+              1753101015.25, 1753101015.2549, 1753101015.26, 1753101015.2599999,
+              1753101015.25, 946684799.995, 0.0]
+    stamps += [1753142399.0 + i * 0.0037 for i in range(600)]
+    for stamp in stamps:
+        assert converter.utc_time_fields(stamp) == (
+            converter.format_time(stamp).encode('ascii'), converter.format_date(stamp).encode('ascii')), stamp
+
+    first = converter.utc_time_fields(1753101015.251)
+    assert converter.utc_time_fields(1753101015.259) is not first
+    assert converter.utc_time_fields(1753101015.259)[0] is first[0]
+
+
+def test_output_profiles():
+    """Profiles select which sentences are compiled into the output"""
+    data = sample_data()
+    minimal = NMEAConverter(profile='nav-minimal')
+    assert [s[3:6] for s in minimal.generate_all_sentences(data)] == ['RMC', 'HDT', 'ROT']
+    assert [emitter.name for emitter in minimal.emitters] == ['RMC', 'HDT', 'ROT']
+    aggregate = NMEAConverter(profile='HDT, PTCH', xdr_mode='aggregate')
+    assert [emitter.aggregated for emitter in aggregate.emitters] == [False, True]
+
+    full = NMEAConverter()
+    assert full.profile == SENTENCE_TYPES
+    assert full.generate_all_sentences(data) == full.generate_sentences(data, SENTENCE_TYPES)
+
+    assert parse_output_profile("hdt, baro") == ('HDT', 'BARO')
+    for bad in ("nav-maximal", "HDT, XYZ", ""):
+        try:
+            parse_output_profile(bad)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError(f"{bad!r} should be rejected")
+
+
+def test_xdr_aggregation():
+    """Transducers are packed into as few 82-character XDRs as fit"""
+    data = sample_data()
+    single = NMEAConverter()
+    aggregate = NMEAConverter(xdr_mode='aggregate')
+    single_xdr = [s for s in single.generate_all_sentences(data) if 'XDR' in s]
+    aggregate_xdr = [s for s in aggregate.generate_all_sentences(data) if 'XDR' in s]
+
+    assert len(single_xdr) == 7 and len(aggregate_xdr) == 2
+    assert all(len(s) + 2 <= MAX_SENTENCE_LENGTH for s in aggregate_xdr)
+    # Same transducer quadruplets in the same order
+    assert ",".join(s[7:-3] for s in aggregate_xdr) == ",".join(s[7:-3] for s in single_xdr)
+    assert all(s == single.format_nmea(s[1:-3]) for s in aggregate_xdr)
+    assert aggregate.encode_sentences(data, XDR_TYPES) == aggregate.encode_profile(data)[-1:]
+
+    # Only changed transducers are packed, after the other sentences
+    aggregate.generate_changed(data.snapshot(), SENTENCE_TYPES, now=0.0)
+    data.pitch = 3.0
+    data.yaw = 10.0
+    assert aggregate.generate_changed(frame(data, 'pitch', 'yaw'), SENTENCE_TYPES, now=0.1) == [
+        aggregate.format_nmea(body) for body in ("HCHDM,10.0,M", "HCHDT,10.0,T", "IIXDR,A,3.0,D,PTCH")]
+
+
+def frame(data, *changed):
+    """Snapshot of data with the given fields marked as changed"""
+    return data.snapshot(fields_mask(*changed))
+
+
+def test_only_changed_sentences_regenerated():
+    """A magnetometer-only update produces no output until resend is due"""
+    converter = NMEAConverter(resend_interval=1.0)
+    data = sample_data()
+    first = converter.generate_changed(data.snapshot(), SENTENCE_TYPES, now=0.0)
+    assert len(first) == len(converter.generate_all_sentences(data))
+
+    data.mag_x = 12.0
+    assert converter.generate_changed(frame(data, 'mag_x'), SENTENCE_TYPES, now=0.1) == []
+
+    data.yaw = -50.0
+    changed = converter.generate_changed(frame(data, 'yaw'), SENTENCE_TYPES, now=0.2)
+    assert [s[3:6] for s in changed] == ['HDM', 'HDT']
+
+    # Same formatted value: suppressed
+    data.yaw = -50.01
+    assert converter.generate_changed(frame(data, 'yaw'), SENTENCE_TYPES, now=0.3) == []
+
+    # Unchanged sentences are repeated once resend_interval has passed
+    repeated = converter.generate_changed(frame(data), SENTENCE_TYPES, now=1.05)
+    assert len(repeated) == len(first) - 2
+
+
+def test_changes_accumulate_while_not_due():
+    """A change seen while a sentence was not due is rendered when it is"""
+    converter = NMEAConverter(resend_interval=10.0)
+    data = sample_data()
+    converter.generate_changed(data.snapshot(), ['BARO'], now=0.0)
+
+    data.pressure = 1000.0
+    assert converter.generate_changed(frame(data, 'pressure'), [], now=0.1) == []
+    assert converter.generate_changed(frame(data), ['BARO'], now=0.2) == [
+        converter.generate_xdr_pressure(data)]
+
+
+if __name__ == "__main__":
+    test_time_source()
+    test_checksum()
+    test_bytes_encoding_matches_strings()
+    test_time_fields_cache()
+    test_output_profiles()
+    test_xdr_aggregation()
+    test_only_changed_sentences_regenerated()
+    test_changes_accumulate_while_not_due()
+    print("All NMEA converter tests passed")
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Tests for the output sink framework
+"""
+
+import os
+import tempfile
+import threading
+import time
+from output_sinks import (
+    FileSink, OutputSink, SinkWorker, StdoutSink, UDPNMEAServer, create_sinks, create_workers,
+    register_sink_type,
+)
+
+
+class SlowSink(OutputSink):
+    """Sink that blocks until released, recording what it was sent"""
+    
+    name = 'slow'
+    
+    def __init__(self):
+        self.release = threading.Event()
+        self.batches = []
+    
+    def send_batch(self, sentences):
+        self.release.wait(2.0)
+        self.batches.append(sentences)
+
+
+def test_create_sinks():
+    """The sinks key selects and configures sink types"""
+    config = {'sinks': 'udp, file:/tmp/nmea.log, stdout, udp:10.0.0.2:2000',
+              'udp_host': '127.0.0.1', 'udp_port': 10110, 'udp_max_datagram': 1400}
+    udp, log, stdout, remote = create_sinks(config)
+
+    assert isinstance(udp, UDPNMEAServer) and (udp.host, udp.port, udp.max_datagram) == ('127.0.0.1', 10110, 1400)
+    assert isinstance(log, FileSink) and log.path == '/tmp/nmea.log'
+    assert isinstance(stdout, StdoutSink)
+    assert (remote.host, remote.port) == ('10.0.0.2', 2000)
+    for bad in ('carrier-pigeon', 'file'):
+        try:
+            create_sinks({'sinks': bad})
+        except ValueError:
+            pass
+        else:
+            raise AssertionError(f"{bad!r} should be rejected")
+
+    register_sink_type('slow', lambda argument, config: SlowSink())
+    assert isinstance(create_sinks({'sinks': 'slow'})[0], SlowSink)
+
+
+def test_slow_sink_is_isolated():
+    """A stalled sink drops its own oldest batches without delaying others"""
+    slow = SlowSink()
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'nmea.log')
+        slow_worker, = create_workers([slow], '2:drop-oldest')
+        file_worker = SinkWorker(FileSink(path))
+        assert slow_worker.start() and file_worker.start()
+
+        start = time.monotonic()
+        for i in range(10):
+            batch = [b"$HCHDT,%d.0,T*00\r\n" % i]
+            slow_worker.submit(batch)
+            file_worker.submit(batch)
+            # Let the slow sink take the first batch in flight
+            while i == 0 and len(slow_worker.queue):
+                time.sleep(0.001)
+        assert time.monotonic() - start < 0.1
+
+        file_worker.stop()
+        slow.release.set()
+        slow_worker.stop()
+        with open(path, 'rb') as f:
+            written = f.read()
+
+    assert written.count(b"\r\n") == 10
+    assert file_worker.stats.batches == 10 and file_worker.stats.bytes == len(written)
+    # First batch was in flight, then the queue kept only the latest two
+    assert slow.batches == [[b"$HCHDT,0.0,T*00\r\n"], [b"$HCHDT,8.0,T*00\r\n"], [b"$HCHDT,9.0,T*00\r\n"]]
+    assert slow_worker.queue.stats.dropped == 7
+    assert slow_worker.stats.latency_max > 0
+    assert "7 dropped" in slow_worker.describe()
+
+
+def test_sink_errors_are_counted():
+    """A failing sink is counted and keeps its worker alive"""
+    class BrokenSink(OutputSink):
+        name = 'broken'
+        def send_batch(self, sentences):
+            raise OSError("disk full")
+
+    worker = SinkWorker(BrokenSink())
+    worker.start()
+    worker.submit([b"$A*00\r\n"])
+    worker.submit([b"$B*00\r\n"])
+    worker.stop()
+
+    assert worker.stats.errors == 2 and worker.stats.batches == 0
+
+
+if __name__ == "__main__":
+    test_create_sinks()
+    test_slow_sink_is_isolated()
+    test_sink_errors_are_counted()
+    print("All output sink tests passed")
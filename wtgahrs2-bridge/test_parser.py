@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Offline tests for the WitMotion protocol parser using synthetic packets
+"""
+
+import struct
+import sys
+import threading
+import tracemalloc
+from benchmark import synthetic_capture
+from wtgahrs2_parser import (
+    ClockOffsetEstimator, WTGAHRS2Parser, WitMotionData, WitMotionPacketType, build_packet,
+    device_time_to_epoch, fields_mask,
+)
+
+
+def make_stream():
+    """Build a small stream with one packet of each common type"""
+    return (build_packet(WitMotionPacketType.ACCELERATION, struct.pack('<3hH', 1024, -2048, 2048, 2512)) +
+            build_packet(WitMotionPacketType.ANGULAR_VELOCITY, struct.pack('<3hH', 0, 0, 164, 0)) +
+            build_packet(WitMotionPacketType.ANGLE, struct.pack('<3hH', 182, -364, 8192, 0)) +
+            build_packet(WitMotionPacketType.LONGITUDE_LATITUDE, struct.pack('<2l', -755935000, 364849000)) +
+            build_packet(WitMotionPacketType.GPS_ACCURACY, struct.pack('<4H', 9, 180, 95, 150)))
+
+
+def test_feed_whole_stream():
+    """A whole chunk yields every packet type in order"""
+    parser = WTGAHRS2Parser()
+    types = list(parser.feed(make_stream()))
+
+    assert types == [0x51, 0x52, 0x53, 0x57, 0x5A]
+    assert parser.buffer == b""
+    data = parser.get_data()
+    assert abs(data.acc_x - 1024 / 32768.0 * 16.0 * 9.8) < 1e-9
+    assert abs(data.yaw + 45.0) < 1e-9
+    assert data.satellites == 9
+
+
+def test_feed_split_chunks():
+    """Packets split across chunk boundaries are reassembled"""
+    stream = b"\x00\x13" + make_stream()
+    parser = WTGAHRS2Parser()
+    types = []
+    for i in range(0, len(stream), 7):
+        types.extend(parser.feed(stream[i:i + 7]))
+
+    assert types == [0x51, 0x52, 0x53, 0x57, 0x5A]
+
+
+def test_process_byte_compatibility():
+    """The per-byte wrapper produces the same state as feed"""
+    stream = make_stream()
+    chunk_parser = WTGAHRS2Parser()
+    list(chunk_parser.feed(stream))
+    byte_parser = WTGAHRS2Parser()
+    count = sum(1 for byte in stream if byte_parser.process_byte(byte))
+
+    assert count == 5
+    assert byte_parser.get_data() == chunk_parser.get_data()
+
+
+def test_resync_after_dropped_byte():
+    """A frame missing a byte does not take the following packets with it"""
+    stream = make_stream()
+    damaged = stream[:5] + stream[6:]
+
+    parser = WTGAHRS2Parser(resync=True)
+    types = list(parser.feed(damaged))
+    assert types == [0x52, 0x53, 0x57, 0x5A]
+    assert parser.stats.checksum_failures == {0x51: 1}
+    assert parser.stats.resyncs == 1
+    assert parser.stats.bytes_discarded == 10
+
+    strict = WTGAHRS2Parser(resync=False)
+    assert list(strict.feed(damaged)) == [0x53, 0x57, 0x5A]
+    assert strict.stats.resyncs == 0
+
+
+def test_payload_header_bytes():
+    """0x55 bytes inside payloads are skipped once alignment is found"""
+    packet = build_packet(WitMotionPacketType.PRESSURE, struct.pack('<l2H', 0x55555555, 0x5555, 0))
+    parser = WTGAHRS2Parser()
+    types = list(parser.feed(b"\x55\x55\x01" + packet * 3))
+
+    assert types == [0x55, 0x55, 0x55]
+    assert parser.stats.resyncs == 2
+    assert parser.stats.bytes_discarded == 3
+
+
+def test_register_packet_type():
+    """Extra packet types can be decoded without touching the parser"""
+    reads = []
+    parser = WTGAHRS2Parser()
+    parser.register_packet_type(0x5F, lambda data, offset: reads.append(struct.unpack_from('<4H', data, offset)))
+    types = list(parser.feed(build_packet(0x5F, struct.pack('<4H', 1, 2, 3, 4)) + make_stream()))
+
+    assert types[0] == 0x5F
+    assert reads == [(1, 2, 3, 4)]
+    assert parser.stats.unknown_packets == 0
+
+
+def test_snapshot_is_independent_and_immutable():
+    """Snapshots keep their values while the live data moves on"""
+    parser = WTGAHRS2Parser()
+    list(parser.feed(make_stream()))
+    snap = parser.get_data().snapshot()
+    parser.get_data().satellites = 3
+
+    assert snap.frozen and not parser.get_data().frozen
+    assert snap.satellites == 9 and isinstance(snap.satellites, int)
+    try:
+        snap.yaw = 1.0
+    except TypeError:
+        pass
+    else:
+        raise AssertionError("snapshot should be read-only")
+    assert WitMotionData.from_bytes(snap.to_bytes()) == snap
+    assert WitMotionData(yaw=-45.0).yaw == -45.0
+
+
+def test_frames_start_at_time_packet():
+    """Each output cycle becomes one frame once the next cycle starts"""
+    parser = WTGAHRS2Parser()
+    frames = list(parser.feed_frames(synthetic_capture(3)))
+
+    assert len(frames) == 2
+    assert all(frame.frozen for frame in frames)
+    assert frames[0].latitude != frames[1].latitude
+    assert parser.frame_packet_types == sum(1 << t for t in WitMotionPacketType)
+    assert parser.stats.frames == 2
+    # Synthetic cycles move position and attitude but not the magnetometer
+    assert frames[1].changed & fields_mask('latitude', 'yaw') == fields_mask('latitude', 'yaw')
+    assert not frames[1].changed & fields_mask('mag_x', 'satellites')
+
+
+def test_frames_with_terminal_type():
+    """A terminal packet type closes the frame without waiting"""
+    parser = WTGAHRS2Parser(frame_terminal_type=WitMotionPacketType.GPS_ACCURACY)
+    frames = []
+    for byte in synthetic_capture(3):
+        frames.extend(parser.feed_frames(bytes((byte,))))
+
+    assert len(frames) == 3
+    assert frames[2].satellites == 9
+
+
+def test_frames_without_time_packets():
+    """A repeated packet type also starts a new cycle"""
+    parser = WTGAHRS2Parser()
+    frames = list(parser.feed_frames(make_stream() * 3))
+
+    assert len(frames) == 2
+    assert parser.frame_packet_types == (1 << 0x51 | 1 << 0x52 | 1 << 0x53 | 1 << 0x57 | 1 << 0x5A)
+
+
+def test_device_time_decoded():
+    """TIME packets carry the device UTC time alongside the host time"""
+    parser = WTGAHRS2Parser()
+    list(parser.feed(build_packet(WitMotionPacketType.TIME, struct.pack('<6BH', 25, 7, 21, 12, 30, 15, 250))))
+    data = parser.get_data()
+
+    assert data.device_time == 1753101015.25
+    assert data.timestamp > 0
+    assert len(parser.clock.samples) == 1
+
+    # Fields out of range (device not yet synchronised) are ignored
+    list(parser.feed(build_packet(WitMotionPacketType.TIME, struct.pack('<6BH', 0, 0, 0, 0, 0, 0, 0))))
+    assert parser.get_data().device_time == 1753101015.25
+
+    # Days past the end of the month are not rolled over into the next one
+    assert device_time_to_epoch(25, 2, 31, 0, 0, 0, 0) is None
+    assert device_time_to_epoch(25, 2, 29, 0, 0, 0, 0) is None
+    assert device_time_to_epoch(24, 2, 29, 0, 0, 0, 0) == 1709164800.0
+
+
+def test_clock_offset_estimator():
+    """Offset is the least delayed sample, drift the slope of the samples"""
+    clock = ClockOffsetEstimator()
+    for i in range(20):
+        device_time = 1000.0 + i
+        delay = 0.010 if i % 2 else 0.030
+        clock.update(device_time + 5.0 + delay, device_time)
+
+    assert abs(clock.offset - 5.010) < 1e-9
+    assert abs(clock.latency - 5.020) < 1e-9
+    assert abs(clock.jitter) < 1e-9
+
+    steady = ClockOffsetEstimator()
+    for i in range(20):
+        steady.update(1000.0 + i * (1 + 20e-6) + 0.015, 1000.0 + i)
+    assert abs(steady.drift - 20e-6) < 1e-9
+
+
+def test_clock_summary_while_updating():
+    """Reading the summary while the serial thread adds samples never fails"""
+    clock = ClockOffsetEstimator(window=50)
+    stop = threading.Event()
+
+    def serial_thread():
+        i = 0
+        while not stop.is_set():
+            clock.update(1000.0 + i + 0.015, 1000.0 + i)
+            i += 1
+
+    interval = sys.getswitchinterval()
+    # Switch threads as often as possible so appends land mid-iteration
+    sys.setswitchinterval(1e-6)
+    updater = threading.Thread(target=serial_thread)
+    updater.start()
+    try:
+        for _ in range(2000):
+            clock.offset, clock.latency, clock.jitter, clock.drift
+    finally:
+        stop.set()
+        updater.join()
+        sys.setswitchinterval(interval)
+
+
+def test_steady_state_allocations():
+    """Once warmed up, parsing does not grow memory per packet"""
+    capture = synthetic_capture(400)
+    # Odd chunk size so packets keep straddling chunk boundaries
+    chunks = [capture[i:i + 97] for i in range(0, len(capture), 97)]
+    parser = WTGAHRS2Parser()
+    for chunk in chunks:
+        for _ in parser.feed(chunk):
+            pass
+
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        for _ in range(5):
+            for chunk in chunks:
+                for _ in parser.feed(chunk):
+                    pass
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+
+    # Only the replaced counter ints may show up (allocated while traced,
+    # their predecessors were not); nothing may scale with packet count
+    assert parser.stats.packets == 6 * 4000
+    assert after - before < 256, f"{after - before} bytes retained over 20000 packets"
+
+
+if __name__ == "__main__":
+    test_feed_whole_stream()
+    test_feed_split_chunks()
+    test_process_byte_compatibility()
+    test_resync_after_dropped_byte()
+    test_payload_header_bytes()
+    test_register_packet_type()
+    test_snapshot_is_independent_and_immutable()
+    test_frames_start_at_time_packet()
+    test_frames_with_terminal_type()
+    test_frames_without_time_packets()
+    test_device_time_decoded()
+    test_clock_offset_estimator()
+    test_clock_summary_while_updating()
+    test_steady_state_allocations()
+    print("All parser tests passed")
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Tests for the bounded pipeline queues and the staged bridge runtime
+"""
+
+import os
+import pty
+import socket
+import threading
+import time
+import tty
+from benchmark import synthetic_capture
+from bounded_queue import BLOCK, COALESCE_LATEST, DROP_OLDEST, BoundedQueue, parse_queue_spec
+from pipeline import PipelineWTGAHRS2Bridge, merge_frames
+from shm_state import ShmStateReader
+from wtgahrs2_parser import WitMotionData, fields_mask
+
+
+def test_drop_oldest():
+    """A full drop-oldest queue discards from the front"""
+    queue = BoundedQueue(3, DROP_OLDEST)
+    for i in range(5):
+        assert queue.put(i)
+
+    assert [queue.get() for _ in range(3)] == [2, 3, 4]
+    assert queue.stats.dropped == 2
+    assert queue.stats.high_water == 3
+
+
+def test_coalesce_latest_merges_frames():
+    """A full coalescing queue collapses into the new item, keeping every change"""
+    queue = BoundedQueue(3, COALESCE_LATEST, merge=merge_frames)
+    queue.put(WitMotionData(yaw=1.0).snapshot(fields_mask('yaw')))
+    queue.put(WitMotionData(roll=2.0).snapshot(fields_mask('roll')))
+    queue.put(WitMotionData(yaw=2.0).snapshot(fields_mask('yaw')))
+    queue.put(WitMotionData(yaw=3.0, pitch=1.0).snapshot(fields_mask('pitch')))
+
+    assert len(queue) == 1
+    latest = queue.get()
+    assert latest.yaw == 3.0
+    assert latest.changed == fields_mask('yaw', 'roll', 'pitch')
+    assert queue.stats.coalesced == 3
+
+    # Without a merge function only the newest item is kept
+    queue = BoundedQueue(2, COALESCE_LATEST)
+    for i in range(3):
+        queue.put(i)
+    assert len(queue) == 1 and queue.get() == 2
+
+
+def test_block_waits_for_space():
+    """A blocking put waits for a get, and close() releases it"""
+    queue = BoundedQueue(1, BLOCK)
+    queue.put('a')
+    results = []
+    producer = threading.Thread(target=lambda: results.append(queue.put('b')))
+    producer.start()
+    time.sleep(0.05)
+    assert producer.is_alive() and queue.stats.blocked == 1
+    assert queue.get() == 'a'
+    producer.join(1.0)
+    assert results == [True] and queue.get() == 'b'
+
+    queue.put('c')
+    producer = threading.Thread(target=lambda: results.append(queue.put('d')))
+    producer.start()
+    time.sleep(0.05)
+    queue.close()
+    producer.join(1.0)
+    assert results == [True, False]
+    # Closed queues drain, then return None
+    assert queue.get() == 'c' and queue.get() is None
+
+
+def test_parse_queue_spec():
+    """Queue specs are size:policy, the policy defaulting to block"""
+    assert parse_queue_spec("64:drop-oldest") == (64, DROP_OLDEST)
+    assert parse_queue_spec("8") == (8, BLOCK)
+    for bad in ("0:block", "8:drop-newest"):
+        try:
+            parse_queue_spec(bad)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError(f"{bad!r} should be rejected")
+
+
+def test_pipeline_end_to_end():
+    """Serial bytes flow through every stage to UDP and shared memory, and shut down cleanly"""
+    master, slave = pty.openpty()
+    tty.setraw(slave)
+    receiver = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    receiver.bind(('127.0.0.1', 0))
+    receiver.settimeout(2.0)
+
+    bridge = PipelineWTGAHRS2Bridge('/nonexistent.ini')
+    host, port = receiver.getsockname()
+    bridge.config.update({'serial_port': os.ttyname(slave), 'read_timeout': 0.1,
+                          'udp_host': host, 'udp_port': port,
+                          'shm_state': f"wtgahrs2-test-pipeline-{os.getpid()}"})
+    try:
+        assert bridge.connect_serial() and bridge.start_sinks()
+        bridge.running = True
+        bridge.create_threads()
+        for thread in bridge.threads:
+            thread.start()
+        os.write(master, synthetic_capture(3))
+        datagram = receiver.recv(4096)
+        state = ShmStateReader(bridge.config['shm_state'])
+        generation, latest = state.generation, state.read()
+        state.close()
+        bridge.shutdown()
+    finally:
+        os.close(master)
+        os.close(slave)
+        receiver.close()
+
+    assert datagram.startswith(b"$") and datagram.endswith(b"\r\n")
+    assert not any(thread.is_alive() for thread in bridge.threads)
+    assert all(queue.closed for queue in bridge.queues)
+    assert bridge.frames.stats.puts == bridge.parser.stats.frames >= 1
+    assert bridge.nmea_sentences_sent > 0
+    assert generation >= 1 and latest.latitude != 0.0
+    try:
+        ShmStateReader(bridge.config['shm_state'])
+    except FileNotFoundError:
+        pass
+    else:
+        raise AssertionError("shared memory state should be removed at shutdown")
+
+
+if __name__ == "__main__":
+    test_drop_oldest()
+    test_coalesce_latest_merges_frames()
+    test_block_waits_for_space()
+    test_parse_queue_spec()
+    test_pipeline_end_to_end()
+    print("All pipeline tests passed")
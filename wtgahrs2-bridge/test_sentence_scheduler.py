@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Offline tests for per-sentence output rate limiting
+"""
+
+import random
+from nmea_converter import SENTENCE_TYPES
+from sentence_scheduler import SentenceScheduler, parse_sentence_rates
+
+
+def run_frames(scheduler, seconds=10.0, frame_rate=10.0, jitter=0.004, seed=2):
+    """Count how often each sentence is due for jittered frame arrivals"""
+    rng = random.Random(seed)
+    counts = {}
+    for i in range(int(seconds * frame_rate)):
+        now = 1000.0 + i / frame_rate + rng.uniform(-jitter, jitter)
+        for name in scheduler.due(now):
+            counts[name] = counts.get(name, 0) + 1
+    return counts
+
+
+def test_rates_follow_configuration():
+    """Each sentence type is sent at its own rate despite frame jitter"""
+    scheduler = SentenceScheduler(SENTENCE_TYPES, default_rate=10.0,
+                                  rates=parse_sentence_rates("GGA:2, TEMP:0, ROT:5"))
+    counts = run_frames(scheduler)
+
+    assert counts['HDT'] == 100
+    assert counts['ROT'] == 50
+    assert counts['GGA'] == 20
+    assert counts['RMC'] == 10
+    assert counts['BARO'] == 2
+    assert 'TEMP' not in counts
+
+
+def test_due_keeps_output_order():
+    """Due sentences come back in SENTENCE_TYPES order"""
+    scheduler = SentenceScheduler(SENTENCE_TYPES)
+    assert scheduler.due(5.0) == list(SENTENCE_TYPES)
+    assert scheduler.due(5.01) == []
+
+
+def test_rates_are_validated():
+    """Unknown sentence types and malformed items are rejected"""
+    assert parse_sentence_rates(" hdt:5, , baro:0 ") == {'HDT': 5.0, 'BARO': 0.0}
+    for bad in ("HDG:5", "GGA", "GGA:fast", "GGA=1", ":1"):
+        try:
+            parse_sentence_rates(bad)
+        except ValueError as e:
+            assert bad.strip() in str(e)
+        else:
+            raise AssertionError(f"{bad!r} should be rejected")
+
+
+if __name__ == "__main__":
+    test_rates_follow_configuration()
+    test_due_keeps_output_order()
+    test_rates_are_validated()
+    print("All scheduler tests passed")
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Tests for the blocking serial reader using a pseudo-terminal as the device
+"""
+
+import os
+import pty
+import threading
+import time
+import tty
+from benchmark import synthetic_capture
+from wtgahrs2_bridge import WTGAHRS2Bridge
+
+
+def open_bridge(timeout: float = 0.2):
+    """Bridge connected to the slave end of a new pty; returns (bridge, master fd)"""
+    master, slave = pty.openpty()
+    tty.setraw(slave)
+    bridge = WTGAHRS2Bridge('/nonexistent.ini')
+    bridge.config.update({'serial_port': os.ttyname(slave), 'read_timeout': timeout})
+    assert bridge.connect_serial()
+    os.close(slave)
+    return bridge, master
+
+
+def test_read_blocks_until_data():
+    """A read returns everything buffered, or nothing after the timeout"""
+    bridge, master = open_bridge()
+    try:
+        start = time.monotonic()
+        assert bridge.read_serial() == b""
+        assert time.monotonic() - start >= 0.15
+
+        capture = synthetic_capture(3)
+        os.write(master, capture)
+        time.sleep(0.05)
+        assert bridge.read_serial() == capture
+
+        # Data arriving while blocked wakes the reader straight away
+        threading.Timer(0.05, os.write, (master, b"\x55\x51")).start()
+        start = time.monotonic()
+        assert bridge.read_serial() == b"\x55\x51"
+        assert time.monotonic() - start < 0.15
+    finally:
+        bridge.serial_port.close()
+        os.close(master)
+
+
+def test_idle_reader_sleeps():
+    """An idle device costs next to no CPU"""
+    bridge, master = open_bridge(timeout=0.1)
+    try:
+        cpu = time.thread_time()
+        for _ in range(5):
+            bridge.read_serial()
+        assert time.thread_time() - cpu < 0.05
+    finally:
+        bridge.serial_port.close()
+        os.close(master)
+
+
+if __name__ == "__main__":
+    test_read_blocks_until_data()
+    test_idle_reader_sleeps()
+    print("All serial reader tests passed")
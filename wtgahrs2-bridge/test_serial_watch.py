@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+Tests for serial hotplug watching and reconnecting, using pseudo-terminals
+as devices and symlinks like /dev/serial/by-id as their device nodes
+"""
+
+import asyncio
+import logging
+import os
+import pty
+import shutil
+import tempfile
+import threading
+import time
+import tty
+from async_bridge import AsyncWTGAHRS2Bridge
+from benchmark import synthetic_cycle
+from pipeline import PipelineWTGAHRS2Bridge
+from process_bridge import ProcessWTGAHRS2Bridge
+from serial_watch import DeviceWatcher
+from wtgahrs2_bridge import WTGAHRS2Bridge
+
+
+def plug(link: str) -> int:
+    """Create a new pty 'device' and its by-id style link; returns the master fd"""
+    master, slave = pty.openpty()
+    tty.setraw(slave)
+    os.makedirs(os.path.dirname(link), exist_ok=True)
+    os.symlink(os.ttyname(slave), link)
+    os.close(slave)
+    return master
+
+
+def unplug(link: str, master: int):
+    """Remove the device the way udev does: link, empty directory, then the tty"""
+    os.unlink(link)
+    os.rmdir(os.path.dirname(link))
+    os.close(master)
+
+
+def capture(start: int) -> bytes:
+    """A few device cycles with their own positions"""
+    return b"".join(synthetic_cycle(i) for i in range(start, start + 3))
+
+
+def wait_until(condition, timeout: float = 5.0) -> bool:
+    """Poll condition until it holds or timeout passes"""
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.005)
+    return True
+
+
+def test_watcher_waits_for_path():
+    """The watcher returns as soon as the node appears, even in a new directory"""
+    directory = tempfile.mkdtemp()
+    try:
+        path = os.path.join(directory, 'serial', 'by-id', 'usb-device')
+        watcher = DeviceWatcher(path)
+        try:
+            assert watcher.uses_inotify
+            start = time.monotonic()
+            assert not watcher.wait(0.2)
+            assert time.monotonic() - start >= 0.15
+
+            def create():
+                os.makedirs(os.path.dirname(path))
+                open(path, 'w').close()
+
+            threading.Timer(0.1, create).start()
+            start = time.monotonic()
+            assert watcher.wait(5.0)
+            assert time.monotonic() - start < 1.0
+            assert watcher.wait(0)
+        finally:
+            watcher.close()
+    finally:
+        shutil.rmtree(directory)
+
+
+def hotplug(bridge: WTGAHRS2Bridge, link: str, master: int) -> int:
+    """Unplug and replug the device under a running bridge; returns the new master"""
+    os.write(master, capture(0))
+    assert wait_until(lambda: bridge.parser.stats.frames >= 2)
+    workers = list(bridge.sink_workers)
+
+    unplug(link, master)
+    time.sleep(0.3)
+    frames = bridge.parser.stats.frames
+    master = plug(link)
+    replugged = time.monotonic()
+    # Keep the device talking until frames flow again
+    cycle = 100
+    while bridge.parser.stats.frames <= frames:
+        assert time.monotonic() - replugged < 1.0, "not reconnected within a second"
+        os.write(master, capture(cycle))
+        cycle += 3
+        time.sleep(0.02)
+    # Sinks survive the reconnect
+    assert bridge.sink_workers == workers
+    return master
+
+
+def configure(bridge: WTGAHRS2Bridge, link: str):
+    """Point the bridge at the test device"""
+    bridge.config.update({'serial_port': link, 'read_timeout': 0.1,
+                          'udp_host': '127.0.0.1', 'udp_port': 9})
+
+
+def run_bridge(bridge: WTGAHRS2Bridge, link: str):
+    """Connect and start the bridge's worker threads"""
+    configure(bridge, link)
+    assert bridge.connect_serial() and bridge.start_sinks()
+    bridge.running = True
+    for thread in bridge.create_threads():
+        thread.start()
+
+
+def test_reconnect_after_unplug():
+    """The threaded bridge reopens a replugged device within a second"""
+    directory = tempfile.mkdtemp()
+    link = os.path.join(directory, 'by-id', 'usb-1a86_USB_Serial-if00-port0')
+    master = plug(link)
+    bridge = WTGAHRS2Bridge('/nonexistent.ini')
+    try:
+        run_bridge(bridge, link)
+        master = hotplug(bridge, link, master)
+        assert bridge.serial_reconnects == 1
+    finally:
+        bridge.shutdown()
+        os.close(master)
+        shutil.rmtree(directory)
+
+
+class Records(logging.Handler):
+    """Collects log records"""
+
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+    def messages(self, text: str) -> int:
+        """Number of records containing text"""
+        return sum(text in record.getMessage() for record in self.records)
+
+
+def test_reconnect_logs_once():
+    """A node that is back but cannot be opened yet is logged once, not per retry"""
+    directory = tempfile.mkdtemp()
+    link = os.path.join(directory, 'by-id', 'usb-1a86_USB_Serial-if00-port0')
+    master = plug(link)
+    bridge = WTGAHRS2Bridge('/nonexistent.ini')
+    records = Records()
+    logging.getLogger().addHandler(records)
+    try:
+        run_bridge(bridge, link)
+        os.write(master, capture(0))
+        assert wait_until(lambda: bridge.parser.stats.frames >= 2)
+        unplug(link, master)
+        assert wait_until(lambda: records.messages("lost, waiting"))
+
+        # The node returns as something that is not a tty yet
+        placeholder = os.path.join(directory, 'not-a-tty')
+        open(placeholder, 'w').close()
+        os.makedirs(os.path.dirname(link))
+        os.symlink(placeholder, link)
+        # Long enough for the retry backoff to reach its cap
+        time.sleep(2.0)
+        os.unlink(link)
+        os.rmdir(os.path.dirname(link))
+
+        master = plug(link)
+        replugged = time.monotonic()
+        assert wait_until(lambda: bridge.serial_reconnects == 1)
+        # Reopened within the capped retry delay, not seconds later
+        assert time.monotonic() - replugged < 0.6
+        assert records.messages("cannot be opened yet") == 1
+        assert records.messages("Failed to connect") == 0
+    finally:
+        logging.getLogger().removeHandler(records)
+        bridge.shutdown()
+        os.close(master)
+        shutil.rmtree(directory)
+
+
+def test_async_bridge_reconnects():
+    """The asyncio runtime waits in an executor and re-adds its reader"""
+    directory = tempfile.mkdtemp()
+    link = os.path.join(directory, 'by-id', 'usb-1a86_USB_Serial-if00-port0')
+    master = plug(link)
+    bridge = AsyncWTGAHRS2Bridge('/nonexistent.ini')
+    configure(bridge, link)
+    results = []
+    loop = threading.Thread(target=lambda: results.append(asyncio.run(bridge.run_async())))
+    loop.start()
+    try:
+        assert wait_until(lambda: bridge.running)
+        master = hotplug(bridge, link, master)
+        assert bridge.serial_reconnects == 1
+
+        # Unplugged again and stopped while the reconnect is still waiting
+        unplug(link, master)
+        master = None
+        assert wait_until(lambda: bridge._reconnect is not None and not bridge._reconnect.done()
+                          and bridge.serial_reconnects == 1 and not bridge.serial_port.is_open)
+        bridge.stop()
+        loop.join(3.0)
+        assert not loop.is_alive() and results == [0]
+        assert bridge._reconnect.cancelled() or bridge._reconnect.done()
+    finally:
+        if loop.is_alive():
+            bridge.stop()
+            loop.join(3.0)
+        if master is not None:
+            os.close(master)
+        shutil.rmtree(directory)
+
+
+def test_reconnect_stopped_while_opening():
+    """A port reopened after stop() is closed again, not handed back"""
+    directory = tempfile.mkdtemp()
+    link = os.path.join(directory, 'by-id', 'usb-1a86_USB_Serial-if00-port0')
+    master = plug(link)
+    bridge = WTGAHRS2Bridge('/nonexistent.ini')
+    configure(bridge, link)
+    open_serial = bridge.open_serial
+
+    def open_then_stop():
+        open_serial()
+        bridge.running = False
+
+    bridge.open_serial = open_then_stop
+    bridge.running = True
+    try:
+        assert bridge.reconnect_serial() is False
+        assert not bridge.serial_port.is_open
+        assert bridge.serial_reconnects == 0
+    finally:
+        os.close(master)
+        shutil.rmtree(directory)
+
+
+def test_pipeline_bridge_reconnects():
+    """The pipeline's read stage reopens the device; later stages keep running"""
+    directory = tempfile.mkdtemp()
+    link = os.path.join(directory, 'by-id', 'usb-1a86_USB_Serial-if00-port0')
+    master = plug(link)
+    bridge = PipelineWTGAHRS2Bridge('/nonexistent.ini')
+    try:
+        run_bridge(bridge, link)
+        threads = list(bridge.threads)
+        master = hotplug(bridge, link, master)
+        assert bridge.serial_reconnects == 1
+        assert all(thread.is_alive() for thread in threads)
+    finally:
+        bridge.shutdown()
+        os.close(master)
+        shutil.rmtree(directory)
+
+
+def test_reader_process_reconnects():
+    """The reader process of the two-process runtime reopens the device itself"""
+    directory = tempfile.mkdtemp()
+    link = os.path.join(directory, 'by-id', 'usb-1a86_USB_Serial-if00-port0')
+    master = plug(link)
+    bridge = ProcessWTGAHRS2Bridge('/nonexistent.ini')
+    try:
+        run_bridge(bridge, link)
+        reader = bridge.reader
+        master = hotplug(bridge, link, master)
+        # Same reader process, no restart
+        assert bridge.reader is reader and reader.is_alive()
+    finally:
+        bridge.shutdown()
+        os.close(master)
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    test_watcher_waits_for_path()
+    test_reconnect_after_unplug()
+    test_reconnect_logs_once()
+    test_async_bridge_reconnects()
+    test_reconnect_stopped_while_opening()
+    test_pipeline_bridge_reconnects()
+    test_reader_process_reconnects()
+    print("All serial hotplug tests passed")
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Tests for the shared-memory ring buffer and the two-process runtime
+"""
+
+import os
+import pty
+import random
+import socket
+import threading
+import time
+import tty
+from benchmark import synthetic_capture
+from process_bridge import ProcessWTGAHRS2Bridge
+from shm_ring import SharedRing
+
+
+def test_wraparound():
+    """Chunks of any size come out in order across the ring boundary"""
+    ring = SharedRing(capacity=64, create=True)
+    consumer = SharedRing(ring.name)
+    try:
+        rng = random.Random(1)
+        sent = bytearray()
+        received = bytearray()
+        chunks = 0
+        for i in range(2000):
+            chunk = bytes(rng.randrange(256) for _ in range(rng.randrange(1, 40)))
+            if ring.write(chunk):
+                sent += chunk
+                chunks += 1
+            if i % 3 == 0:
+                received += consumer.read()
+        received += consumer.read()
+
+        assert received == sent
+        stats = consumer.stats()
+        # Ring bytes include an 8-byte record header per chunk
+        assert stats['written'] == stats['read'] == len(sent) + 8 * chunks
+        assert stats['chunks'] == chunks and stats['torn'] == 0
+        assert stats['high_water'] <= 64 and stats['max_lag'] <= 64
+        consumer.close()
+    finally:
+        ring.close()
+
+
+def test_overflow_drops_new_chunks():
+    """A full ring drops and counts incoming chunks, keeping what it has"""
+    ring = SharedRing(capacity=32, create=True)
+    try:
+        assert ring.write(b"0123456789")
+        assert not ring.write(b"abcdefgh")
+        assert ring.write(b"ABCDEF")
+        assert ring.read() == b"0123456789ABCDEF"
+        stats = ring.stats()
+        assert (stats['overflow_bytes'], stats['overflow_chunks']) == (8, 1)
+        assert stats['high_water'] == 32 and stats['buffered'] == 0
+    finally:
+        ring.close()
+
+
+def test_stale_bytes_are_not_returned():
+    """Bytes left from the previous lap never come out as a new chunk"""
+    ring = SharedRing(capacity=64, create=True)
+    consumer = SharedRing(ring.name)
+    try:
+        assert ring.write(b"A" * 56)
+        stale = bytes(ring.buf[192:256])
+        assert consumer.read() == b"A" * 56
+
+        # Next lap: head is published but the consumer still sees the
+        # previous record, as a weakly ordered CPU could let it
+        assert ring.write(b"B" * 56)
+        ring.buf[192:256] = stale
+        assert consumer.read() == b""
+        assert consumer.stats()['torn'] == 1
+
+        # The ring carries on after the torn record
+        assert ring.write(b"C" * 20)
+        assert consumer.read() == b"C" * 20
+    finally:
+        consumer.close()
+        ring.close()
+
+
+def test_wait_drains_wakeups():
+    """Chunks already taken by a read do not wake the next wait()"""
+    wakeup = threading.Semaphore(0)
+    ring = SharedRing(capacity=256, create=True, wakeup=wakeup)
+    consumer = SharedRing(ring.name, wakeup=wakeup)
+    try:
+        for _ in range(5):
+            assert ring.write(b"0123456789")
+        assert consumer.wait(1.0)
+        assert consumer.read() == b"0123456789" * 5
+        assert not consumer.wait(0.05)
+
+        # A chunk written after the drain still wakes the consumer
+        assert ring.write(b"abc")
+        assert consumer.wait(1.0) and consumer.read() == b"abc"
+    finally:
+        consumer.close()
+        ring.close()
+
+
+def test_threaded_producer_consumer():
+    """Concurrent producer and consumer, woken by the semaphore"""
+    wakeup = threading.Semaphore(0)
+    ring = SharedRing(capacity=4096, create=True, wakeup=wakeup)
+    consumer = SharedRing(ring.name, wakeup=wakeup)
+    stream = synthetic_capture(500)
+
+    def produce():
+        for i in range(0, len(stream), 37):
+            while not ring.write(stream[i:i + 37]):
+                time.sleep(0.001)
+
+    producer = threading.Thread(target=produce)
+    producer.start()
+    received = bytearray()
+    try:
+        while len(received) < len(stream):
+            assert consumer.wait(2.0) or consumer.stats()['buffered']
+            received += consumer.read()
+    finally:
+        producer.join()
+        consumer.close()
+        ring.close()
+    assert received == stream
+
+
+def test_process_runtime_end_to_end():
+    """A reader process feeds the bridge through the ring and stops cleanly"""
+    master, slave = pty.openpty()
+    tty.setraw(slave)
+    receiver = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    receiver.bind(('127.0.0.1', 0))
+    receiver.settimeout(5.0)
+
+    bridge = ProcessWTGAHRS2Bridge('/nonexistent.ini')
+    host, port = receiver.getsockname()
+    bridge.config.update({'serial_port': os.ttyname(slave), 'read_timeout': 0.1,
+                          'udp_host': host, 'udp_port': port, 'ring_size': 4096})
+    try:
+        assert bridge.connect_serial() and bridge.start_sinks()
+        ring_name = bridge.ring.name
+        bridge.running = True
+        for thread in bridge.create_threads():
+            thread.start()
+        os.write(master, synthetic_capture(3))
+        datagram = receiver.recv(4096)
+        stats = bridge.ring.stats()
+        reader = bridge.reader
+        bridge.shutdown()
+    finally:
+        os.close(master)
+        os.close(slave)
+        receiver.close()
+
+    assert datagram.startswith(b"$") and datagram.endswith(b"\r\n")
+    assert stats['written'] > 0 and stats['overflow_chunks'] == 0
+    assert bridge.parser.stats.frames >= 1
+    assert not reader.is_alive() and reader.exitcode == 0
+    assert not os.path.exists(f"/dev/shm/{ring_name}")
+
+    # A port that cannot be opened is reported by the reader process
+    failing = ProcessWTGAHRS2Bridge('/nonexistent.ini')
+    failing.config['serial_port'] = '/dev/nonexistent-tty'
+    assert not failing.connect_serial()
+    assert failing.reader is None and failing.ring is None
+
+
+if __name__ == "__main__":
+    test_wraparound()
+    test_overflow_drops_new_chunks()
+    test_stale_bytes_are_not_returned()
+    test_wait_drains_wakeups()
+    test_threaded_producer_consumer()
+    test_process_runtime_end_to_end()
+    print("All ring buffer tests passed")
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Tests for shared-memory latest-state publication
+"""
+
+import os
+import subprocess
+import sys
+import threading
+from benchmark import synthetic_capture
+from shm_state import ShmStatePublisher, ShmStateReader
+from wtgahrs2_parser import WITMOTION_FIELDS, WTGAHRS2Parser, WitMotionData
+
+
+def block_name(tag: str) -> str:
+    """Name unique to this test run"""
+    return f"wtgahrs2-test-{tag}-{os.getpid()}"
+
+
+def test_publish_and_read():
+    """A reader sees the latest frame with its changed mask"""
+    publisher = ShmStatePublisher(block_name('read'))
+    try:
+        reader = ShmStateReader(publisher.name)
+        assert reader.read() is None and reader.generation == 0
+
+        frames = list(WTGAHRS2Parser().feed_frames(synthetic_capture(3)))
+        for frame in frames:
+            publisher.publish(frame)
+        data = reader.read()
+        assert data == frames[-1] and data.changed == frames[-1].changed
+        assert reader.generation == len(frames)
+        assert reader.published > 0
+        reader.close()
+    finally:
+        publisher.close()
+
+
+def test_no_torn_reads():
+    """Reads racing a busy writer are always whole frames"""
+    publisher = ShmStatePublisher(block_name('race'))
+    reader = ShmStateReader(publisher.name)
+    stop = threading.Event()
+
+    def write():
+        value = 0
+        while not stop.is_set():
+            value += 1
+            publisher.publish(WitMotionData(**{name: value for name in WITMOTION_FIELDS}))
+
+    writer = threading.Thread(target=write)
+    writer.start()
+    try:
+        while reader.read() is None:
+            pass
+        for _ in range(20000):
+            values = reader.read().as_dict().values()
+            assert len(set(values)) == 1, "torn read"
+    finally:
+        stop.set()
+        writer.join()
+        reader.close()
+        publisher.close()
+
+
+def test_reader_process_exit_keeps_block():
+    """A reader process exiting must not unlink the bridge's block"""
+    publisher = ShmStatePublisher(block_name('exit'))
+    try:
+        publisher.publish(WitMotionData(yaw=42.0))
+        script = ("import sys; from shm_state import ShmStateReader; "
+                  "r = ShmStateReader(sys.argv[1]); print(r.read().yaw); r.close()")
+        result = subprocess.run([sys.executable, '-c', script, publisher.name],
+                                capture_output=True, text=True, timeout=30,
+                                cwd=os.path.dirname(os.path.abspath(__file__)))
+        assert result.stdout.strip() == '42.0', result.stderr
+        assert 'leaked' not in result.stderr and 'Traceback' not in result.stderr, result.stderr
+
+        reader = ShmStateReader(publisher.name)
+        assert reader.read().yaw == 42.0
+        reader.close()
+    finally:
+        publisher.close()
+
+
+def test_stale_block_replaced():
+    """A block left by a crashed bridge is replaced; foreign layouts are rejected"""
+    name = block_name('stale')
+    crashed = ShmStatePublisher(name)
+    crashed.publish(WitMotionData(yaw=1.0))
+    publisher = ShmStatePublisher(name)
+    try:
+        reader = ShmStateReader(name)
+        assert reader.read() is None
+        reader.close()
+        publisher.buf[0:4] = b'XXXX'
+        try:
+            ShmStateReader(name)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("unknown layout should be rejected")
+    finally:
+        publisher.close()
+        crashed.shm.close()
+
+
+if __name__ == "__main__":
+    test_publish_and_read()
+    test_no_torn_reads()
+    test_reader_process_exit_keeps_block()
+    test_stale_block_replaced()
+    print("All shared memory state tests passed")
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Tests for the TCP NMEA server sink over loopback
+"""
+
+import socket
+import time
+from output_sinks import create_sinks
+from tcp_sink import TCPNMEAServer
+
+
+def connect(server: TCPNMEAServer, receive_buffer: int = 0) -> socket.socket:
+    """Client connected to the server, registered before returning"""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    if receive_buffer:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, receive_buffer)
+    sock.connect(('127.0.0.1', server.port))
+    sock.settimeout(2.0)
+    count = len(server.clients)
+    deadline = time.monotonic() + 2.0
+    while len(server.clients) == count and time.monotonic() < deadline:
+        time.sleep(0.005)
+    return sock
+
+
+def receive(sock: socket.socket, size: int) -> bytes:
+    """Read exactly size bytes"""
+    data = b""
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        assert chunk, "connection closed early"
+        data += chunk
+    return data
+
+
+def test_frames_reach_every_client():
+    """Each frame reaches all connected clients unchanged"""
+    server = TCPNMEAServer('127.0.0.1', 0)
+    assert server.open()
+    try:
+        first, second = connect(server), connect(server)
+        frame = [b"$HCHDT,1.0,T*00\r\n", b"$TIROT,0.0,A*00\r\n"]
+        server.send_batch(frame)
+        expected = b"".join(frame)
+        assert receive(first, len(expected)) == expected
+        assert receive(second, len(expected)) == expected
+
+        # A client that hangs up is forgotten
+        first.close()
+        deadline = time.monotonic() + 2.0
+        while len(server.clients) > 1 and time.monotonic() < deadline:
+            time.sleep(0.005)
+        assert len(server.clients) == 1 and server.clients_accepted == 2
+        second.close()
+    finally:
+        server.close()
+
+
+def test_stalled_client_does_not_delay_others():
+    """A client that stops reading loses frames; the others get all of them"""
+    server = TCPNMEAServer('127.0.0.1', 0, client_queue=4, write_buffer=1024, send_buffer=4096)
+    assert server.open()
+    try:
+        stalled = connect(server, receive_buffer=1024)
+        helm = connect(server)
+        frame_size = 1000
+        frames = 2000
+        received = 0
+        worst = 0.0
+        for i in range(frames):
+            payload = (b"$IIXDR,%06d," % i).ljust(frame_size - 2, b"X") + b"\r\n"
+            sent = time.monotonic()
+            server.send_batch([payload])
+            assert receive(helm, frame_size) == payload
+            worst = max(worst, time.monotonic() - sent)
+            received += 1
+        # Counted while the client is still connected
+        assert server.frames_dropped > 0
+        stalled.close()
+        helm.close()
+    finally:
+        server.close()
+
+    assert received == frames
+    assert worst < 0.5
+    assert server.frames_dropped > 0
+    assert "frames dropped for slow clients" in server.describe()
+
+
+def test_tcp_sink_config():
+    """The tcp sink takes its address and client queue from the config"""
+    sink, = create_sinks({'sinks': 'tcp:127.0.0.1:0', 'tcp_client_queue': '8:coalesce-latest'})
+    assert isinstance(sink, TCPNMEAServer)
+    assert (sink.host, sink.port, sink.client_queue, sink.policy) == ('127.0.0.1', 0, 8, 'coalesce-latest')
+
+
+if __name__ == "__main__":
+    test_frames_reach_every_client()
+    test_stalled_client_does_not_delay_others()
+    test_tcp_sink_config()
+    print("All TCP sink tests passed")
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Offline tests for UDP NMEA output over loopback
+"""
+
+import socket
+from output_sinks import UDPNMEAServer, create_sinks, parse_endpoints
+
+# Administratively scoped group used for the loopback multicast test
+MULTICAST_GROUP = '239.255.10.110'
+
+
+def receiver():
+    """Bound loopback UDP socket that times out instead of blocking"""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind(('127.0.0.1', 0))
+    sock.settimeout(1.0)
+    return sock
+
+
+def test_batches_fill_datagrams():
+    """Sentences are coalesced up to max_datagram and never split"""
+    sock = receiver()
+    server = UDPNMEAServer(*sock.getsockname(), max_datagram=64)
+    server.start()
+    sentences = [b"$HCHDT,%.1f,T*00\r\n" % i for i in range(10)]
+    try:
+        server.send_batch(sentences)
+        datagrams = [sock.recv(2048) for _ in range(server.datagrams_sent)]
+    finally:
+        server.stop()
+        sock.close()
+
+    assert b"".join(datagrams) == b"".join(sentences)
+    assert all(len(datagram) <= 64 for datagram in datagrams)
+    assert all(datagram.endswith(b"\r\n") for datagram in datagrams)
+    assert server.datagrams_sent == 4
+    assert server.bytes_sent == len(b"".join(sentences))
+
+
+def test_unbatched_and_oversized():
+    """max_datagram=0 sends one datagram per buffer, as does a buffer over the limit"""
+    sock = receiver()
+    server = UDPNMEAServer(*sock.getsockname())
+    server.start()
+    try:
+        server.send_batch([b"$A*00\r\n", b"$B*00\r\n"])
+        server.max_datagram = 8
+        server.send_batch([b"$C*00\r\n", b"$DDDDDDDD*00\r\n", b"$E*00\r\n"])
+        server.send_nmea("$F*00")
+        datagrams = [sock.recv(2048) for _ in range(6)]
+    finally:
+        server.stop()
+        sock.close()
+
+    assert datagrams == [b"$A*00\r\n", b"$B*00\r\n", b"$C*00\r\n",
+                         b"$DDDDDDDD*00\r\n", b"$E*00\r\n", b"$F*00\r\n"]
+
+
+def test_fan_out_to_every_target():
+    """Unicast targets and a multicast group all get the same datagrams"""
+    first, second = receiver(), receiver()
+    group = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    group.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    group.bind(('', 0))
+    group.setsockopt(socket.IPPROTO_IP, socket.IP_ADD_MEMBERSHIP,
+                     socket.inet_aton(MULTICAST_GROUP) + socket.inet_aton('127.0.0.1'))
+    group.settimeout(1.0)
+
+    targets = f"{first.getsockname()[0]}:{first.getsockname()[1]}, {MULTICAST_GROUP}:{group.getsockname()[1]}"
+    server, = create_sinks({'sinks': 'udp', 'udp_host': second.getsockname()[0],
+                            'udp_port': second.getsockname()[1], 'udp_targets': targets,
+                            'udp_max_datagram': 1400, 'udp_interface': '127.0.0.1'})
+    sentences = [b"$HCHDT,1.0,T*00\r\n", b"$TIROT,0.0,A*00\r\n"]
+    try:
+        assert server.start()
+        assert len(server.sockets) == 3
+        assert server.sockets[2].getsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL) == 1
+        # Addresses resolved once, sockets left unconnected so the source
+        # address follows the current routing
+        assert server.addresses[0] == second.getsockname()
+        for sock in server.sockets:
+            try:
+                sock.getpeername()
+            except OSError:
+                pass
+            else:
+                raise AssertionError("UDP sockets should not be connected")
+        server.send_batch(sentences)
+        received = [sock.recv(2048) for sock in (first, second, group)]
+    finally:
+        server.stop()
+        for sock in (first, second, group):
+            sock.close()
+
+    assert received == [b"".join(sentences)] * 3
+    assert server.datagrams_sent == 3
+
+
+def test_unavailable_target_is_skipped():
+    """A target that cannot be resolved does not stop the others"""
+    good = receiver()
+    host, port = good.getsockname()
+    server = UDPNMEAServer('nonexistent.invalid', port, targets=[(host, port)])
+    try:
+        assert server.start()
+        assert len(server.sockets) == 1
+        assert server.unavailable == [('nonexistent.invalid', port)]
+        server.send_batch([b"$HCHDT,1.0,T*00\r\n"])
+        assert good.recv(2048) == b"$HCHDT,1.0,T*00\r\n"
+
+        # Retried once due, still skipped
+        server.retry_at = 0.0
+        server.send_batch([b"$TIROT,0.0,A*00\r\n"])
+        assert good.recv(2048) == b"$TIROT,0.0,A*00\r\n"
+        assert server.unavailable == [('nonexistent.invalid', port)]
+        assert server.describe() == f"unavailable: nonexistent.invalid:{port}"
+    finally:
+        server.stop()
+        good.close()
+
+    # Only a sink with no usable target fails
+    assert not UDPNMEAServer('nonexistent.invalid', port).start()
+
+
+def test_parse_endpoints():
+    """Targets are a comma separated host:port list"""
+    assert parse_endpoints("10.0.0.2:10110, 239.192.0.1:2000,") == [
+        ('10.0.0.2', 10110), ('239.192.0.1', 2000)]
+    assert parse_endpoints("") == []
+    try:
+        parse_endpoints("10110")
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("a bare port should be rejected")
+
+
+if __name__ == "__main__":
+    test_batches_fill_datagrams()
+    test_unbatched_and_oversized()
+    test_fan_out_to_every_target()
+    test_unavailable_target_is_skipped()
+    test_parse_endpoints()
+    print("All UDP output tests passed")
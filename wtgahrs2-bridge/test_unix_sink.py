@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Tests for the Unix domain socket sinks
+"""
+
+import os
+import socket
+import stat
+import tempfile
+import time
+from output_sinks import create_sinks
+from unix_sink import UnixDatagramSink, UnixNMEAServer, socket_address
+
+
+FRAME = [b"$HCHDT,1.0,T*00\r\n", b"$TIROT,0.0,A*00\r\n"]
+
+
+def receiver(path: str) -> socket.socket:
+    """Datagram socket bound where the sink sends"""
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+    sock.bind(socket_address(path))
+    sock.settimeout(2.0)
+    return sock
+
+
+def test_datagram_sink():
+    """Each frame arrives as one datagram; a missing receiver is tolerated"""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'nmea.sock')
+        sink = UnixDatagramSink(path)
+        assert sink.open() and not sink.connected
+        sink.send_batch(FRAME)
+        assert sink.undelivered == 1
+
+        # The receiver comes up later and gets the next frame
+        rx = receiver(path)
+        try:
+            sink.send_batch(FRAME)
+            assert rx.recv(4096) == b"".join(FRAME)
+            assert sink.datagrams_sent == 1
+        finally:
+            rx.close()
+            os.unlink(path)
+
+        # ...and may go away again
+        sink.send_batch(FRAME)
+        assert sink.undelivered == 2
+        sink.close()
+
+
+def test_datagram_sink_full_receiver():
+    """A receiver that stops reading costs dropped frames, never a blocked worker"""
+    name = f"@wtgahrs2-test-{os.getpid()}"
+    rx = receiver(name)
+    sink = UnixDatagramSink(name)
+    try:
+        assert sink.open() and sink.connected
+        start = time.monotonic()
+        for _ in range(5000):
+            sink.send_batch(FRAME)
+        assert time.monotonic() - start < 2.0
+        assert sink.dropped > 0
+        assert sink.datagrams_sent + sink.dropped == 5000
+        assert rx.recv(4096) == b"".join(FRAME)
+    finally:
+        sink.close()
+        rx.close()
+
+
+def test_stream_server():
+    """The stream server applies the file mode, serves clients and cleans up"""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'nmea.sock')
+        # A stale socket from an earlier run is replaced
+        stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        stale.bind(path)
+        stale.close()
+
+        server = UnixNMEAServer(path, mode=0o600)
+        assert server.open()
+        try:
+            assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+            client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            client.connect(path)
+            client.settimeout(2.0)
+            deadline = time.monotonic() + 2.0
+            while not server.clients and time.monotonic() < deadline:
+                time.sleep(0.005)
+            server.send_batch(FRAME)
+            expected = b"".join(FRAME)
+            data = b""
+            while len(data) < len(expected):
+                data += client.recv(4096)
+            assert data == expected
+            client.close()
+        finally:
+            server.close()
+        assert not os.path.exists(path)
+
+        # Never deletes something that is not a socket
+        with open(path, 'w'):
+            pass
+        assert not UnixNMEAServer(path).open()
+        assert os.path.exists(path)
+
+
+def test_stream_server_in_use():
+    """A socket another server still listens on is not taken over"""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'nmea.sock')
+        running = UnixNMEAServer(path)
+        assert running.open()
+        try:
+            assert not UnixNMEAServer(path).open()
+            # The running server keeps its socket and its clients
+            client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            client.connect(path)
+            client.close()
+        finally:
+            running.close()
+        assert not os.path.exists(path)
+
+
+def test_abstract_stream_server():
+    """Abstract names need no file"""
+    name = f"@wtgahrs2-test-stream-{os.getpid()}"
+    server = UnixNMEAServer(name)
+    assert server.open()
+    try:
+        client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        client.connect(socket_address(name))
+        client.settimeout(2.0)
+        deadline = time.monotonic() + 2.0
+        while not server.clients and time.monotonic() < deadline:
+            time.sleep(0.005)
+        server.send_batch(FRAME)
+        assert client.recv(4096).startswith(b"$HCHDT")
+        client.close()
+    finally:
+        server.close()
+
+
+def test_create_unix_sinks():
+    """unix and unix-dgram sink specs"""
+    stream, dgram = create_sinks({'sinks': 'unix:/tmp/nmea.sock, unix-dgram:@opencpn',
+                                  'unix_mode': '640', 'unix_client_queue': '8:coalesce-latest'})
+    assert isinstance(stream, UnixNMEAServer)
+    assert (stream.path, stream.mode, stream.client_queue, stream.policy) == \
+        ('/tmp/nmea.sock', 0o640, 8, 'coalesce-latest')
+    assert isinstance(dgram, UnixDatagramSink) and dgram.path == '@opencpn'
+    for bad in ('unix', 'unix-dgram'):
+        try:
+            create_sinks({'sinks': bad})
+        except ValueError:
+            pass
+        else:
+            raise AssertionError(f"{bad!r} should be rejected")
+
+
+if __name__ == "__main__":
+    test_datagram_sink()
+    test_datagram_sink_full_receiver()
+    test_stream_server()
+    test_stream_server_in_use()
+    test_abstract_stream_server()
+    test_create_unix_sinks()
+    print("All Unix socket sink tests passed")
@@ -53,24 +53,23 @@ def test_parser(port='/dev/ttyUSB0', baud=9600):
             if ser.in_waiting > 0:
                 data = ser.read(ser.in_waiting)
                 
-                for byte in data:
-                    if parser.process_byte(byte):
-                        packet_count += 1
-                        data = parser.get_data()
-                        
-                        print(f"Packet {packet_count}:")
-                        print(f"  Timestamp: {data.timestamp}")
-                        print(f"  Acceleration: X={data.acc_x:.2f}, Y={data.acc_y:.2f}, Z={data.acc_z:.2f} m/s²")
-                        print(f"  Gyroscope: X={data.gyro_x:.2f}, Y={data.gyro_y:.2f}, Z={data.gyro_z:.2f} °/s")
-                        print(f"  Angles: Roll={data.roll:.2f}, Pitch={data.pitch:.2f}, Yaw={data.yaw:.2f} °")
-                        print(f"  Magnetic: X={data.mag_x}, Y={data.mag_y}, Z={data.mag_z}")
-                        print(f"  Temperature: {data.temperature:.1f} °C")
-                        print(f"  Pressure: {data.pressure:.1f} hPa")
-                        print(f"  GPS: Lat={data.latitude:.6f}, Lon={data.longitude:.6f}")
-                        print(f"  GPS: Alt={data.gps_altitude:.1f}m, Speed={data.gps_velocity:.1f}m/s")
-                        print(f"  Satellites: {data.satellites}, HDOP: {data.hdop:.1f}")
-                        print()
-                        
+                for _ in parser.feed(data):
+                    packet_count += 1
+                    data = parser.get_data()
+                    
+                    print(f"Packet {packet_count}:")
+                    print(f"  Timestamp: {data.timestamp}")
+                    print(f"  Acceleration: X={data.acc_x:.2f}, Y={data.acc_y:.2f}, Z={data.acc_z:.2f} m/s²")
+                    print(f"  Gyroscope: X={data.gyro_x:.2f}, Y={data.gyro_y:.2f}, Z={data.gyro_z:.2f} °/s")
+                    print(f"  Angles: Roll={data.roll:.2f}, Pitch={data.pitch:.2f}, Yaw={data.yaw:.2f} °")
+                    print(f"  Magnetic: X={data.mag_x}, Y={data.mag_y}, Z={data.mag_z}")
+                    print(f"  Temperature: {data.temperature:.1f} °C")
+                    print(f"  Pressure: {data.pressure:.1f} hPa")
+                    print(f"  GPS: Lat={data.latitude:.6f}, Lon={data.longitude:.6f}")
+                    print(f"  GPS: Alt={data.gps_altitude:.1f}m, Speed={data.gps_velocity:.1f}m/s")
+                    print(f"  Satellites: {data.satellites}, HDOP: {data.hdop:.1f}")
+                    print()
+                    
         print(f"Processed {packet_count} packets in 10 seconds")
         ser.close()
         
@@ -97,16 +96,15 @@ def test_nmea_output(port='/dev/ttyUSB0', baud=9600):
             if ser.in_waiting > 0:
                 data = ser.read(ser.in_waiting)
                 
-                for byte in data:
-                    if parser.process_byte(byte):
-                        sensor_data = parser.get_data()
-                        sentences = converter.generate_all_sentences(sensor_data)
-                        
-                        print("Generated NMEA sentences:")
-                        for sentence in sentences:
-                            print(f"  {sentence}")
-                        print()
-                        
+                for _ in parser.feed(data):
+                    sensor_data = parser.get_data()
+                    sentences = converter.generate_all_sentences(sensor_data)
+                    
+                    print("Generated NMEA sentences:")
+                    for sentence in sentences:
+                        print(f"  {sentence}")
+                    print()
+                    
         ser.close()
         
     except Exception as e:
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Unix domain socket sinks for the WTGAHRS2 bridge
+For consumers on the same host: no loopback IP stack, no port to collide
+with, and access controlled by the socket file's permissions.  Names
+starting with '@' are Linux abstract-namespace sockets (no file at all).
+"""
+
+import asyncio
+import errno
+import logging
+import os
+import socket
+import stat
+from typing import List
+from bounded_queue import DROP_OLDEST
+from output_sinks import OutputSink
+from tcp_sink import TCPNMEAServer
+
+
+def socket_address(path: str) -> str:
+    """Address to bind or connect: '@name' is the abstract name '\\0name'"""
+    return "\0" + path[1:] if path.startswith('@') else path
+
+
+def _remove_socket_file(path: str):
+    """Remove a socket file (never other files)"""
+    try:
+        if stat.S_ISSOCK(os.stat(path).st_mode):
+            os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+def _remove_stale_socket(path: str):
+    """Remove a socket file left behind by an earlier run
+
+    Only a socket nobody listens on is stale; one that still accepts
+    connections belongs to a running server and is left alone.
+    """
+    try:
+        if not stat.S_ISSOCK(os.stat(path).st_mode):
+            return
+    except FileNotFoundError:
+        return
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(path)
+    except ConnectionRefusedError:
+        _remove_socket_file(path)
+        return
+    finally:
+        probe.close()
+    raise OSError(errno.EADDRINUSE, f"Address already in use by a running server: {path}")
+
+
+class UnixDatagramSink(OutputSink):
+    """Send each frame as one datagram to a consumer's bound socket"""
+
+    name = 'unix-dgram'
+
+    def __init__(self, path: str):
+        self.path = path
+        self.socket = None
+        self.connected = False
+        # Counters
+        self.datagrams_sent = 0
+        self.bytes_sent = 0
+        # Frames lost because the receiver's queue was full / nobody bound
+        self.dropped = 0
+        self.undelivered = 0
+
+    def open(self) -> bool:
+        """Create the socket; the consumer may bind its end later"""
+        self.socket = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        # Never block the worker on a consumer that stopped reading
+        self.socket.setblocking(False)
+        if self._connect():
+            logging.info(f"Sending NMEA datagrams to {self.path}")
+        else:
+            logging.warning(f"No receiver bound at {self.path} yet; will keep trying")
+        return True
+
+    def _connect(self) -> bool:
+        """(Re)connect to the receiver; False while nothing is bound"""
+        try:
+            self.socket.connect(socket_address(self.path))
+        except (FileNotFoundError, ConnectionRefusedError, PermissionError):
+            self.connected = False
+        else:
+            self.connected = True
+        return self.connected
+
+    def send_batch(self, sentences: List[bytes]):
+        """Send the frame as a single datagram (no MTU to respect)"""
+        if not self.connected and not self._connect():
+            self.undelivered += 1
+            return
+        try:
+            self.bytes_sent += self.socket.send(b"".join(sentences))
+            self.datagrams_sent += 1
+        except BlockingIOError:
+            self.dropped += 1
+        except ConnectionRefusedError:
+            # Receiver closed its socket; reconnect on the next frame
+            self.connected = False
+            self.undelivered += 1
+
+    def describe(self) -> str:
+        """Frames lost to a slow or absent receiver"""
+        return (f"{self.datagrams_sent} datagrams, {self.dropped} dropped by a full receiver, "
+                f"{self.undelivered} with no receiver")
+
+    def close(self):
+        """Close the socket"""
+        if self.socket:
+            self.socket.close()
+            self.socket = None
+        self.connected = False
+
+
+class UnixNMEAServer(TCPNMEAServer):
+    """Unix stream socket server with the TCP server's per-client queues"""
+
+    name = 'unix'
+
+    def __init__(self, path: str, mode: int = 0o660, client_queue: int = 32,
+                 policy: str = DROP_OLDEST, **kwargs):
+        super().__init__(client_queue=client_queue, policy=policy, **kwargs)
+        self.path = path
+        # Socket file permissions; connecting needs write access
+        self.mode = mode
+
+    @property
+    def abstract(self) -> bool:
+        """True for an abstract-namespace socket (no file, no permissions)"""
+        return self.path.startswith('@')
+
+    @property
+    def address(self) -> str:
+        """Socket path for log messages"""
+        return self.path
+
+    async def _listen(self) -> asyncio.AbstractServer:
+        """Bind, set permissions, then listen (event loop thread)"""
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            if not self.abstract:
+                _remove_stale_socket(self.path)
+            sock.bind(socket_address(self.path))
+            # Before listen(), so no client can connect under the umask mode
+            if not self.abstract:
+                os.chmod(self.path, self.mode)
+            return await asyncio.start_unix_server(self._handle_client, sock=sock)
+        except OSError:
+            sock.close()
+            raise
+
+    def close(self, timeout: float = 2.0):
+        """Shut the server down and remove its socket file"""
+        listening = self.server is not None
+        super().close(timeout)
+        if listening and not self.abstract:
+            _remove_socket_file(self.path)
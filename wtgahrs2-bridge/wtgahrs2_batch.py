@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Vectorised batch decoder for raw WTGAHRS2 captures
+Decodes a whole WitMotion byte stream into one NumPy structured array per
+packet type, for offline analysis of large captures.  Framing follows
+WTGAHRS2Parser with resync enabled and the scale factors are shared with it.
+"""
+
+import sys
+from typing import Dict, Union
+import numpy as np
+from wtgahrs2_parser import (
+    ACCELERATION_SCALE, ANGLE_SCALE, GYRO_SCALE, MAX_GPS_VELOCITY, PACKET_HEADER,
+    PACKET_LENGTH, QUATERNION_SCALE, WitMotionPacketType,
+)
+
+
+# Structured output layouts; every record carries its byte offset in the capture
+PACKET_DTYPES = {
+    WitMotionPacketType.TIME: np.dtype([
+        ('offset', 'i8'), ('year', 'u2'), ('month', 'u1'), ('day', 'u1'),
+        ('hour', 'u1'), ('minute', 'u1'), ('second', 'u1'), ('millisecond', 'u2')]),
+    WitMotionPacketType.ACCELERATION: np.dtype([
+        ('offset', 'i8'), ('acc_x', 'f8'), ('acc_y', 'f8'), ('acc_z', 'f8'), ('temperature', 'f8')]),
+    WitMotionPacketType.ANGULAR_VELOCITY: np.dtype([
+        ('offset', 'i8'), ('gyro_x', 'f8'), ('gyro_y', 'f8'), ('gyro_z', 'f8')]),
+    WitMotionPacketType.ANGLE: np.dtype([
+        ('offset', 'i8'), ('roll', 'f8'), ('pitch', 'f8'), ('yaw', 'f8')]),
+    WitMotionPacketType.MAGNETIC: np.dtype([
+        ('offset', 'i8'), ('mag_x', 'f8'), ('mag_y', 'f8'), ('mag_z', 'f8')]),
+    WitMotionPacketType.PRESSURE: np.dtype([
+        ('offset', 'i8'), ('pressure', 'f8'), ('altitude', 'f8')]),
+    WitMotionPacketType.LONGITUDE_LATITUDE: np.dtype([
+        ('offset', 'i8'), ('longitude', 'f8'), ('latitude', 'f8')]),
+    WitMotionPacketType.ALTITUDE_VELOCITY: np.dtype([
+        ('offset', 'i8'), ('gps_altitude', 'f8'), ('gps_velocity', 'f8'), ('gps_heading', 'f8')]),
+    WitMotionPacketType.QUATERNION: np.dtype([
+        ('offset', 'i8'), ('q0', 'f8'), ('q1', 'f8'), ('q2', 'f8'), ('q3', 'f8')]),
+    WitMotionPacketType.GPS_ACCURACY: np.dtype([
+        ('offset', 'i8'), ('satellites', 'i4'), ('pdop', 'f8'), ('hdop', 'f8'), ('vdop', 'f8')]),
+}
+
+
+def find_frames(raw: np.ndarray) -> np.ndarray:
+    """Return the start offsets of all valid, non-overlapping frames"""
+    if len(raw) < PACKET_LENGTH:
+        return np.empty(0, dtype=np.int64)
+
+    # Candidate headers whose checksum matches.  The sum is gathered one
+    # byte column at a time into uint16, so memory stays proportional to
+    # the candidates rather than eight bytes per input byte
+    candidates = np.flatnonzero(raw[:len(raw) - PACKET_LENGTH + 1] == PACKET_HEADER)
+    checksums = np.full(len(candidates), PACKET_HEADER, dtype=np.uint16)
+    for column in range(1, PACKET_LENGTH - 1):
+        checksums += raw[candidates + column]
+    starts = candidates[(checksums & 0xFF) == raw[candidates + PACKET_LENGTH - 1]]
+
+    # A valid frame can only overlap another one when a 0x55 payload byte
+    # happens to checksum correctly.  Those clusters are rare, so resolve
+    # them greedily (first frame wins) like the streaming parser does.
+    overlapping = np.flatnonzero(np.diff(starts) < PACKET_LENGTH)
+    if len(overlapping):
+        keep = np.ones(len(starts), dtype=bool)
+        involved = np.union1d(overlapping, overlapping + 1)
+        frame_end = -1
+        for index in involved:
+            if starts[index] < frame_end:
+                keep[index] = False
+            else:
+                frame_end = starts[index] + PACKET_LENGTH
+        starts = starts[keep]
+
+    return starts
+
+
+def _ddmm_to_degrees(raw: np.ndarray) -> np.ndarray:
+    """Vectorised wtgahrs2_parser.ddmm_to_degrees"""
+    value = np.abs(raw) / 10000000.0
+    degrees = np.floor(value)
+    return np.copysign(degrees + (value - degrees) * 100 / 60.0, raw)
+
+
+def _decode(packet_type: int, offsets: np.ndarray, payload: np.ndarray) -> np.ndarray:
+    """Decode the (N, 8) payload bytes of one packet type"""
+    out = np.zeros(len(offsets), dtype=PACKET_DTYPES[packet_type])
+    out['offset'] = offsets
+    payload = np.ascontiguousarray(payload)
+    int16 = payload.view('<i2')
+    uint16 = payload.view('<u2')
+
+    if packet_type == WitMotionPacketType.TIME:
+        out['year'] = payload[:, 0].astype(np.uint16) + 2000
+        out['month'] = payload[:, 1]
+        out['day'] = payload[:, 2]
+        out['hour'] = payload[:, 3]
+        out['minute'] = payload[:, 4]
+        out['second'] = payload[:, 5]
+        out['millisecond'] = uint16[:, 3]
+    elif packet_type == WitMotionPacketType.ACCELERATION:
+        out['acc_x'] = int16[:, 0] * ACCELERATION_SCALE
+        out['acc_y'] = int16[:, 1] * ACCELERATION_SCALE
+        out['acc_z'] = int16[:, 2] * ACCELERATION_SCALE
+        out['temperature'] = uint16[:, 3] * 0.01
+    elif packet_type == WitMotionPacketType.ANGULAR_VELOCITY:
+        out['gyro_x'] = int16[:, 0] * GYRO_SCALE
+        out['gyro_y'] = int16[:, 1] * GYRO_SCALE
+        out['gyro_z'] = int16[:, 2] * GYRO_SCALE
+    elif packet_type == WitMotionPacketType.ANGLE:
+        out['roll'] = int16[:, 0] * ANGLE_SCALE
+        out['pitch'] = int16[:, 1] * ANGLE_SCALE
+        out['yaw'] = int16[:, 2] * -ANGLE_SCALE
+    elif packet_type == WitMotionPacketType.MAGNETIC:
+        out['mag_x'] = int16[:, 0]
+        out['mag_y'] = int16[:, 1]
+        out['mag_z'] = int16[:, 2]
+    elif packet_type == WitMotionPacketType.PRESSURE:
+        out['pressure'] = payload.view('<i4')[:, 0] * 0.01
+        out['altitude'] = uint16[:, 2] * 0.01
+    elif packet_type == WitMotionPacketType.LONGITUDE_LATITUDE:
+        int32 = payload.view('<i4')
+        out['longitude'] = _ddmm_to_degrees(int32[:, 0])
+        out['latitude'] = _ddmm_to_degrees(int32[:, 1])
+    elif packet_type == WitMotionPacketType.ALTITUDE_VELOCITY:
+        velocity = int16[:, 1] * 0.1
+        out['gps_altitude'] = int16[:, 0] * 0.1
+        out['gps_velocity'] = np.where(np.abs(velocity) > MAX_GPS_VELOCITY, 0.0, velocity)
+        out['gps_heading'] = uint16[:, 2] * 0.1
+    elif packet_type == WitMotionPacketType.QUATERNION:
+        out['q0'] = int16[:, 0] * QUATERNION_SCALE
+        out['q1'] = int16[:, 1] * QUATERNION_SCALE
+        out['q2'] = int16[:, 2] * QUATERNION_SCALE
+        out['q3'] = int16[:, 3] * QUATERNION_SCALE
+    elif packet_type == WitMotionPacketType.GPS_ACCURACY:
+        out['satellites'] = uint16[:, 0]
+        out['pdop'] = uint16[:, 1] * 0.01
+        out['hdop'] = uint16[:, 2] * 0.01
+        out['vdop'] = uint16[:, 3] * 0.01
+
+    return out
+
+
+def decode_buffer(data: Union[bytes, bytearray, memoryview, np.ndarray]) -> Dict[int, np.ndarray]:
+    """Decode a whole capture into structured arrays keyed by packet type
+
+    Packet types without a known layout are skipped.  Every known type is
+    present in the result, possibly as an empty array.
+    """
+    raw = np.frombuffer(data, dtype=np.uint8) if not isinstance(data, np.ndarray) else data
+    starts = find_frames(raw)
+    types = raw[starts + 1]
+
+    result = {}
+    for packet_type in PACKET_DTYPES:
+        offsets = starts[types == packet_type]
+        # Payload gathered column by column as uint8, without an
+        # (N, 11) int64 index array
+        payload = np.empty((len(offsets), PACKET_LENGTH - 3), dtype=np.uint8)
+        for column in range(PACKET_LENGTH - 3):
+            payload[:, column] = raw[offsets + 2 + column]
+        result[packet_type] = _decode(packet_type, offsets, payload)
+    return result
+
+
+def decode_file(path: str) -> Dict[int, np.ndarray]:
+    """Decode a raw capture file"""
+    return decode_buffer(np.fromfile(path, dtype=np.uint8))
+
+
+def main():
+    """Summarise a raw capture file"""
+    if len(sys.argv) < 2:
+        print(f"Usage: {sys.argv[0]} <capture.bin>")
+        return 1
+
+    decoded = decode_file(sys.argv[1])
+    for packet_type, records in decoded.items():
+        print(f"0x{packet_type:02X} {WitMotionPacketType(packet_type).name:<20} {len(records)} packets")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
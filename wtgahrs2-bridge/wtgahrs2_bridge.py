@@ -2,60 +2,26 @@
 """
 WTGAHRS2 to OpenCPN Bridge
 Reads data from WTGAHRS2 device and streams NMEA sentences to OpenCPN via UDP
+(or any other configured output sinks)
 """
 
 import sys
 import time
-import socket
 import threading
 import logging
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
 import serial
 import pynmea2
 from wtgahrs2_parser import WTGAHRS2Parser, WitMotionData
 from nmea_converter import NMEAConverter
+from sentence_scheduler import SentenceScheduler, parse_sentence_rates
+from output_sinks import UDPNMEAServer, create_sinks, create_workers
+from serial_watch import MAX_RECONNECT_RETRY, RECONNECT_RETRY, DeviceWatcher
 
 
-class UDPNMEAServer:
-    """UDP server for streaming NMEA data to OpenCPN"""
-    
-    def __init__(self, host: str = "127.0.0.1", port: int = 10110):
-        self.host = host
-        self.port = port
-        self.socket = None
-        self.running = False
-        
-    def start(self):
-        """Start the UDP server"""
-        try:
-            self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-            self.running = True
-            logging.info(f"UDP NMEA server ready to send to {self.host}:{self.port}")
-        except Exception as e:
-            logging.error(f"Failed to start UDP server: {e}")
-            return False
-        return True
-    
-    def send_nmea(self, sentence: str):
-        """Send NMEA sentence via UDP"""
-        if not self.running or not self.socket:
-            return
-            
-        try:
-            message = sentence + "\r\n"
-            self.socket.sendto(message.encode('utf-8'), (self.host, self.port))
-            logging.debug(f"Sent: {sentence}")
-        except Exception as e:
-            logging.error(f"Failed to send NMEA: {e}")
-    
-    def stop(self):
-        """Stop the UDP server"""
-        self.running = False
-        if self.socket:
-            self.socket.close()
-            self.socket = None
+# Seconds between statistics log lines
+STATS_INTERVAL = 10.0
 
 
 class WTGAHRS2Bridge:
@@ -63,21 +29,36 @@ class WTGAHRS2Bridge:
     
     def __init__(self, config_file: str = "config.ini"):
         self.config = self.load_config(config_file)
-        self.parser = WTGAHRS2Parser()
+        self.parser = WTGAHRS2Parser(
+            resync=self.config.get('resync', True),
+            frame_terminal_type=self.config.get('frame_terminal_type')
+        )
         self.nmea_converter = NMEAConverter(
-            magnetic_declination=self.config.get('magnetic_declination', 0.0)
+            magnetic_declination=self.config.get('magnetic_declination', 0.0),
+            time_source=self.config.get('time_source', 'host'),
+            resend_interval=self.config.get('resend_interval', 1.0),
+            profile=self.config.get('output_profile', 'full-telemetry'),
+            xdr_mode=self.config.get('xdr_mode', 'single')
         )
-        self.udp_server = UDPNMEAServer(
-            host=self.config.get('udp_host', '127.0.0.1'),
-            port=self.config.get('udp_port', 10110)
+        # Only sentences of the output profile are ever scheduled
+        self.scheduler = SentenceScheduler(
+            self.nmea_converter.profile,
+            default_rate=self.config.get('update_rate', 10.0),
+            rates=self.config.get('sentence_rates')
         )
+        # Output sinks are built from the config by start_sinks(); the
+        # first UDP sink is also kept as udp_server
+        self.sink_workers = []
+        self.udp_server = None
+        # Shared-memory latest-state block (shm_state config key)
+        self.state_publisher = None
         self.serial_port = None
         self.running = False
         self.nmea_buffer = []
         
         # Statistics
-        self.packets_processed = 0
         self.nmea_sentences_sent = 0
+        self.serial_reconnects = 0
         self.last_stats_time = time.time()
         
     def load_config(self, config_file: str) -> dict:
@@ -87,8 +68,31 @@ class WTGAHRS2Bridge:
             'baud_rate': 9600,
             'udp_host': '127.0.0.1',
             'udp_port': 10110,
+            'udp_max_datagram': 0,
+            'udp_targets': '',
+            'udp_multicast_ttl': 1,
+            'udp_interface': '',
+            'udp_broadcast': False,
+            'tcp_host': '0.0.0.0',
+            'tcp_port': 10110,
+            'tcp_client_queue': '32:drop-oldest',
+            'unix_mode': '660',
+            'unix_client_queue': '32:drop-oldest',
             'magnetic_declination': 0.0,
+            'read_timeout': 1.0,
             'update_rate': 10.0,  # Hz
+            'resync': True,
+            'frame_terminal_type': None,
+            'time_source': 'host',
+            'sentence_rates': {},
+            'resend_interval': 1.0,
+            'output_profile': 'full-telemetry',
+            'xdr_mode': 'single',
+            'runtime': 'threads',
+            'ring_size': 65536,
+            'sinks': 'udp',
+            'sink_queue': '64:drop-oldest',
+            'shm_state': '',
             'log_level': 'INFO'
         }
         
@@ -105,10 +109,16 @@ class WTGAHRS2Bridge:
                             value = value.strip()
                             
                             # Convert to appropriate type
-                            if key in ['baud_rate', 'udp_port']:
+                            if key in ['baud_rate', 'udp_port', 'udp_max_datagram', 'udp_multicast_ttl', 'tcp_port', 'ring_size']:
                                 config[key] = int(value)
-                            elif key in ['magnetic_declination', 'update_rate']:
+                            elif key in ['magnetic_declination', 'update_rate', 'resend_interval', 'read_timeout']:
                                 config[key] = float(value)
+                            elif key in ['resync', 'udp_broadcast']:
+                                config[key] = value.lower() in ('1', 'true', 'yes', 'on')
+                            elif key in ['sentence_rates']:
+                                config[key] = parse_sentence_rates(value)
+                            elif key in ['frame_terminal_type']:
+                                config[key] = int(value, 0) if value else None
                             else:
                                 config[key] = value
                                 
@@ -129,47 +139,167 @@ class WTGAHRS2Bridge:
             ]
         )
     
+    def open_serial(self):
+        """Open the WTGAHRS2 serial port; raises if it cannot be opened"""
+        self.serial_port = serial.Serial(
+            port=self.config['serial_port'],
+            baudrate=self.config['baud_rate'],
+            # Reads block up to this long; bounds shutdown latency
+            timeout=self.config.get('read_timeout', 1.0)
+        )
+        logging.info(f"Connected to {self.config['serial_port']} at {self.config['baud_rate']} baud")
+    
     def connect_serial(self) -> bool:
         """Connect to WTGAHRS2 serial port"""
         try:
-            self.serial_port = serial.Serial(
-                port=self.config['serial_port'],
-                baudrate=self.config['baud_rate'],
-                timeout=1.0
-            )
-            logging.info(f"Connected to {self.config['serial_port']} at {self.config['baud_rate']} baud")
+            self.open_serial()
             return True
         except Exception as e:
             logging.error(f"Failed to connect to serial port: {e}")
             return False
     
+    def read_serial(self) -> bytes:
+        """Block until serial data arrives and return everything buffered
+
+        The read blocks in the kernel (select on the port fd) for at most
+        the port timeout, so an idle device costs one wakeup per timeout
+        instead of a polling loop, and data is handled as soon as it lands.
+        Returns b"" on timeout.
+        """
+        data = self.serial_port.read(1)
+        if data:
+            waiting = self.serial_port.in_waiting
+            if waiting:
+                data += self.serial_port.read(waiting)
+        return data
+    
+    def reconnect_serial(self) -> bool:
+        """Reopen the serial port after losing it (e.g. device unplugged)
+
+        Sinks, parser and scheduler state are kept.  Waits for the device
+        node to return (inotify on its directory, see serial_watch) and
+        reopens it straight away.  Returns False if the bridge stops first.
+        """
+        port = self.config['serial_port']
+        if self.serial_port is not None:
+            try:
+                self.serial_port.close()
+            except Exception:
+                pass
+        logging.warning(f"Serial port {port} lost, waiting for the device to return")
+        lost = time.monotonic()
+        retry = RECONNECT_RETRY
+        failures = 0
+        watcher = DeviceWatcher(port)
+        try:
+            while self.running:
+                # Wait in slices so shutdown is noticed
+                if not watcher.wait(1.0):
+                    # Gone again: back off from the start once it returns
+                    retry = RECONNECT_RETRY
+                    continue
+                try:
+                    self.open_serial()
+                except Exception as e:
+                    # Logged once, not on every backoff retry
+                    if not failures:
+                        logging.warning(f"Serial port {port} is back but cannot be opened yet, "
+                                        f"retrying: {e}")
+                    failures += 1
+                    time.sleep(retry)
+                    retry = min(retry * 2, MAX_RECONNECT_RETRY)
+                    continue
+                if not self.running:
+                    # Stopped while opening: do not hand back a port that
+                    # shutdown has already passed over
+                    self.serial_port.close()
+                    return False
+                self.serial_reconnects += 1
+                logging.info(f"Serial port {port} reconnected after {time.monotonic() - lost:.2f} s "
+                             f"({failures} failed attempts)")
+                return True
+        finally:
+            watcher.close()
+        return False
+    
     def process_serial_data(self):
         """Process incoming serial data"""
         while self.running:
             try:
-                if self.serial_port and self.serial_port.in_waiting > 0:
-                    data = self.serial_port.read(self.serial_port.in_waiting)
-                    
-                    for byte in data:
-                        if self.parser.process_byte(byte):
-                            self.packets_processed += 1
-                            self.process_sensor_data()
-                            
-                time.sleep(0.001)  # Small delay to prevent CPU spinning
+                data = self.read_serial()
+                for frame in self.parser.feed_frames(data):
+                    self.process_sensor_data(frame)
                 
+            except (serial.SerialException, OSError) as e:
+                if self.running:
+                    logging.error(f"Serial port error: {e}")
+                    self.reconnect_serial()
             except Exception as e:
                 logging.error(f"Error processing serial data: {e}")
                 time.sleep(1.0)
     
-    def process_sensor_data(self):
-        """Process sensor data and generate NMEA sentences"""
+    def convert_frame(self, data: WitMotionData) -> List[bytes]:
+        """Encode the NMEA sentences due for one frame"""
+        now = time.monotonic()
+        due = self.scheduler.due(now)
+        return self.nmea_converter.encode_changed(data, due, now)
+    
+    def start_sinks(self) -> bool:
+        """Open the configured sinks, each behind its own worker thread,
+        and the shared-memory state block if configured"""
         try:
-            data = self.parser.get_data()
-            sentences = self.nmea_converter.generate_all_sentences(data)
-            
-            for sentence in sentences:
-                self.udp_server.send_nmea(sentence)
-                self.nmea_sentences_sent += 1
+            sinks = create_sinks(self.config)
+        except ValueError as e:
+            logging.error(f"Invalid sinks setting: {e}")
+            return False
+        workers = create_workers(sinks, self.config.get('sink_queue'))
+        for worker in workers:
+            if not worker.start():
+                logging.error(f"Failed to open {worker.sink.name} sink")
+                self.stop_sinks()
+                return False
+            self.sink_workers.append(worker)
+        if self.config.get('shm_state'):
+            from shm_state import ShmStatePublisher
+            try:
+                self.state_publisher = ShmStatePublisher(self.config['shm_state'])
+            except OSError as e:
+                logging.error(f"Failed to create shared memory state {self.config['shm_state']}: {e}")
+                self.stop_sinks()
+                return False
+            logging.info(f"Publishing latest state to shared memory {self.config['shm_state']}")
+        self.udp_server = next((sink for sink in sinks if isinstance(sink, UDPNMEAServer)), None)
+        return True
+    
+    def stop_sinks(self):
+        """Stop the sink workers and remove the shared-memory state block"""
+        for worker in self.sink_workers:
+            worker.stop()
+        self.sink_workers = []
+        if self.state_publisher is not None:
+            self.state_publisher.close()
+            self.state_publisher = None
+    
+    def publish_frame(self, data: WitMotionData):
+        """Make a frame the latest shared-memory state (every frame, unscheduled)"""
+        if self.state_publisher is not None:
+            self.state_publisher.publish(data)
+    
+    def send_sentences(self, sentences: List[bytes]):
+        """Hand one frame's encoded sentences to every sink"""
+        for worker in self.sink_workers:
+            worker.submit(sentences)
+        for sentence in sentences:
+            # Some buffers hold several sentences (ACC, packed XDR)
+            self.nmea_sentences_sent += sentence.count(b"\n")
+    
+    def process_sensor_data(self, data: Optional[WitMotionData] = None):
+        """Process one frame of sensor data and generate NMEA sentences"""
+        try:
+            if data is None:
+                data = self.parser.get_data()
+            self.publish_frame(data)
+            self.send_sentences(self.convert_frame(data))
                 
         except Exception as e:
             logging.error(f"Error processing sensor data: {e}")
@@ -180,43 +310,73 @@ class WTGAHRS2Bridge:
         
         while self.running:
             try:
-                if self.serial_port and self.serial_port.in_waiting > 0:
-                    data = self.serial_port.read(self.serial_port.in_waiting)
-                    nmea_buffer += data.decode('utf-8', errors='ignore')
+                data = self.read_serial()
+                nmea_buffer += data.decode('utf-8', errors='ignore')
+                
+                # Process complete NMEA sentences
+                while '\n' in nmea_buffer:
+                    line, nmea_buffer = nmea_buffer.split('\n', 1)
+                    line = line.strip()
                     
-                    # Process complete NMEA sentences
-                    while '\n' in nmea_buffer:
-                        line, nmea_buffer = nmea_buffer.split('\n', 1)
-                        line = line.strip()
-                        
-                        if line.startswith('$') and '*' in line:
-                            try:
-                                # Validate NMEA sentence
-                                msg = pynmea2.parse(line)
-                                self.udp_server.send_nmea(line)
-                                self.nmea_sentences_sent += 1
-                            except pynmea2.ParseError:
-                                pass  # Ignore invalid sentences
-                                
-                time.sleep(0.01)
+                    if line.startswith('$') and '*' in line:
+                        try:
+                            # Validate NMEA sentence
+                            msg = pynmea2.parse(line)
+                            self.send_sentences([(line + "\r\n").encode('ascii')])
+                        except pynmea2.ParseError:
+                            pass  # Ignore invalid sentences
                 
+            except (serial.SerialException, OSError) as e:
+                if self.running:
+                    logging.error(f"Serial port error: {e}")
+                    self.reconnect_serial()
             except Exception as e:
                 logging.error(f"Error processing NMEA passthrough: {e}")
                 time.sleep(1.0)
     
+    def log_statistics(self):
+        """Log runtime statistics once"""
+        parser_stats = self.parser.stats
+        logging.info(f"Stats: {parser_stats.packets} packets processed, "
+                   f"{parser_stats.frames} frames, "
+                   f"{self.nmea_sentences_sent} NMEA sentences sent")
+        for worker in self.sink_workers:
+            logging.info(f"Sink {worker.describe()}")
+        if self.serial_reconnects:
+            logging.info(f"Serial: {self.serial_reconnects} reconnects")
+        clock = self.parser.clock
+        if clock.samples:
+            drift = clock.drift
+            drift_str = f"{drift * 1e6:.1f} ppm" if drift is not None else "n/a"
+            logging.info(f"Clock: host-device offset {clock.offset * 1000:.1f} ms, "
+                       f"latency {clock.latency * 1000:.1f} ms, "
+                       f"jitter {clock.jitter * 1000:.1f} ms, drift {drift_str}")
+        checksum_failures = dict(parser_stats.checksum_failures)
+        if checksum_failures:
+            failures = ", ".join(f"0x{t:02X}={n}" for t, n in sorted(checksum_failures.items()))
+            logging.info(f"Link: {parser_stats.resyncs} resyncs, "
+                       f"{parser_stats.bytes_discarded} bytes discarded, "
+                       f"checksum failures: {failures}")
+    
     def print_statistics(self):
         """Print runtime statistics"""
         while self.running:
             current_time = time.time()
             elapsed = current_time - self.last_stats_time
             
-            if elapsed >= 10.0:  # Print stats every 10 seconds
-                logging.info(f"Stats: {self.packets_processed} packets processed, "
-                           f"{self.nmea_sentences_sent} NMEA sentences sent")
+            if elapsed >= STATS_INTERVAL:
+                self.log_statistics()
                 self.last_stats_time = current_time
                 
             time.sleep(1.0)
     
+    def create_threads(self) -> List[threading.Thread]:
+        """Worker threads started by run()"""
+        return [
+            threading.Thread(target=self.process_serial_data, daemon=True),
+            threading.Thread(target=self.print_statistics, daemon=True),
+        ]
+    
     def run(self):
         """Main run loop"""
         self.setup_logging()
@@ -227,19 +387,15 @@ class WTGAHRS2Bridge:
             logging.error("Failed to connect to serial port")
             return 1
         
-        # Start UDP server
-        if not self.udp_server.start():
-            logging.error("Failed to start UDP server")
+        # Start output sinks
+        if not self.start_sinks():
+            logging.error("Failed to start output sinks")
             return 1
         
         # Start processing threads
         self.running = True
-        
-        serial_thread = threading.Thread(target=self.process_serial_data, daemon=True)
-        stats_thread = threading.Thread(target=self.print_statistics, daemon=True)
-        
-        serial_thread.start()
-        stats_thread.start()
+        for thread in self.create_threads():
+            thread.start()
         
         logging.info("Bridge running. Press Ctrl+C to stop.")
         
@@ -259,7 +415,7 @@ class WTGAHRS2Bridge:
         if self.serial_port:
             self.serial_port.close()
             
-        self.udp_server.stop()
+        self.stop_sinks()
         logging.info("Bridge stopped")
 
 
@@ -270,27 +426,40 @@ def main():
     parser = argparse.ArgumentParser(description="WTGAHRS2 to OpenCPN Bridge")
     parser.add_argument('--config', default='config.ini', 
                        help='Configuration file path')
-    parser.add_argument('--port', default='/dev/ttyUSB0',
-                       help='Serial port for WTGAHRS2')
-    parser.add_argument('--baud', type=int, default=9600,
-                       help='Baud rate for serial connection')
-    parser.add_argument('--udp-host', default='127.0.0.1',
-                       help='UDP host for NMEA output')
-    parser.add_argument('--udp-port', type=int, default=10110,
-                       help='UDP port for NMEA output')
+    parser.add_argument('--port',
+                       help='Serial port for WTGAHRS2 (overrides config)')
+    parser.add_argument('--baud', type=int,
+                       help='Baud rate for serial connection (overrides config)')
+    parser.add_argument('--udp-host',
+                       help='UDP host for NMEA output (overrides config)')
+    parser.add_argument('--udp-port', type=int,
+                       help='UDP port for NMEA output (overrides config)')
+    parser.add_argument('--runtime', choices=['threads', 'asyncio', 'pipeline', 'processes'],
+                       help='Bridge runtime (overrides config)')
     
     args = parser.parse_args()
     
     # Create bridge with command line overrides
     bridge = WTGAHRS2Bridge(args.config)
+    runtime = args.runtime or bridge.config['runtime']
+    if runtime == 'asyncio':
+        from async_bridge import AsyncWTGAHRS2Bridge
+        bridge = AsyncWTGAHRS2Bridge(args.config)
+    elif runtime == 'pipeline':
+        from pipeline import PipelineWTGAHRS2Bridge
+        bridge = PipelineWTGAHRS2Bridge(args.config)
+    elif runtime == 'processes':
+        from process_bridge import ProcessWTGAHRS2Bridge
+        bridge = ProcessWTGAHRS2Bridge(args.config)
     
     # Override config with command line args
-    bridge.config.update({
+    overrides = {
         'serial_port': args.port,
         'baud_rate': args.baud,
         'udp_host': args.udp_host,
         'udp_port': args.udp_port
-    })
+    }
+    bridge.config.update({key: value for key, value in overrides.items() if value is not None})
     
     return bridge.run()
 
@@ -4,13 +4,42 @@ WTGAHRS2 WitMotion Protocol Parser
 Parses data from WTGAHRS2 GPS/AHRS/IMU device
 """
 
+import calendar
+import math
 import struct
 import time
-from typing import Dict, Optional, Tuple
-from dataclasses import dataclass
+from array import array
+from collections import deque
+from typing import Callable, Dict, Iterator, Optional, Tuple
+from dataclasses import dataclass, field
 from enum import IntEnum
 
 
+PACKET_HEADER = 0x55
+PACKET_LENGTH = 11
+# Initial receive buffer size, grows to the largest chunk seen
+RECEIVE_BUFFER_SIZE = 4096
+
+# Scale factors from raw register counts to engineering units
+ACCELERATION_SCALE = 16.0 * 9.8 / 32768.0  # ±16g range, m/s²
+GYRO_SCALE = 2000.0 / 32768.0  # ±2000°/s range
+ANGLE_SCALE = 180.0 / 32768.0  # ±180° range
+QUATERNION_SCALE = 1.0 / 32768.0
+# GPS velocities above this (m/s) are treated as invalid
+MAX_GPS_VELOCITY = 200.0
+
+# Precompiled payload layouts (8 bytes after header and type)
+_INT16_X3_UINT16 = struct.Struct('<3hH')
+_INT16_X4 = struct.Struct('<4h')
+_UINT16_X4 = struct.Struct('<4H')
+_INT32_UINT16_X2 = struct.Struct('<l2H')
+_INT32_X2 = struct.Struct('<2l')
+_INT16_X2_UINT16 = struct.Struct('<2hH')
+_TIME = struct.Struct('<6BH')
+
+PacketHandler = Callable[[bytes, int], None]
+
+
 class WitMotionPacketType(IntEnum):
     """WitMotion packet types"""
     TIME = 0x50
@@ -25,63 +54,276 @@ class WitMotionPacketType(IntEnum):
     GPS_ACCURACY = 0x5A
 
 
-@dataclass
+def build_packet(packet_type: int, payload: bytes) -> bytes:
+    """Build a checksummed WitMotion packet from an 8-byte payload"""
+    if len(payload) != PACKET_LENGTH - 3:
+        raise ValueError(f"Payload must be {PACKET_LENGTH - 3} bytes")
+    packet = bytes((PACKET_HEADER, packet_type)) + payload
+    return packet + bytes((sum(packet) & 0xFF,))
+
+
+def device_time_to_epoch(year: int, month: int, day: int, hour: int,
+                         minute: int, second: int, millisecond: int) -> Optional[float]:
+    """Convert TIME packet fields (two-digit year) to a UTC epoch, None if invalid"""
+    if not (1 <= month <= 12 and hour < 24 and minute < 60 and
+            second < 61 and millisecond < 1000):
+        return None
+    # timegm() would roll 31 February over into March
+    if not 1 <= day <= calendar.monthrange(2000 + year, month)[1]:
+        return None
+    return calendar.timegm((2000 + year, month, day, hour, minute, second)) + millisecond * 0.001
+
+
+def ddmm_to_degrees(raw: int) -> float:
+    """Convert a DDMM.MMMM value scaled by 1e5 to signed decimal degrees"""
+    value = abs(raw) / 10000000.0
+    degrees = int(value)
+    result = degrees + (value - degrees) * 100 / 60.0
+    return -result if raw < 0 else result
+
+
+# WitMotionData field layout, one double per field
+WITMOTION_FIELDS = (
+    # Host receive time and device (UTC) time of the last TIME packet
+    'timestamp', 'device_time',
+    # Acceleration (m/s²)
+    'acc_x', 'acc_y', 'acc_z',
+    # Angular velocity (°/s)
+    'gyro_x', 'gyro_y', 'gyro_z',
+    # Angles (degrees)
+    'roll', 'pitch', 'yaw',
+    # Magnetic field (µT)
+    'mag_x', 'mag_y', 'mag_z',
+    # Environmental
+    'temperature', 'pressure', 'altitude',
+    # GPS
+    'longitude', 'latitude', 'gps_altitude', 'gps_velocity', 'gps_heading',
+    # Quaternion
+    'q0', 'q1', 'q2', 'q3',
+    # GPS accuracy
+    'satellites', 'pdop', 'hdop', 'vdop',
+)
+
+# Field indices into WitMotionData storage, in WITMOTION_FIELDS order
+(TIMESTAMP, DEVICE_TIME,
+ ACC_X, ACC_Y, ACC_Z,
+ GYRO_X, GYRO_Y, GYRO_Z,
+ ROLL, PITCH, YAW,
+ MAG_X, MAG_Y, MAG_Z,
+ TEMPERATURE, PRESSURE, ALTITUDE,
+ LONGITUDE, LATITUDE, GPS_ALTITUDE, GPS_VELOCITY, GPS_HEADING,
+ Q0, Q1, Q2, Q3,
+ SATELLITES, PDOP, HDOP, VDOP) = range(len(WITMOTION_FIELDS))
+
+_ZERO_VALUES = array('d', bytes(8 * len(WITMOTION_FIELDS)))
+
+# Changed-field bitmask with every field set (bit i is WITMOTION_FIELDS[i])
+ALL_FIELDS = (1 << len(WITMOTION_FIELDS)) - 1
+
+
+def fields_mask(*names: str) -> int:
+    """Changed-field bitmask for the given field names"""
+    mask = 0
+    for name in names:
+        mask |= 1 << WITMOTION_FIELDS.index(name)
+    return mask
+
+
+def _field_property(index: int, name: str, cast=float) -> property:
+    """Named accessor for one slot of WitMotionData storage"""
+    def getter(self):
+        return cast(self._values[index])
+    
+    def setter(self, value):
+        self._values[index] = value
+    
+    return property(getter, setter, doc=name)
+
+
 class WitMotionData:
-    """Container for all WitMotion sensor data"""
-    timestamp: float = 0.0
+    """Container for all WitMotion sensor data
+
+    Values are stored in one fixed array('d') in WITMOTION_FIELDS order,
+    so there is no per-instance dict and a consistent copy is a single
+    memcpy (see snapshot()).  `changed` is a bitmask of the fields that
+    differ from the previous frame; standalone instances mark everything
+    as changed.
+    """
+    __slots__ = ('_values', 'changed')
     
-    # Acceleration (m/s²)
-    acc_x: float = 0.0
-    acc_y: float = 0.0
-    acc_z: float = 0.0
+    def __init__(self, **values):
+        self._values = array('d', _ZERO_VALUES)
+        self.changed = ALL_FIELDS
+        for name, value in values.items():
+            setattr(self, name, value)
     
-    # Angular velocity (°/s)
-    gyro_x: float = 0.0
-    gyro_y: float = 0.0
-    gyro_z: float = 0.0
+    def snapshot(self, changed: int = ALL_FIELDS) -> 'WitMotionData':
+        """Return an immutable copy of the current values
+
+        Assigning a field of a snapshot raises TypeError.
+        """
+        snap = WitMotionData.__new__(WitMotionData)
+        snap._values = memoryview(self._values.tobytes()).cast('d')
+        snap.changed = changed
+        return snap
     
-    # Angles (degrees)
-    roll: float = 0.0
-    pitch: float = 0.0
-    yaw: float = 0.0
+    @property
+    def frozen(self) -> bool:
+        """True for snapshots"""
+        return isinstance(self._values, memoryview)
     
-    # Magnetic field (µT)
-    mag_x: float = 0.0
-    mag_y: float = 0.0
-    mag_z: float = 0.0
+    def to_bytes(self) -> bytes:
+        """Raw native-endian doubles in WITMOTION_FIELDS order"""
+        return self._values.tobytes()
     
-    # Environmental
-    temperature: float = 0.0
-    pressure: float = 0.0
-    altitude: float = 0.0
+    @classmethod
+    def from_bytes(cls, raw: bytes) -> 'WitMotionData':
+        """Create a mutable instance from to_bytes() output"""
+        data = cls.__new__(cls)
+        data._values = array('d')
+        data._values.frombytes(raw)
+        data.changed = ALL_FIELDS
+        if len(data._values) != len(WITMOTION_FIELDS):
+            raise ValueError(f"Expected {len(WITMOTION_FIELDS)} values, got {len(data._values)}")
+        return data
     
-    # GPS
-    longitude: float = 0.0
-    latitude: float = 0.0
-    gps_altitude: float = 0.0
-    gps_velocity: float = 0.0
-    gps_heading: float = 0.0
+    def as_dict(self) -> Dict[str, float]:
+        """Field name to value mapping"""
+        return {name: getattr(self, name) for name in WITMOTION_FIELDS}
     
-    # Quaternion
-    q0: float = 0.0
-    q1: float = 0.0
-    q2: float = 0.0
-    q3: float = 0.0
+    def __eq__(self, other):
+        if not isinstance(other, WitMotionData):
+            return NotImplemented
+        return self._values.tolist() == other._values.tolist()
     
-    # GPS accuracy
-    satellites: int = 0
-    pdop: float = 0.0
-    hdop: float = 0.0
-    vdop: float = 0.0
+    def __repr__(self):
+        fields = ", ".join(f"{name}={value!r}" for name, value in self.as_dict().items())
+        return f"{type(self).__name__}({fields})"
+
+
+for _index, _name in enumerate(WITMOTION_FIELDS):
+    setattr(WitMotionData, _name,
+            _field_property(_index, _name, int if _index == SATELLITES else float))
+del _index, _name
+
+
+class ClockOffsetEstimator:
+    """Running estimate of the host clock relative to the device clock
+
+    Every TIME packet gives one sample of host_time - device_time, which is
+    the clock offset plus the serial, USB and scheduling delay of that
+    packet.  The least delayed sample in the window is the best offset
+    estimate; drift is the least-squares slope of the samples against
+    device time.  When the device clock is GPS-disciplined and the host is
+    NTP-synchronised the samples are the real sensor-to-host latency.
+    """
+    
+    def __init__(self, window: int = 120):
+        # (device_time, host_time - device_time)
+        self.samples = deque(maxlen=window)
+    
+    def update(self, host_time: float, device_time: float):
+        """Add one host/device time pair"""
+        self.samples.append((device_time, host_time - device_time))
+    
+    # Properties are read from the statistics thread while update() runs
+    # on the serial thread: each works on one list() copy of the samples
+    # (atomic under the GIL), never iterating the deque itself
+    
+    @property
+    def offset(self) -> Optional[float]:
+        """Host minus device clock, seconds (minimum delay sample)"""
+        samples = list(self.samples)
+        if not samples:
+            return None
+        return min(delta for _, delta in samples)
+    
+    @property
+    def latency(self) -> Optional[float]:
+        """Mean host receive time minus device sample time, seconds"""
+        samples = list(self.samples)
+        if not samples:
+            return None
+        return sum(delta for _, delta in samples) / len(samples)
+    
+    @property
+    def jitter(self) -> Optional[float]:
+        """Delay of the latest sample above the best-case delay, seconds"""
+        samples = list(self.samples)
+        if not samples:
+            return None
+        return samples[-1][1] - min(delta for _, delta in samples)
+    
+    @property
+    def drift(self) -> Optional[float]:
+        """Rate of change of the offset, seconds per second"""
+        samples = list(self.samples)
+        n = len(samples)
+        if n < 2:
+            return None
+        t0 = samples[0][0]
+        mean_t = sum(t - t0 for t, _ in samples) / n
+        mean_d = sum(delta for _, delta in samples) / n
+        var = sum((t - t0 - mean_t) ** 2 for t, _ in samples)
+        if var == 0:
+            return None
+        cov = sum((t - t0 - mean_t) * (delta - mean_d) for t, delta in samples)
+        return cov / var
+
+
+@dataclass
+class ParserStats:
+    """Framing and link quality counters"""
+    packets: int = 0
+    frames: int = 0
+    unknown_packets: int = 0
+    resyncs: int = 0
+    bytes_discarded: int = 0
+    # Checksum failures keyed by the packet type byte of the bad frame.
+    # The parser adds keys while the statistics thread reads: copy it
+    # (dict() is atomic under the GIL) before iterating
+    checksum_failures: Dict[int, int] = field(default_factory=dict)
+    
+    @property
+    def total_checksum_failures(self) -> int:
+        return sum(dict(self.checksum_failures).values())
 
 
 class WTGAHRS2Parser:
     """Parser for WTGAHRS2 WitMotion protocol"""
     
-    def __init__(self):
+    def __init__(self, resync: bool = True, frame_terminal_type: Optional[int] = None):
         self.data = WitMotionData()
-        self.buffer = bytearray()
-        self.sync_state = False
+        self.stats = ParserStats()
+        self.clock = ClockOffsetEstimator()
+        # On a checksum failure slide forward to the next 0x55 candidate
+        # instead of dropping the whole 11-byte frame
+        self.resync = resync
+        # Packet type that closes an output cycle, None to detect the
+        # cycle start from the TIME packet (see feed_frames())
+        self.frame_terminal_type = frame_terminal_type
+        # Bitmask (1 << type) of packet types in the current / last frame
+        self._cycle_types = 0
+        self.frame_packet_types = 0
+        # Values of the last emitted frame, for changed-field tracking
+        self._frame_values = array('d', [math.nan] * len(WITMOTION_FIELDS))
+        # Reusable receive buffer; only the unconsumed tail of the previous
+        # chunk (always shorter than a packet) lives here between calls
+        self._rx = bytearray(RECEIVE_BUFFER_SIZE)
+        self._tail = 0
+        # Packet type byte -> decoder, see register_packet_type()
+        self._handlers: Dict[int, PacketHandler] = {
+            WitMotionPacketType.TIME: self._parse_time,
+            WitMotionPacketType.ACCELERATION: self._parse_acceleration,
+            WitMotionPacketType.ANGULAR_VELOCITY: self._parse_angular_velocity,
+            WitMotionPacketType.ANGLE: self._parse_angle,
+            WitMotionPacketType.MAGNETIC: self._parse_magnetic,
+            WitMotionPacketType.PRESSURE: self._parse_pressure,
+            WitMotionPacketType.LONGITUDE_LATITUDE: self._parse_longitude_latitude,
+            WitMotionPacketType.ALTITUDE_VELOCITY: self._parse_altitude_velocity,
+            WitMotionPacketType.QUATERNION: self._parse_quaternion,
+            WitMotionPacketType.GPS_ACCURACY: self._parse_gps_accuracy,
+        }
         
     def parse_packet(self, packet: bytes) -> bool:
         """Parse a single WitMotion packet"""
@@ -97,165 +339,262 @@ class WTGAHRS2Parser:
         if checksum != packet[10]:
             return False
             
-        packet_type = packet[1]
-        data_bytes = packet[2:10]
-        
-        return self._parse_data_by_type(packet_type, data_bytes)
+        return self._parse_data_by_type(packet[1], packet, 2)
     
-    def _parse_data_by_type(self, packet_type: int, data: bytes) -> bool:
+    def register_packet_type(self, packet_type: int, handler: PacketHandler):
+        """Register (or replace) the decoder for a packet type byte
+
+        The handler is called as handler(data, offset) with the 8 payload
+        bytes starting at data[offset].  data may be the parser's receive
+        buffer, so handlers must not keep a reference to it.
+        """
+        self._handlers[packet_type] = handler
+    
+    def _parse_data_by_type(self, packet_type: int, data: bytes, offset: int = 0) -> bool:
         """Parse data based on packet type"""
+        handler = self._handlers.get(packet_type)
+        if handler is None:
+            return False
         try:
-            if packet_type == WitMotionPacketType.TIME:
-                self._parse_time(data)
-            elif packet_type == WitMotionPacketType.ACCELERATION:
-                self._parse_acceleration(data)
-            elif packet_type == WitMotionPacketType.ANGULAR_VELOCITY:
-                self._parse_angular_velocity(data)
-            elif packet_type == WitMotionPacketType.ANGLE:
-                self._parse_angle(data)
-            elif packet_type == WitMotionPacketType.MAGNETIC:
-                self._parse_magnetic(data)
-            elif packet_type == WitMotionPacketType.PRESSURE:
-                self._parse_pressure(data)
-            elif packet_type == WitMotionPacketType.LONGITUDE_LATITUDE:
-                self._parse_longitude_latitude(data)
-            elif packet_type == WitMotionPacketType.ALTITUDE_VELOCITY:
-                self._parse_altitude_velocity(data)
-            elif packet_type == WitMotionPacketType.QUATERNION:
-                self._parse_quaternion(data)
-            elif packet_type == WitMotionPacketType.GPS_ACCURACY:
-                self._parse_gps_accuracy(data)
-            else:
-                return False
-                
+            handler(data, offset)
             return True
         except Exception as e:
             print(f"Error parsing packet type {packet_type:02X}: {e}")
             return False
     
-    def _parse_time(self, data: bytes):
+    def _parse_time(self, data: bytes, offset: int = 0):
         """Parse time packet (0x50)"""
         # Time data: year, month, day, hour, minute, second, millisecond
-        values = struct.unpack('<4H', data)
-        # Update timestamp
-        self.data.timestamp = time.time()
+        host_time = time.time()
+        v = self.data._values
+        v[TIMESTAMP] = host_time
+        device_time = device_time_to_epoch(*_TIME.unpack_from(data, offset))
+        if device_time is not None:
+            v[DEVICE_TIME] = device_time
+            self.clock.update(host_time, device_time)
     
-    def _parse_acceleration(self, data: bytes):
+    def _parse_acceleration(self, data: bytes, offset: int = 0):
         """Parse acceleration packet (0x51)"""
-        values = struct.unpack('<3hH', data[:8])
+        x, y, z, t = _INT16_X3_UINT16.unpack_from(data, offset)
         # Convert to m/s² (±16g range)
-        self.data.acc_x = values[0] / 32768.0 * 16.0 * 9.8
-        self.data.acc_y = values[1] / 32768.0 * 16.0 * 9.8
-        self.data.acc_z = values[2] / 32768.0 * 16.0 * 9.8
+        v = self.data._values
+        v[ACC_X] = x * ACCELERATION_SCALE
+        v[ACC_Y] = y * ACCELERATION_SCALE
+        v[ACC_Z] = z * ACCELERATION_SCALE
         # Temperature in 0.01°C
-        self.data.temperature = values[3] / 100.0
+        v[TEMPERATURE] = t * 0.01
     
-    def _parse_angular_velocity(self, data: bytes):
+    def _parse_angular_velocity(self, data: bytes, offset: int = 0):
         """Parse angular velocity packet (0x52)"""
-        values = struct.unpack('<3hH', data[:8])
+        x, y, z, _ = _INT16_X3_UINT16.unpack_from(data, offset)
         # Convert to °/s (±2000°/s range)
-        self.data.gyro_x = values[0] / 32768.0 * 2000.0
-        self.data.gyro_y = values[1] / 32768.0 * 2000.0
-        self.data.gyro_z = values[2] / 32768.0 * 2000.0
+        v = self.data._values
+        v[GYRO_X] = x * GYRO_SCALE
+        v[GYRO_Y] = y * GYRO_SCALE
+        v[GYRO_Z] = z * GYRO_SCALE
     
-    def _parse_angle(self, data: bytes):
+    def _parse_angle(self, data: bytes, offset: int = 0):
         """Parse angle packet (0x53)"""
-        values = struct.unpack('<3hH', data[:8])
+        roll, pitch, yaw, _ = _INT16_X3_UINT16.unpack_from(data, offset)
         # Convert to degrees (±180° range)
-        self.data.roll = values[0] / 32768.0 * 180.0
-        self.data.pitch = values[1] / 32768.0 * 180.0
+        v = self.data._values
+        v[ROLL] = roll * ANGLE_SCALE
+        v[PITCH] = pitch * ANGLE_SCALE
         # Negate yaw to fix left/right direction issue
         # Standard: LEFT turn should increase heading, RIGHT turn should decrease
-        self.data.yaw = -(values[2] / 32768.0 * 180.0)
+        v[YAW] = yaw * -ANGLE_SCALE
     
-    def _parse_magnetic(self, data: bytes):
+    def _parse_magnetic(self, data: bytes, offset: int = 0):
         """Parse magnetic field packet (0x54)"""
-        values = struct.unpack('<3hH', data[:8])
+        x, y, z, _ = _INT16_X3_UINT16.unpack_from(data, offset)
         # Convert to µT (arbitrary scale, needs calibration)
-        self.data.mag_x = values[0]
-        self.data.mag_y = values[1]
-        self.data.mag_z = values[2]
+        v = self.data._values
+        v[MAG_X] = x
+        v[MAG_Y] = y
+        v[MAG_Z] = z
     
-    def _parse_pressure(self, data: bytes):
+    def _parse_pressure(self, data: bytes, offset: int = 0):
         """Parse pressure packet (0x55)"""
-        values = struct.unpack('<l2H', data)
+        pressure, height, _ = _INT32_UINT16_X2.unpack_from(data, offset)
+        v = self.data._values
         # Pressure in Pa
-        self.data.pressure = values[0] / 100.0  # Convert to hPa
+        v[PRESSURE] = pressure * 0.01  # Convert to hPa
         # Height in cm
-        self.data.altitude = values[1] / 100.0  # Convert to meters
+        v[ALTITUDE] = height * 0.01  # Convert to meters
     
-    def _parse_longitude_latitude(self, data: bytes):
+    def _parse_longitude_latitude(self, data: bytes, offset: int = 0):
         """Parse GPS longitude/latitude packet (0x57)"""
-        values = struct.unpack('<2l', data)
-        # Convert from DDMM.MMMM format to decimal degrees
-        # Raw values are in format: degrees * 10000000 + minutes * 100000
-        # But the device sends DDMM.MMMM format, so we need to convert
-        
-        # Extract longitude (first value)
-        raw_lon = values[0] / 10000000.0
-        deg_lon = int(abs(raw_lon))
-        min_lon = (abs(raw_lon) - deg_lon) * 100
-        self.data.longitude = -(deg_lon + min_lon / 60.0) if raw_lon < 0 else (deg_lon + min_lon / 60.0)
-        
-        # Extract latitude (second value)
-        raw_lat = values[1] / 10000000.0
-        deg_lat = int(abs(raw_lat))
-        min_lat = (abs(raw_lat) - deg_lat) * 100
-        self.data.latitude = -(deg_lat + min_lat / 60.0) if raw_lat < 0 else (deg_lat + min_lat / 60.0)
+        raw_lon, raw_lat = _INT32_X2.unpack_from(data, offset)
+        # The device sends DDMM.MMMM scaled by 1e5, i.e. degrees * 1e7 +
+        # minutes * 1e5; convert both to signed decimal degrees
+        v = self.data._values
+        v[LONGITUDE] = ddmm_to_degrees(raw_lon)
+        v[LATITUDE] = ddmm_to_degrees(raw_lat)
     
-    def _parse_altitude_velocity(self, data: bytes):
+    def _parse_altitude_velocity(self, data: bytes, offset: int = 0):
         """Parse GPS altitude/velocity packet (0x58)"""
-        values = struct.unpack('<2hH', data[:6])
+        altitude, velocity, heading = _INT16_X2_UINT16.unpack_from(data, offset)
+        v = self.data._values
         # GPS altitude in 0.1m
-        self.data.gps_altitude = values[0] / 10.0
+        v[GPS_ALTITUDE] = altitude * 0.1
         # GPS velocity in 0.1m/s
-        raw_velocity = values[1] / 10.0
+        raw_velocity = velocity * 0.1
         # Filter out invalid velocity values (common GPS issue)
-        if abs(raw_velocity) > 200:  # > 200 m/s = 720 km/h is clearly invalid
-            self.data.gps_velocity = 0.0  # Set to 0 for invalid values
+        if abs(raw_velocity) > MAX_GPS_VELOCITY:
+            v[GPS_VELOCITY] = 0.0  # Set to 0 for invalid values
         else:
-            self.data.gps_velocity = raw_velocity
+            v[GPS_VELOCITY] = raw_velocity
         # GPS heading in 0.1°
-        self.data.gps_heading = values[2] / 10.0
+        v[GPS_HEADING] = heading * 0.1
     
-    def _parse_quaternion(self, data: bytes):
+    def _parse_quaternion(self, data: bytes, offset: int = 0):
         """Parse quaternion packet (0x59)"""
-        values = struct.unpack('<4h', data)
+        q0, q1, q2, q3 = _INT16_X4.unpack_from(data, offset)
         # Convert to normalized quaternion
-        self.data.q0 = values[0] / 32768.0
-        self.data.q1 = values[1] / 32768.0
-        self.data.q2 = values[2] / 32768.0
-        self.data.q3 = values[3] / 32768.0
+        v = self.data._values
+        v[Q0] = q0 * QUATERNION_SCALE
+        v[Q1] = q1 * QUATERNION_SCALE
+        v[Q2] = q2 * QUATERNION_SCALE
+        v[Q3] = q3 * QUATERNION_SCALE
     
-    def _parse_gps_accuracy(self, data: bytes):
+    def _parse_gps_accuracy(self, data: bytes, offset: int = 0):
         """Parse GPS accuracy packet (0x5A)"""
-        values = struct.unpack('<4H', data)
-        self.data.satellites = values[0]
-        self.data.pdop = values[1] / 100.0
-        self.data.hdop = values[2] / 100.0
-        self.data.vdop = values[3] / 100.0
+        satellites, pdop, hdop, vdop = _UINT16_X4.unpack_from(data, offset)
+        v = self.data._values
+        v[SATELLITES] = satellites
+        v[PDOP] = pdop * 0.01
+        v[HDOP] = hdop * 0.01
+        v[VDOP] = vdop * 0.01
     
-    def process_byte(self, byte: int) -> bool:
-        """Process a single byte, return True if complete packet found"""
-        if not self.sync_state:
-            if byte == 0x55:
-                self.buffer = bytearray([byte])
-                self.sync_state = True
-            return False
-        
-        self.buffer.append(byte)
+    @property
+    def buffer(self) -> bytes:
+        """Bytes carried over to the next chunk"""
+        return bytes(self._rx[:self._tail])
+    
+    def _scan(self, chunk: bytes) -> Iterator[Tuple[bytes, int]]:
+        """Yield (buffer, offset) for each checksum-valid packet in a chunk
+
+        Nothing is copied per packet: offsets point into the chunk itself,
+        or into the receive buffer when a tail from the previous chunk has
+        to be joined.  The buffer is only valid until the next iteration.
+        """
+        tail = self._tail
+        if tail or not isinstance(chunk, (bytes, bytearray)):
+            rx = self._rx
+            end = tail + len(chunk)
+            if end > len(rx):
+                rx.extend(bytes(end - len(rx)))
+            rx[tail:end] = chunk
+            data = rx
+        else:
+            data = chunk
+            end = len(chunk)
+        view = memoryview(data)
+        pos = 0
+        stats = self.stats
         
-        if len(self.buffer) >= 11:
-            packet = bytes(self.buffer[:11])
-            self.buffer = self.buffer[11:]
-            
-            if len(self.buffer) == 0:
-                self.sync_state = False
-            
-            return self.parse_packet(packet)
+        try:
+            while True:
+                start = data.find(PACKET_HEADER, pos, end)
+                if start < 0:
+                    stats.bytes_discarded += end - pos
+                    pos = end
+                    break
+                stats.bytes_discarded += start - pos
+                if end - start < PACKET_LENGTH:
+                    pos = start
+                    break
+                
+                if sum(view[start:start + 10]) & 0xFF != data[start + 10]:
+                    packet_type = data[start + 1]
+                    stats.checksum_failures[packet_type] = stats.checksum_failures.get(packet_type, 0) + 1
+                    if self.resync:
+                        # The header was probably a 0x55 payload byte; retry
+                        # alignment from the next candidate inside this frame
+                        stats.resyncs += 1
+                        stats.bytes_discarded += 1
+                        pos = start + 1
+                    else:
+                        stats.bytes_discarded += PACKET_LENGTH
+                        pos = start + PACKET_LENGTH
+                    continue
+                
+                pos = start + PACKET_LENGTH
+                yield data, start
+        finally:
+            view.release()
         
+        # Carry the incomplete packet over to the front of the receive buffer
+        self._tail = end - pos
+        if self._tail:
+            self._rx[:self._tail] = data[pos:end]
+    
+    def _dispatch(self, data: bytes, start: int) -> bool:
+        """Decode a validated packet in place and count it"""
+        if self._parse_data_by_type(data[start + 1], data, start + 2):
+            self.stats.packets += 1
+            return True
+        self.stats.unknown_packets += 1
         return False
     
+    def feed(self, chunk: bytes) -> Iterator[int]:
+        """Process a chunk of bytes, yield the type of each packet parsed
+
+        The chunk is scanned lazily, one packet per iteration, so that
+        get_data() shows the state after the packet just yielded.  The
+        iterator must be fully consumed: stopping early (break) loses the
+        rest of the chunk and the partial packet carried over to the next.
+        """
+        for data, start in self._scan(chunk):
+            if self._dispatch(data, start):
+                yield data[start + 1]
+    
+    def feed_frames(self, chunk: bytes) -> Iterator[WitMotionData]:
+        """Process a chunk of bytes, yield one snapshot per output cycle
+
+        The device sends a burst of packets every cycle.  With no terminal
+        type configured a cycle ends when the next TIME packet (or any type
+        already seen in the cycle) arrives, so each frame is emitted one
+        cycle late.  With frame_terminal_type set the frame is emitted as
+        soon as that packet has been decoded.  As with feed(), the
+        iterator must be fully consumed.
+        """
+        terminal = self.frame_terminal_type
+        for data, start in self._scan(chunk):
+            packet_type = data[start + 1]
+            bit = 1 << packet_type
+            if (terminal is None and self._cycle_types and
+                    (packet_type == WitMotionPacketType.TIME or self._cycle_types & bit)):
+                yield self._end_cycle()
+            if self._dispatch(data, start):
+                self._cycle_types |= bit
+                if packet_type == terminal:
+                    yield self._end_cycle()
+    
+    def _end_cycle(self) -> WitMotionData:
+        """Close the current output cycle and return its frame"""
+        self.frame_packet_types = self._cycle_types
+        self._cycle_types = 0
+        self.stats.frames += 1
+        
+        # Mark the fields that differ from the previous frame
+        values = self.data._values
+        changed = 0
+        bit = 1
+        for value, previous in zip(values, self._frame_values):
+            if value != previous:
+                changed |= bit
+            bit <<= 1
+        self._frame_values[:] = values
+        return self.data.snapshot(changed)
+    
+    def process_byte(self, byte: int) -> bool:
+        """Process a single byte, return True if complete packet found"""
+        found = False
+        for _ in self.feed(bytes((byte,))):
+            found = True
+        return found
+    
     def get_data(self) -> WitMotionData:
         """Get current sensor data"""
         return self.data
\ No newline at end of file